@@ -10,7 +10,11 @@ class UserAdmin(UserAdmin):
     list_display = ("username", "email")
 
 
-admin.site.register(Blueprint)
+@admin.register(Blueprint)
+class BlueprintAdmin(admin.ModelAdmin):
+    raw_id_fields = ("payload",)
+
+
 admin.site.register(Tag)
 admin.site.register(Commentary)
 admin.site.unregister(Group)
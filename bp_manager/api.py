@@ -0,0 +1,334 @@
+"""Read-only JSON API, mounted under ``api/v1/``.
+
+Blueprint payloads are tagged with an ETag computed from the ids and
+versions of the blueprints they contain. ``Blueprint.version`` is bumped
+whenever anything serialized here changes, so a matching ``If-None-Match``
+is answered with a 304 before the rows are serialized.
+"""
+
+import hashlib
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from bp_manager import tags
+from bp_manager.mixins import BlueprintFilterMixin
+from bp_manager.models import Blueprint, BlueprintBookEntry, Tag, User
+from bp_manager.pagination import CursorPaginator, InvalidCursor
+
+API_VERSION = "v1"
+
+# Fields left out of blueprint payloads unless requested with ``fields=``,
+# with the lookup they are loaded from
+OPTIONAL_FIELDS = {"blueprint_string": "payload__blueprint_string"}
+
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def make_etag(*parts) -> str:
+    payload = json.dumps([API_VERSION, *parts], separators=(",", ":"), default=str)
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def image_urls(blueprint: Blueprint, request) -> dict | None:
+    if not blueprint.blueprint_image:
+        return None
+    return {
+        "original": request.build_absolute_uri(blueprint.blueprint_image.url),
+        "card": request.build_absolute_uri(blueprint.image_variant_url("card")),
+        "detail": request.build_absolute_uri(blueprint.image_variant_url("detail")),
+    }
+
+
+def serialize_blueprint(blueprint: Blueprint, request, extra=None) -> dict:
+    data = {
+        "id": blueprint.pk,
+        "version": blueprint.version,
+        "url": request.build_absolute_uri(blueprint.get_absolute_url()),
+        "title": blueprint.title,
+        "kind": blueprint.kind,
+        "entries_url": (
+            request.build_absolute_uri(
+                reverse("bp_manager:api-book-entry-list", args=[blueprint.pk])
+            )
+            if blueprint.is_book
+            else None
+        ),
+        "description": blueprint.description,
+        "author": blueprint.user.username,
+        "tags": [tag.name for tag in blueprint.tags.all()],
+        "created_time": blueprint.created_time.isoformat(),
+        "game_version": blueprint.game_version,
+        "label": blueprint.label,
+        "entity_count": blueprint.entity_count,
+        "tile_count": blueprint.tile_count,
+        "width": blueprint.width,
+        "height": blueprint.height,
+        "icons": blueprint.icons,
+        "like_count": blueprint.like_count,
+        "comment_count": blueprint.comment_count,
+        "image": image_urls(blueprint, request),
+    }
+    data.update(extra or {})
+    return data
+
+
+def serialize_entry(entry: BlueprintBookEntry, request, fields=()) -> dict:
+    data = {
+        "index": entry.index,
+        "url": request.build_absolute_uri(entry.get_absolute_url()),
+        "kind": entry.kind,
+        "label": entry.label,
+        "game_version": entry.game_version,
+        "entity_count": entry.entity_count,
+        "tile_count": entry.tile_count,
+        "width": entry.width,
+        "height": entry.height,
+        "icons": entry.icons,
+    }
+    for field in fields:
+        data[field] = getattr(entry, field)
+    return data
+
+
+class ApiView(View):
+    http_method_names = ["get", "head", "options"]
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": str(error)}, status=error.status)
+        except Http404 as error:
+            return JsonResponse({"error": str(error)}, status=404)
+
+    def get_fields(self) -> tuple[str, ...]:
+        requested = [
+            field.strip()
+            for field in self.request.GET.get("fields", "").split(",")
+            if field.strip()
+        ]
+        unknown = set(requested) - set(OPTIONAL_FIELDS)
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return tuple(field for field in OPTIONAL_FIELDS if field in requested)
+
+    def get_blueprint_queryset(self):
+        return Blueprint.objects.select_related("user").prefetch_related("tags")
+
+    def respond(self, data: dict, etag: str):
+        response = JsonResponse(data)
+        response["ETag"] = etag
+        return response
+
+    def not_modified(self, etag: str):
+        response = get_conditional_response(self.request, etag=etag)
+        if response is not None:
+            response["ETag"] = etag
+        return response
+
+    def serialize(self, blueprints: list, fields) -> list[dict]:
+        """Serialize ``blueprints``, loading optional fields in a single query."""
+        extra = {}
+        if fields and blueprints:
+            lookups = [OPTIONAL_FIELDS[field] for field in fields]
+            extra = {
+                row[0]: dict(zip(fields, row[1:]))
+                for row in Blueprint.objects.filter(
+                    pk__in=[blueprint.pk for blueprint in blueprints]
+                ).values_list("pk", *lookups)
+            }
+        return [
+            serialize_blueprint(blueprint, self.request, extra.get(blueprint.pk))
+            for blueprint in blueprints
+        ]
+
+
+class BlueprintListApiView(BlueprintFilterMixin, ApiView):
+    """Cursor-paginated listing accepting the same filters as the index page."""
+
+    def get_queryset(self):
+        return self.filter_blueprints(self.get_blueprint_queryset(), AnonymousUser())
+
+    def get_page_size(self) -> int:
+        try:
+            page_size = int(self.request.GET.get("limit", self.paginate_by))
+        except ValueError:
+            raise ApiError("limit must be an integer.")
+        return max(1, min(page_size, MAX_PAGE_SIZE))
+
+    def page_url(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return self.request.build_absolute_uri(f"?{params.urlencode()}")
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        queryset = self.get_queryset()
+        paginator = CursorPaginator(
+            queryset, self.get_page_size(), ordering=self.ordering
+        )
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor as error:
+            raise ApiError(str(error))
+
+        blueprints = page.object_list
+        etag = make_etag(
+            request.get_full_path(),
+            [(blueprint.pk, blueprint.version) for blueprint in blueprints],
+            page.has_next(),
+            page.has_previous(),
+        )
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = {
+            "results": self.serialize(blueprints, fields),
+            "next": self.page_url(page.next_cursor),
+            "previous": self.page_url(page.previous_cursor),
+        }
+        return self.respond(data, etag)
+
+
+class UserBlueprintListApiView(BlueprintListApiView):
+    def get_queryset(self):
+        user = get_object_or_404(User, username=self.kwargs["username"])
+        return self.get_blueprint_queryset().filter(user=user)
+
+
+class BlueprintDetailApiView(ApiView):
+    def get(self, request, pk, *args, **kwargs):
+        fields = self.get_fields()
+        blueprint = get_object_or_404(self.get_blueprint_queryset(), pk=pk)
+
+        etag = make_etag(fields, blueprint.pk, blueprint.version)
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self.respond(self.serialize([blueprint], fields)[0], etag)
+
+
+class BlueprintBatchApiView(ApiView):
+    """``?ids=1,2,3``: up to ``MAX_BATCH_SIZE`` blueprints in the requested
+    order, with the ids that do not exist listed under ``missing``."""
+
+    def get_ids(self) -> list[int]:
+        try:
+            ids = [
+                int(value)
+                for value in self.request.GET.get("ids", "").split(",")
+                if value.strip()
+            ]
+        except ValueError:
+            raise ApiError("ids must be a comma-separated list of integers.")
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ApiError("ids is required.")
+        if len(ids) > MAX_BATCH_SIZE:
+            raise ApiError(f"At most {MAX_BATCH_SIZE} ids can be fetched at once.")
+        return ids
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        ids = self.get_ids()
+        found = self.get_blueprint_queryset().in_bulk(ids)
+        blueprints = [found[pk] for pk in ids if pk in found]
+
+        etag = make_etag(
+            fields, ids, [(blueprint.pk, blueprint.version) for blueprint in blueprints]
+        )
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = {
+            "results": self.serialize(blueprints, fields),
+            "missing": [pk for pk in ids if pk not in found],
+        }
+        return self.respond(data, etag)
+
+
+class BookEntryListApiView(ApiView):
+    """Entries of a blueprint book, so clients can fetch a single child
+    instead of the whole book string."""
+
+    def get_entries(self, book: Blueprint, fields):
+        entries = book.book_entries.all()
+        if not fields:
+            entries = entries.defer("blueprint_string")
+        return entries
+
+    def get(self, request, pk, *args, **kwargs):
+        fields = self.get_fields()
+        book = get_object_or_404(Blueprint.objects.only("version", "kind"), pk=pk)
+
+        etag = make_etag(fields, "entries", book.pk, book.version, kwargs)
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self.respond(self.get_data(book, fields), etag)
+
+    def get_data(self, book, fields) -> dict:
+        return {
+            "results": [
+                serialize_entry(entry, self.request, fields)
+                for entry in self.get_entries(book, fields)
+            ]
+        }
+
+
+class BookEntryDetailApiView(BookEntryListApiView):
+    def get_data(self, book, fields) -> dict:
+        entry = get_object_or_404(
+            self.get_entries(book, fields), index=self.kwargs["index"]
+        )
+        return serialize_entry(entry, self.request, fields)
+
+
+class TagListApiView(ApiView):
+    def get(self, request, *args, **kwargs):
+        results = list(
+            Tag.objects.order_by("name").values(
+                "name", blueprint_count=F("usage_count")
+            )
+        )
+        etag = make_etag(results)
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self.respond({"results": results}, etag)
+
+
+class TagCompleteApiView(ApiView):
+    """``?q=prefix``: the most used tags starting with ``prefix``, answered
+    from the in-process index in ``bp_manager.tags``."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.GET.get("limit", 10))
+        except ValueError:
+            raise ApiError("limit must be an integer.")
+        prefix = request.GET.get("q", "")
+        generation = tags.current_generation()
+        etag = make_etag("tags", generation, prefix.strip().lower(), limit)
+        not_modified = self.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        return self.respond({"results": tags.complete(prefix, limit)}, etag)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BpManagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bp_manager"
+
+    def ready(self):
+        from bp_manager import signals  # noqa: F401
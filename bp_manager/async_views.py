@@ -0,0 +1,152 @@
+"""Async counterparts of the hottest views, enabled with ``ASYNC_VIEWS``.
+
+Under ASGI these run on the event loop and only hop to a thread for the
+ORM calls themselves, instead of wrapping the whole view in ``sync_to_async``.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import reverse_lazy
+from django.views import View
+
+from bp_manager import cache, conditional, facets, likes
+from bp_manager.forms import BlueprintSearchForm, CommentaryForm
+from bp_manager.mixins import (
+    AsyncLoginRequiredMixin,
+    BlueprintDetailMixin,
+    BlueprintFilterMixin,
+)
+from bp_manager.models import Blueprint, Like
+from bp_manager.pagination import CursorPaginator, InvalidCursor
+
+
+async def _alist(queryset) -> list:
+    return [obj async for obj in queryset]
+
+
+class AsyncBlueprintListView(BlueprintFilterMixin, View):
+    template_name = "bp_manager/blueprint_list.html"
+
+    async def get(self, request, *args, **kwargs):
+        request.user = user = await request.auser()
+        queryset = self.filter_blueprints(self.get_base_queryset(), user)
+        paginator = CursorPaginator(queryset, self.paginate_by, ordering=self.ordering)
+
+        cursor = request.GET.get("cursor")
+        try:
+            window, direction = paginator.window(cursor)
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        etag = await sync_to_async(self.get_etag)(window)
+        response = conditional.not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # The liked set is looked up against the page window as a subquery,
+        # so it does not have to wait for the page rows.
+        tag_facets = sync_to_async(facets.tag_facets)(queryset, self.filters)
+        if user.is_authenticated:
+            rows, liked_ids, tag_facets = await asyncio.gather(
+                _alist(window),
+                _alist(
+                    Like.objects.filter(
+                        user=user, blueprint_id__in=window.values("pk")
+                    ).values_list("blueprint_id", flat=True)
+                ),
+                tag_facets,
+            )
+            liked_blueprints = await sync_to_async(likes.merge_liked)(
+                user, [blueprint.pk for blueprint in rows], liked_ids
+            )
+        else:
+            rows, tag_facets = await asyncio.gather(_alist(window), tag_facets)
+            liked_blueprints = []
+
+        page = paginator.build_page(rows, direction, cursor)
+        context = {
+            "view": self,
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+            "blueprint_list": page.object_list,
+            "search_form": BlueprintSearchForm(request.GET or None),
+            "tag_facets": tag_facets,
+            "liked_blueprints": liked_blueprints,
+            "blueprint_cards": await sync_to_async(cache.render_cards)(
+                page.object_list, request, liked_blueprints
+            ),
+        }
+        return conditional.add_validators(
+            TemplateResponse(request, self.template_name, context), etag
+        )
+
+
+class AsyncBlueprintDetailView(BlueprintDetailMixin, View):
+    template_name = "bp_manager/blueprint_detail.html"
+
+    async def get(self, request, pk, *args, **kwargs):
+        request.user = user = await request.auser()
+        etag, last_modified = await sync_to_async(conditional.detail_validators)(
+            request, pk
+        )
+        if etag is not None:
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+        detail = await sync_to_async(self.get_detail)(pk)
+        blueprint = detail["blueprint"]
+        liked = user.is_authenticated and await sync_to_async(likes.is_liked)(user, pk)
+        await sync_to_async(likes.add_pending_counts)([blueprint])
+
+        context = {
+            "view": self,
+            "object": blueprint,
+            **detail,
+            "commentary_form": CommentaryForm(),
+            "liked": liked,
+        }
+        return self.add_detail_validators(
+            TemplateResponse(request, self.template_name, context),
+            etag,
+            last_modified,
+        )
+
+
+class AsyncToggleLikeView(AsyncLoginRequiredMixin, View):
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in ("PUT", "DELETE"):
+            request.user = await request.auser()
+            if not request.user.is_authenticated:
+                return JsonResponse({"error": "Log in to like blueprints."}, status=401)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def put(self, request, pk, *args, **kwargs):
+        return await self.set_liked(request, pk, True)
+
+    async def delete(self, request, pk, *args, **kwargs):
+        return await self.set_liked(request, pk, False)
+
+    @staticmethod
+    async def set_liked(request, pk, liked: bool):
+        try:
+            like_count = await sync_to_async(likes.set_liked)(request.user, pk, liked)
+        except Blueprint.DoesNotExist:
+            return JsonResponse({"error": "Blueprint not found."}, status=404)
+        return JsonResponse({"liked": liked, "like_count": like_count})
+
+    async def post(self, request, pk, *args, **kwargs):
+        if not await Blueprint.objects.filter(pk=pk).aexists():
+            raise Http404("No blueprint found matching the query")
+        await sync_to_async(likes.toggle)(request.user, pk)
+        return redirect(reverse_lazy("bp_manager:index") + f"#blueprint-{pk}")
+
+    async def get(self, request, pk, *args, **kwargs):
+        if not await Blueprint.objects.filter(pk=pk).aexists():
+            raise Http404("No blueprint found matching the query")
+        return redirect(reverse_lazy("bp_manager:index") + f"#blueprint-{pk}")
@@ -0,0 +1,21 @@
+from bp_manager import codec, search
+from bp_manager.models import Blueprint, BlueprintBookEntry
+
+
+def build_entries(blueprint: Blueprint, data: dict | None) -> list[BlueprintBookEntry]:
+    if data is None:
+        return []
+    return [
+        BlueprintBookEntry(book=blueprint, **values)
+        for values in codec.book_entries(data)
+    ]
+
+
+def sync_entries(blueprint: Blueprint, data: dict | None) -> None:
+    """Replace the book entries of a saved blueprint with those in ``data``,
+    the decoded exchange string returned by ``update_decoded_metadata()``."""
+    deleted, _ = blueprint.book_entries.all().delete()
+    created = BlueprintBookEntry.objects.bulk_create(build_entries(blueprint, data))
+    if deleted or created:
+        # Entry labels are part of the book's search document
+        search.get_backend().index([blueprint.pk])
@@ -0,0 +1,130 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from bp_manager import likes
+
+CARD_TEMPLATE = "includes/blueprint_card.html"
+
+# Per-user parts of a card are rendered as markers and filled in after the
+# shared HTML is fetched from the cache.
+HEART_MARKER = "__bp_heart_icon__"
+CSRF_MARKER = "__bp_csrf_token__"
+# The like count too, as buffered likes add to it before they are flushed
+LIKE_COUNT_MARKER = "__bp_like_count__"
+
+STATS_KEYS = {
+    "card_hits": "bp_manager:stats:card_hits",
+    "card_misses": "bp_manager:stats:card_misses",
+    "detail_hits": "bp_manager:stats:detail_hits",
+    "detail_misses": "bp_manager:stats:detail_misses",
+    "detail_stale": "bp_manager:stats:detail_stale",
+}
+
+# How long a read-through entry is kept after it went stale, to be served
+# while one caller rebuilds it, and how long that caller may take
+STALE_TIMEOUT = 24 * 60 * 60
+REBUILD_LOCK_TIMEOUT = 30
+
+
+def card_key(blueprint) -> str:
+    return f"bp_manager:card:{blueprint.pk}:{blueprint.version}"
+
+
+def record(stat: str, count: int = 1) -> None:
+    if not count:
+        return
+    key = STATS_KEYS[stat]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        cache.set(key, count, timeout=None)
+
+
+def get_stats() -> dict:
+    values = cache.get_many(STATS_KEYS.values())
+    return {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+
+
+def reset_stats() -> None:
+    cache.delete_many(STATS_KEYS.values())
+
+
+def render_cards(blueprints, request, liked_ids) -> list[str]:
+    """Render list cards, sharing the cached HTML of each blueprint version
+    between users and overlaying the liked state, like count and CSRF
+    token."""
+    blueprints = list(blueprints)
+    keys = [card_key(blueprint) for blueprint in blueprints]
+    cached = cache.get_many(keys)
+
+    missing = {}
+    for key, blueprint in zip(keys, blueprints):
+        if key not in cached:
+            missing[key] = render_to_string(
+                CARD_TEMPLATE,
+                {
+                    "blueprint": blueprint,
+                    "heart_icon": HEART_MARKER,
+                    "csrf_token_value": CSRF_MARKER,
+                    "like_count": LIKE_COUNT_MARKER,
+                },
+            )
+    if missing:
+        cache.set_many(missing, settings.CARD_CACHE_TIMEOUT)
+    record("card_hits", len(cached))
+    record("card_misses", len(missing))
+
+    csrf_token = get_token(request)
+    pending = likes.pending_counts([blueprint.pk for blueprint in blueprints])
+    cards = []
+    for key, blueprint in zip(keys, blueprints):
+        html = cached.get(key) or missing[key]
+        heart_icon = "bxs-heart" if blueprint.pk in liked_ids else "bx-heart"
+        like_count = blueprint.like_count + pending.get(blueprint.pk, 0)
+        cards.append(
+            html.replace(HEART_MARKER, heart_icon)
+            .replace(CSRF_MARKER, csrf_token)
+            .replace(LIKE_COUNT_MARKER, str(like_count))
+        )
+    return cards
+
+
+def detail_key(blueprint_id: int) -> str:
+    return f"bp_manager:detail:{blueprint_id}"
+
+
+def read_through(key: str, version: int, build, timeout: int, stat: str):
+    """``build()``, cached under ``key`` for ``version`` of the underlying
+    data, an increasing number, and for at most ``timeout`` seconds.
+
+    When the entry is missing it is built right away. When it is of an
+    older version or expired, the one caller that takes the rebuild lock
+    rebuilds it while the others keep serving the stale entry, so a busy
+    entry going stale does not send every worker to the database at once.
+
+    Returns the value and the version it was built for, which is older
+    than ``version`` when a stale entry is served.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        entry_version, fresh_until, value = entry
+        if entry_version >= version and time.time() < fresh_until:
+            record(f"{stat}_hits")
+            return value, entry_version
+        if not cache.add(f"{key}:lock", True, REBUILD_LOCK_TIMEOUT):
+            record(f"{stat}_stale")
+            return value, entry_version
+
+    record(f"{stat}_misses")
+    try:
+        value = build()
+        cache.set(key, (version, time.time() + timeout, value), STALE_TIMEOUT)
+    finally:
+        if entry is not None:
+            cache.delete(f"{key}:lock")
+    return value, version
@@ -0,0 +1,279 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+import zlib
+from collections import Counter
+from typing import Iterable, Iterator
+
+# Factorio exchange strings are a version byte followed by base64(zlib(JSON)).
+# Only version "0" has ever been used by the game.
+VERSION_BYTE = "0"
+
+# Upper bound on the inflated JSON size. Real blueprint books stay well below
+# this; anything larger is either corrupt or a zip bomb.
+MAX_DECODED_SIZE = 64 * 1024 * 1024
+
+INFLATE_CHUNK_SIZE = 256 * 1024
+
+
+class BlueprintDecodeError(ValueError):
+    pass
+
+
+def iter_inflate(
+    chunks: Iterable[bytes], max_size: int = MAX_DECODED_SIZE
+) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj()
+    total = 0
+
+    def _checked(output: bytes) -> bytes:
+        nonlocal total
+        total += len(output)
+        if total > max_size:
+            raise BlueprintDecodeError(
+                f"Blueprint inflates to more than {max_size} bytes."
+            )
+        return output
+
+    try:
+        for chunk in chunks:
+            pending = chunk
+            while pending and not decompressor.eof:
+                output = decompressor.decompress(pending, INFLATE_CHUNK_SIZE)
+                pending = decompressor.unconsumed_tail
+                if output:
+                    yield _checked(output)
+
+        while not decompressor.eof:
+            output = decompressor.decompress(b"", INFLATE_CHUNK_SIZE)
+            if not output:
+                break
+            yield _checked(output)
+    except zlib.error as error:
+        raise BlueprintDecodeError(f"Invalid zlib stream: {error}") from error
+
+    if not decompressor.eof:
+        raise BlueprintDecodeError("Truncated zlib stream.")
+
+
+def inflate(data: bytes, max_size: int = MAX_DECODED_SIZE) -> bytes:
+    chunks = (
+        data[offset:offset + INFLATE_CHUNK_SIZE]
+        for offset in range(0, len(data), INFLATE_CHUNK_SIZE)
+    )
+    return b"".join(iter_inflate(chunks, max_size=max_size))
+
+
+def decode(blueprint_string: str, max_size: int = MAX_DECODED_SIZE) -> dict:
+    blueprint_string = "".join(blueprint_string.split())
+    if not blueprint_string.startswith(VERSION_BYTE):
+        raise BlueprintDecodeError("Unsupported blueprint string version.")
+
+    try:
+        compressed = base64.b64decode(blueprint_string[1:], validate=True)
+    except (binascii.Error, ValueError) as error:
+        raise BlueprintDecodeError(f"Invalid base64 payload: {error}") from error
+
+    try:
+        data = json.loads(inflate(compressed, max_size=max_size))
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise BlueprintDecodeError(f"Invalid blueprint JSON: {error}") from error
+
+    if not isinstance(data, dict) or len(data) != 1:
+        raise BlueprintDecodeError("Blueprint JSON must hold exactly one item.")
+    if not isinstance(next(iter(data.values())), dict):
+        raise BlueprintDecodeError("Blueprint item must be an object.")
+    return data
+
+
+def content_hash(data: dict) -> str:
+    """SHA-256 of the canonical JSON of decoded blueprint data.
+
+    Exchange strings that differ only in whitespace, key order or
+    compression decode to the same data and therefore hash the same.
+    """
+    payload = json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode(data: dict) -> str:
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    compressed = zlib.compress(payload.encode("utf-8"), 9)
+    return VERSION_BYTE + base64.b64encode(compressed).decode("ascii")
+
+
+def format_version(version: int | None) -> str:
+    if not isinstance(version, int) or version <= 0:
+        return ""
+    parts = [(version >> shift) & 0xFFFF for shift in (48, 32, 16, 0)]
+    return ".".join(str(part) for part in parts[:3])
+
+
+def _list(value) -> list:
+    """``value`` if it is a JSON array, else empty. Strings that decode can
+    still hold anything inside, and bad values are skipped, not trusted."""
+    return value if isinstance(value, list) else []
+
+
+def _dict(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _coordinate(value) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value):
+        return None
+    return math.floor(value)
+
+
+def _bounding_box(blueprint: dict) -> tuple[int, int]:
+    xs, ys = [], []
+    for placed in _list(blueprint.get("entities")) + _list(blueprint.get("tiles")):
+        if not isinstance(placed, dict):
+            continue
+        position = _dict(placed.get("position"))
+        # Entity positions are tile centres, so a 1x1 entity spans one tile.
+        x = _coordinate(position.get("x", 0))
+        y = _coordinate(position.get("y", 0))
+        if x is not None and y is not None:
+            xs.append(x)
+            ys.append(y)
+
+    if not xs:
+        return 0, 0
+    return max(xs) - min(xs) + 1, max(ys) - min(ys) + 1
+
+
+def _icons(item: dict) -> list[dict]:
+    icons = []
+    entries = [icon for icon in _list(item.get("icons")) if isinstance(icon, dict)]
+    for icon in sorted(
+        entries,
+        key=lambda i: i["index"] if isinstance(i.get("index"), int) else 0,
+    ):
+        signal = _dict(icon.get("signal"))
+        name, kind = signal.get("name"), signal.get("type", "item")
+        if name and isinstance(name, str):
+            kind = kind if isinstance(kind, str) else "item"
+            icons.append({"type": kind, "name": name})
+    return icons
+
+
+def empty_summary() -> dict:
+    return {
+        "kind": "",
+        "game_version": "",
+        "label": "",
+        "entity_count": 0,
+        "tile_count": 0,
+        "width": 0,
+        "height": 0,
+        "icons": [],
+    }
+
+
+def summarize(data: dict) -> dict:
+    """Return the decoded metadata stored on ``Blueprint`` for ``data``.
+
+    Books report the totals of their blueprints and the largest footprint.
+    """
+    kind, item = next(iter(data.items()))
+    summary = empty_summary()
+    summary["kind"] = kind[:32]
+    summary["game_version"] = format_version(item.get("version"))
+    label = item.get("label")
+    summary["label"] = label[:255] if isinstance(label, str) else ""
+    summary["icons"] = _icons(item)
+
+    if kind == "blueprint_book":
+        for child in _list(item.get("blueprints")):
+            blueprint = _dict(child).get("blueprint")
+            if not isinstance(blueprint, dict):
+                continue
+            child_summary = summarize({"blueprint": blueprint})
+            summary["entity_count"] += child_summary["entity_count"]
+            summary["tile_count"] += child_summary["tile_count"]
+            summary["width"] = max(summary["width"], child_summary["width"])
+            summary["height"] = max(summary["height"], child_summary["height"])
+    elif kind == "blueprint":
+        summary["entity_count"] = len(_list(item.get("entities")))
+        summary["tile_count"] = len(_list(item.get("tiles")))
+        summary["width"], summary["height"] = _bounding_box(item)
+
+    return summary
+
+
+def book_children(data: dict) -> list[dict]:
+    """Split a decoded blueprint book into single-item documents.
+
+    Children are returned in book slot order, each as ``{kind: item}`` so it
+    can be passed to ``summarize()`` and ``encode()``. Anything that is not a
+    book has no children.
+    """
+    kind, item = next(iter(data.items()))
+    if kind != "blueprint_book":
+        return []
+
+    children = []
+    for position, child in enumerate(_list(item.get("blueprints"))):
+        if not isinstance(child, dict):
+            continue
+        child = dict(child)
+        slot = child.pop("index", position)
+        if len(child) == 1 and isinstance(next(iter(child.values())), dict):
+            children.append((slot if isinstance(slot, int) else position, child))
+    children.sort(key=lambda pair: pair[0])
+    return [child for _, child in children]
+
+
+def _requested_items(entity: dict) -> Iterator[tuple[str, int]]:
+    """Items placed into an entity, such as modules or fuel. Factorio 1.1
+    stores them as ``{name: count}``, 2.0 as a list of insert plans."""
+    items = entity.get("items")
+    if isinstance(items, dict):
+        for name, count in items.items():
+            if isinstance(count, int) and not isinstance(count, bool) and count > 0:
+                yield name, count
+    elif isinstance(items, list):
+        for request in items:
+            if not isinstance(request, dict):
+                continue
+            name = _dict(request.get("id")).get("name")
+            slots = _list(_dict(request.get("items")).get("in_inventory"))
+            if isinstance(name, str):
+                yield name, max(len(slots), 1)
+
+
+def entity_counts(data: dict) -> dict[str, int]:
+    """Count the entities and the items placed into them, by name.
+
+    Books report the totals of their blueprints.
+    """
+    kind, item = next(iter(data.items()))
+    counts = Counter()
+    if kind == "blueprint_book":
+        for child in book_children(data):
+            counts.update(entity_counts(child))
+    elif kind == "blueprint":
+        for entity in _list(item.get("entities")):
+            if not isinstance(entity, dict):
+                continue
+            if isinstance(entity.get("name"), str):
+                counts[entity["name"][:100]] += 1
+            for name, count in _requested_items(entity):
+                counts[name[:100]] += count
+    counts.pop("", None)
+    return dict(counts)
+
+
+def book_entries(data: dict) -> list[dict]:
+    """Field values of the ``BlueprintBookEntry`` rows for a decoded book."""
+    return [
+        {"index": index, "blueprint_string": encode(child), **summarize(child)}
+        for index, child in enumerate(book_children(data))
+    ]
@@ -0,0 +1,92 @@
+"""Validators for conditional GETs of the blueprint list and detail pages.
+
+The pages are rendered for the visitor, so their ETags cover the user as
+well as the versions of the blueprints shown. Likes buffered in the cache
+(see ``likes``) do not bump versions until they are flushed and are added
+separately.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from bp_manager import likes, tags
+from bp_manager.models import Blueprint
+
+
+def make_etag(request, *parts) -> str:
+    user = request.user
+    payload = json.dumps(
+        [user.pk if user.is_authenticated else None, *parts],
+        separators=(",", ":"),
+        default=str,
+    )
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def add_validators(response, etag: str, last_modified: int | None = None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def not_modified(request, etag: str, last_modified: int | None = None):
+    """A 304 response if the request's validators match, otherwise None.
+    ``last_modified`` is a timestamp."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
+
+
+def blueprint_validators(request, pk: int) -> dict | None:
+    """Version and update time of the blueprint, read once per request."""
+    rows = request.__dict__.setdefault("_blueprint_validators", {})
+    if pk not in rows:
+        rows[pk] = (
+            Blueprint.objects.filter(pk=pk).values("version", "updated_time").first()
+        )
+    return rows[pk]
+
+
+def detail_etag(request, pk: int) -> str | None:
+    row = blueprint_validators(request, pk)
+    if row is None:
+        return None
+    # The similar blueprints change without a version bump, and are rebuilt
+    # every DETAIL_CACHE_TIMEOUT seconds
+    period = int(time.time() // max(settings.DETAIL_CACHE_TIMEOUT, 1))
+    pending = likes.pending_state(request.user, [pk])
+    return make_etag(request, "detail", pk, row["version"], period, pending)
+
+
+def detail_last_modified(request, pk: int):
+    row = blueprint_validators(request, pk)
+    return row["updated_time"] if row else None
+
+
+def detail_validators(request, pk: int) -> tuple[str | None, int | None]:
+    """``detail_etag()`` and ``detail_last_modified()`` as a timestamp. The
+    detail views add them to the response themselves, only when the cached
+    detail they serve is of the current version."""
+    etag = detail_etag(request, pk)
+    updated_time = detail_last_modified(request, pk)
+    return etag, int(updated_time.timestamp()) if updated_time else None
+
+
+def list_etag(request, rows) -> str:
+    """ETag of a list page showing the ``(pk, version)`` ``rows``."""
+    pending = likes.pending_state(request.user, [pk for pk, _ in rows])
+    return make_etag(
+        request,
+        "list",
+        request.get_full_path(),
+        list(rows),
+        tags.current_generation(),
+        pending,
+    )
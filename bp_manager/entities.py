@@ -0,0 +1,23 @@
+from bp_manager import codec, similarity
+from bp_manager.models import Blueprint, BlueprintEntity
+
+# Upper bound on the names accepted by each of the has/lacks filters
+MAX_FILTER_NAMES = 10
+
+
+def sync_entities(blueprint: Blueprint, data: dict | None) -> None:
+    """Replace the entity index rows and similarity buckets of a saved
+    blueprint with those of ``data``, the decoded exchange string."""
+    counts = codec.entity_counts(data) if data is not None else {}
+    blueprint.entities.all().delete()
+    BlueprintEntity.objects.bulk_create(
+        BlueprintEntity(blueprint=blueprint, entity_name=name, count=count)
+        for name, count in counts.items()
+    )
+    similarity.sync_bands(blueprint, counts)
+
+
+def parse_names(values: list[str]) -> list[str]:
+    """Entity names from repeated and/or comma-separated query values."""
+    names = (name.strip().lower() for value in values for name in value.split(","))
+    return list(dict.fromkeys(name for name in names if name))[:MAX_FILTER_NAMES]
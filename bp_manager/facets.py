@@ -0,0 +1,56 @@
+"""Tag counts within the blueprint list's current result set.
+
+Without filters the counts are the ``Tag.usage_count`` counters. Filtered
+counts are one GROUP BY over the tag assignments of the matching
+blueprints, cached under the normalized filters and the tag generation
+(see ``bp_manager.tags``), which moves whenever tags are assigned or
+blueprints deleted. ``FACET_CACHE_TIMEOUT`` bounds how long edits that do
+not touch tags, such as a new title matching a search, take to show.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F
+
+from bp_manager import tags
+from bp_manager.models import Blueprint, Tag
+
+MAX_FACETS = 10
+
+
+def cache_key(filters: dict) -> str:
+    payload = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f"bp_manager:facets:{tags.current_generation()}:{digest}"
+
+
+def count_tags(queryset, limit: int = MAX_FACETS) -> list[dict]:
+    """The ``limit`` most used tags among the blueprints of ``queryset``."""
+    matching = queryset.order_by().values("pk")
+    return list(
+        Blueprint.tags.through.objects.filter(blueprint_id__in=matching)
+        .values(name=F("tag__name"))
+        .annotate(count=Count("blueprint_id"))
+        .order_by("-count", "name")[:limit]
+    )
+
+
+def tag_facets(queryset, filters: dict, limit: int = MAX_FACETS) -> list[dict]:
+    """``[{"name": ..., "count": ...}]`` for the list filtered by
+    ``filters`` into ``queryset``."""
+    if not filters:
+        return list(
+            Tag.objects.filter(usage_count__gt=0)
+            .order_by("-usage_count", "name")
+            .values("name", count=F("usage_count"))[:limit]
+        )
+
+    key = cache_key({**filters, "limit": limit})
+    facets = cache.get(key)
+    if facets is None:
+        facets = count_tags(queryset, limit)
+        cache.set(key, facets, settings.FACET_CACHE_TIMEOUT)
+    return facets
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from django.urls import reverse_lazy
 
+from bp_manager import books, entities, images, ranking, tags
 from bp_manager.models import Commentary, Blueprint, User, Tag
 
 
@@ -22,11 +24,36 @@ class CommentaryForm(forms.ModelForm):
         fields = ["content"]
 
 
+class TagAutocompleteWidget(forms.SelectMultiple):
+    """Renders only the selected tags; static/js/tag_autocomplete.js adds
+    more from the tag completion endpoint as the user types."""
+
+    def __init__(self, attrs=None):
+        super().__init__(
+            {
+                "size": 5,
+                "data-autocomplete-url": reverse_lazy("bp_manager:api-tag-complete"),
+                **(attrs or {}),
+            }
+        )
+
+    def optgroups(self, name, value, attrs=None):
+        pks = [pk for pk in value if str(pk).isdigit()]
+        if not pks:
+            return []
+        selected = Tag.objects.filter(pk__in=pks).order_by("name")
+        return [
+            (None, [self.create_option(name, tag.pk, tag.name, True, index)], index)
+            for index, tag in enumerate(selected)
+        ]
+
+
 class BlueprintForm(forms.ModelForm):
+    blueprint_string = forms.CharField(widget=forms.Textarea)
     existing_tags = forms.ModelMultipleChoiceField(
         queryset=Tag.objects.all(),
         required=False,
-        widget=forms.SelectMultiple(attrs={"size": 5}),
+        widget=TagAutocompleteWidget(),
     )
     new_tags = forms.CharField(
         required=False,
@@ -44,24 +71,80 @@ class BlueprintForm(forms.ModelForm):
             "new_tags",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault("blueprint_string", self.instance.blueprint_string)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        blueprint_string = cleaned_data.get("blueprint_string")
+        if blueprint_string and "blueprint_string" in self.changed_data:
+            self.instance.blueprint_string = blueprint_string
+            duplicate = self.find_duplicate()
+            if duplicate is not None:
+                self.add_error(
+                    "blueprint_string",
+                    f'You have already uploaded this blueprint as "{duplicate.title}".',
+                )
+        return cleaned_data
+
+    def find_duplicate(self) -> Blueprint | None:
+        """Another blueprint of the same user with the same content, looked
+        up by content hash."""
+        if not self.instance.user_id:
+            return None
+        return (
+            Blueprint.objects.filter(
+                payload_id=self.instance.content_hash, user_id=self.instance.user_id
+            )
+            .exclude(pk=self.instance.pk)
+            .only("title")
+            .first()
+        )
+
     def save(self, commit=True):
         instance = super().save(commit=False)
+        string_changed = "blueprint_string" in self.changed_data or not instance.pk
+        if string_changed:
+            data = instance.update_decoded_metadata()
         if commit:
             instance.save()
+            if string_changed:
+                books.sync_entries(instance, data)
+                entities.sync_entities(instance, data)
+            if "blueprint_image" in self.changed_data:
+                self.save_image_variants(instance)
 
-        existing_tags = self.cleaned_data["existing_tags"]
-        for tag in existing_tags:
-            instance.tags.add(tag)
-
-        new_tags_str = self.cleaned_data["new_tags"]
-        if new_tags_str:
-            new_tags_list = [tag.strip() for tag in new_tags_str.split(",")]
-            for tag_name in new_tags_list:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                instance.tags.add(tag)
-
+        self.save_tags(instance)
         return instance
 
+    def save_tags(self, instance):
+        """Attach the selected and new tags with a constant number of
+        queries, creating the new ones under their normalized name."""
+        tag_ids = [tag.pk for tag in self.cleaned_data["existing_tags"]]
+        tag_ids += tags.ingest(tags.parse(self.cleaned_data["new_tags"]))
+        if tag_ids:
+            instance.tags.add(*tag_ids)
+
+    @staticmethod
+    def save_image_variants(instance):
+        old_variants = instance.image_variants
+        instance.image_variants = images.generate_derivatives(
+            instance.blueprint_image.name
+        )
+        Blueprint.objects.filter(pk=instance.pk).touch(
+            image_variants=instance.image_variants
+        )
+        if old_variants:
+            images.delete_derivatives(
+                {
+                    variant: files
+                    for variant, files in old_variants.items()
+                    if files != instance.image_variants.get(variant)
+                }
+            )
+
 
 class BlueprintSearchForm(forms.Form):
     query = forms.CharField(
@@ -76,6 +159,35 @@ class BlueprintSearchForm(forms.Form):
             }
         ),
     )
+    has = forms.CharField(
+        max_length=255,
+        required=False,
+        label="",
+        widget=forms.TextInput(
+            attrs={
+                "placeholder": "Has entities, e.g. beacon",
+                "aria-label": "Has entities",
+            }
+        ),
+    )
+    lacks = forms.CharField(
+        max_length=255,
+        required=False,
+        label="",
+        widget=forms.TextInput(
+            attrs={
+                "placeholder": "Lacks entities",
+                "aria-label": "Lacks entities",
+            }
+        ),
+    )
+    sort = forms.ChoiceField(
+        choices=[(sort, sort.capitalize()) for sort in ranking.SORTS],
+        initial=ranking.DEFAULT_SORT,
+        required=False,
+        label="",
+        widget=forms.Select(attrs={"aria-label": "Sort"}),
+    )
 
 
 class UserRegistrationForm(UserCreationForm):
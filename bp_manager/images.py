@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import posixpath
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Target widths of the derivatives, chosen for the list grid and the
+# detail page columns at 1x/2x density. Images are never upscaled.
+VARIANTS = {
+    "card": 400,
+    "detail": 1000,
+}
+
+# Matches names produced by derivative_name()
+DERIVATIVE_NAME_RE = re.compile(
+    r"\.(?:%s)\.[0-9a-f]{12}\.(?:webp|png|jpg)$" % "|".join(VARIANTS)
+)
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+def derivative_name(name: str, variant: str, digest: str, extension: str) -> str:
+    """Derivatives live next to the original and embed a content digest,
+    so their URLs never change meaning and can be cached forever."""
+    directory, filename = posixpath.split(name)
+    stem = filename.rsplit(".", 1)[0]
+    return posixpath.join(directory, f"{stem}.{variant}.{digest}.{extension}")
+
+
+def _fallback_format(image: Image.Image) -> tuple[str, str]:
+    if image.mode in ("RGBA", "LA", "P") or "transparency" in image.info:
+        return "PNG", "png"
+    return "JPEG", "jpg"
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = BytesIO()
+    if image_format == "WEBP":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif image_format == "JPEG":
+        image.convert("RGB").save(
+            buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+        )
+    else:
+        image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name: str, storage=default_storage) -> dict:
+    """Write resized PNG/JPEG and WebP copies of the image stored as ``name``.
+
+    Returns the ``Blueprint.image_variants`` mapping, or an empty dict when
+    the file cannot be read as an image.
+    """
+    try:
+        with storage.open(name, "rb") as original:
+            data = original.read()
+        image = Image.open(BytesIO(data))
+        image.load()
+    except (OSError, UnidentifiedImageError) as error:
+        logger.warning("Cannot generate derivatives for %s: %s", name, error)
+        return {}
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    fallback_format, fallback_extension = _fallback_format(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if fallback_format == "PNG" else "RGB")
+
+    variants = {"width": image.width, "height": image.height}
+    for variant, width in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+
+        files = {}
+        for image_format, extension in (
+            ("WEBP", "webp"),
+            (fallback_format, fallback_extension),
+        ):
+            target = derivative_name(name, variant, digest, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            files[extension] = storage.save(
+                target, ContentFile(_encode(resized, image_format))
+            )
+
+        variants[variant] = {
+            "width": resized.width,
+            "height": resized.height,
+            "webp": files["webp"],
+            "fallback": files[fallback_extension],
+        }
+    return variants
+
+
+def delete_derivatives(variants: dict, storage=default_storage) -> None:
+    for variant in VARIANTS:
+        for key in ("webp", "fallback"):
+            name = (variants.get(variant) or {}).get(key)
+            if name and storage.exists(name):
+                storage.delete(name)
@@ -0,0 +1,279 @@
+"""Likes, written directly or through a write-behind buffer.
+
+With ``LIKE_BUFFER`` off every like is its own transaction (see
+``LikeQuerySet.set_liked``). With it on, liking only touches the cache:
+
+* the change is appended to a journal of ``bp_manager:likes:entry:<seq>``
+  keys, numbered by an atomic counter;
+* ``bp_manager:likes:state:<user>:<blueprint>`` holds the user's latest
+  state, so they see it before it reaches the database;
+* ``bp_manager:likes:delta:<blueprint>`` sums the count changes not yet in
+  the database, which reads add to ``like_count``.
+
+``flush()`` applies the journal in one transaction per batch: the changes
+of a user to a blueprint are coalesced to the last one, likes are
+bulk-inserted, unlikes bulk-deleted and every blueprint's counters updated
+once. Each process recording likes flushes from a background thread every
+``LIKE_BUFFER_FLUSH_INTERVAL`` seconds; with the interval at 0 the
+``flush_likes`` command has to be run instead.
+
+The journal only lives in the cache, which must be shared by all
+processes and must not evict keys (e.g. Redis without an eviction policy),
+or buffered likes are lost.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+from bp_manager import ranking
+from bp_manager.models import Blueprint, Like, User
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = "bp_manager:likes:sequence"
+FLUSHED_KEY = "bp_manager:likes:flushed"
+GAP_KEY = "bp_manager:likes:gap"
+LOCK_KEY = "bp_manager:likes:lock"
+ENTRY_KEY = "bp_manager:likes:entry:{}"
+STATE_KEY = "bp_manager:likes:state:{}:{}"
+DELTA_KEY = "bp_manager:likes:delta:{}"
+
+FLUSH_BATCH_SIZE = 1000
+LOCK_TIMEOUT = 60
+# States only have to outlive the flush that writes them to the database
+STATE_TIMEOUT = 24 * 60 * 60
+
+
+def buffered() -> bool:
+    return settings.LIKE_BUFFER
+
+
+def _incr(key: str, delta: int) -> int:
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def is_liked(user: User, blueprint_id: int) -> bool:
+    if buffered():
+        state = cache.get(STATE_KEY.format(user.pk, blueprint_id))
+        if state is not None:
+            return state
+    return Like.objects.filter(user=user, blueprint_id=blueprint_id).exists()
+
+
+def merge_liked(user: User, blueprint_ids, liked_ids) -> set:
+    """``liked_ids`` read from the database, amended with the user's
+    unflushed changes to ``blueprint_ids``."""
+    liked_ids = set(liked_ids)
+    if not buffered():
+        return liked_ids
+    keys = {STATE_KEY.format(user.pk, pk): pk for pk in blueprint_ids}
+    for key, liked in cache.get_many(keys).items():
+        if liked:
+            liked_ids.add(keys[key])
+        else:
+            liked_ids.discard(keys[key])
+    return liked_ids
+
+
+def pending_counts(blueprint_ids) -> dict[int, int]:
+    """Like count changes of ``blueprint_ids`` not flushed yet."""
+    if not buffered():
+        return {}
+    keys = {DELTA_KEY.format(pk): pk for pk in blueprint_ids}
+    return {keys[key]: delta for key, delta in cache.get_many(keys).items() if delta}
+
+
+def pending_state(user: User, blueprint_ids) -> list:
+    """The unflushed changes behind what ``user`` sees of ``blueprint_ids``,
+    for validators. Empty when likes are not buffered."""
+    if not buffered():
+        return []
+    counts = pending_counts(blueprint_ids)
+    states = {}
+    if user.is_authenticated:
+        keys = {STATE_KEY.format(user.pk, pk): pk for pk in blueprint_ids}
+        states = {keys[key]: liked for key, liked in cache.get_many(keys).items()}
+    return sorted(
+        (pk, counts.get(pk, 0), states.get(pk)) for pk in counts.keys() | states.keys()
+    )
+
+
+def add_pending_counts(blueprints) -> None:
+    """Add the unflushed changes to the ``like_count`` of ``blueprints``."""
+    deltas = pending_counts([blueprint.pk for blueprint in blueprints])
+    for blueprint in blueprints:
+        blueprint.like_count += deltas.get(blueprint.pk, 0)
+
+
+def set_liked(user: User, blueprint_id: int, liked: bool) -> int:
+    """Like or unlike the blueprint, returns its like count afterwards.
+    Raises ``Blueprint.DoesNotExist`` when there is no such blueprint."""
+    if not buffered():
+        return Like.objects.set_liked(user, blueprint_id, liked)
+    like_count = Blueprint.objects.values_list("like_count", flat=True).get(
+        pk=blueprint_id
+    )
+    if is_liked(user, blueprint_id) != liked:
+        record(user.pk, blueprint_id, liked)
+    return like_count + pending_counts([blueprint_id]).get(blueprint_id, 0)
+
+
+def toggle(user: User, blueprint_id: int) -> bool:
+    """Like or unlike the blueprint, returns whether it is now liked."""
+    if not buffered():
+        return Like.objects.toggle(user, blueprint_id)
+    liked = not is_liked(user, blueprint_id)
+    record(user.pk, blueprint_id, liked)
+    return liked
+
+
+def record(user_id: int, blueprint_id: int, liked: bool) -> None:
+    """Journal a change of the like state. Only call it when the state
+    actually changes, the pending count is adjusted by one."""
+    delta = 1 if liked else -1
+    sequence = _incr(SEQUENCE_KEY, 1)
+    cache.set(ENTRY_KEY.format(sequence), (user_id, blueprint_id, liked, delta), None)
+    cache.set(STATE_KEY.format(user_id, blueprint_id), liked, STATE_TIMEOUT)
+    _incr(DELTA_KEY.format(blueprint_id), delta)
+    if settings.LIKE_BUFFER_FLUSH_INTERVAL > 0:
+        start_flusher(settings.LIKE_BUFFER_FLUSH_INTERVAL)
+
+
+def _apply(latest: dict[tuple[int, int], bool]) -> None:
+    """Write the final like state of each ``(user, blueprint)`` pair."""
+    with transaction.atomic():
+        # Likes of users or blueprints deleted since are dropped
+        user_ids = set(
+            User.objects.filter(pk__in={user_id for user_id, _ in latest}).values_list(
+                "pk", flat=True
+            )
+        )
+        blueprint_ids = set(
+            Blueprint.objects.filter(
+                pk__in={blueprint_id for _, blueprint_id in latest}
+            ).values_list("pk", flat=True)
+        )
+        existing = {
+            (like.user_id, like.blueprint_id): like
+            for like in Like.objects.filter(
+                user_id__in=user_ids, blueprint_id__in=blueprint_ids
+            ).only("user_id", "blueprint_id", "created_time")
+        }
+
+        created = [
+            Like(user_id=user_id, blueprint_id=blueprint_id)
+            for (user_id, blueprint_id), liked in latest.items()
+            if liked
+            and (user_id, blueprint_id) not in existing
+            and user_id in user_ids
+            and blueprint_id in blueprint_ids
+        ]
+        removed = [like for pair, like in existing.items() if latest.get(pair) is False]
+        Like.objects.bulk_create(created)
+        Like.objects.filter(pk__in=[like.pk for like in removed]).delete()
+
+        changes = defaultdict(lambda: [0, 0.0])
+        for sign, likes in ((1, created), (-1, removed)):
+            for like in likes:
+                change = changes[like.blueprint_id]
+                change[0] += sign
+                change[1] += sign * ranking.weight_at(
+                    like.created_time, ranking.LIKE_WEIGHT
+                )
+        for blueprint_id, (likes, trending) in changes.items():
+            Blueprint.objects.filter(pk=blueprint_id).adjust_counts(
+                likes=likes, trending=trending
+            )
+
+
+def _flush_batch(batch_size: int) -> int:
+    """Flush up to ``batch_size`` journal entries, returns how many
+    sequence numbers were consumed."""
+    flushed = cache.get(FLUSHED_KEY, 0)
+    last = min(cache.get(SEQUENCE_KEY, 0), flushed + batch_size)
+    if last <= flushed:
+        return 0
+
+    keys = [ENTRY_KEY.format(sequence) for sequence in range(flushed + 1, last + 1)]
+    found = cache.get_many(keys)
+    entries = []
+    for sequence, key in enumerate(keys, flushed + 1):
+        if key in found:
+            entries.append(found[key])
+        elif cache.get(GAP_KEY) != sequence:
+            # Numbered but not written yet. Wait for it until the next flush;
+            # if it is still missing then, its writer died and it is skipped.
+            cache.set(GAP_KEY, sequence, None)
+            last = sequence - 1
+            break
+
+    latest = {}
+    deltas = defaultdict(int)
+    for user_id, blueprint_id, liked, delta in entries:
+        latest[user_id, blueprint_id] = liked
+        deltas[blueprint_id] += delta
+    if latest:
+        _apply(latest)
+
+    cache.set(FLUSHED_KEY, last, None)
+    for blueprint_id, delta in deltas.items():
+        if delta:
+            _incr(DELTA_KEY.format(blueprint_id), -delta)
+    cache.delete_many(keys[: last - flushed])
+    return last - flushed
+
+
+def flush(batch_size: int = FLUSH_BATCH_SIZE) -> int:
+    """Write the journaled likes to the database, returns how many journal
+    entries were consumed. Does nothing while another process flushes."""
+    if not cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return 0
+    try:
+        total = 0
+        while True:
+            consumed = _flush_batch(batch_size)
+            total += consumed
+            if consumed < batch_size:
+                return total
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+_flusher: threading.Thread | None = None
+_flusher_lock = threading.Lock()
+
+
+def _run_flusher(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception("Flushing buffered likes failed")
+        finally:
+            close_old_connections()
+
+
+def start_flusher(interval: float) -> None:
+    """Start this process's background flusher unless it is running."""
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(
+                target=_run_flusher,
+                args=(interval,),
+                name="like-flusher",
+                daemon=True,
+            )
+            _flusher.start()
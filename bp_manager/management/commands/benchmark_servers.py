@@ -0,0 +1,143 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = {
+    "gunicorn": (
+        ["-m", "gunicorn", "factorio_blueprint_library.wsgi", "--bind"],
+        {"ASYNC_VIEWS": "False"},
+    ),
+    "uvicorn": (
+        ["-m", "uvicorn", "factorio_blueprint_library.asgi:application", "--host"],
+        {"ASYNC_VIEWS": "True"},
+    ),
+}
+
+
+def _command(server: str, host: str, port: int, workers: int) -> list[str]:
+    args, _ = SERVERS[server]
+    if server == "gunicorn":
+        address = [f"{host}:{port}"]
+    else:
+        address = [host, "--port", str(port), "--log-level", "warning"]
+    return [sys.executable, *args, *address, "--workers", str(workers)]
+
+
+def _fetch(url: str) -> float | None:
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+    except (urllib.error.URLError, OSError):
+        return None
+    return time.perf_counter() - started
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with code {process.returncode}.")
+        if _fetch(url) is not None:
+            return
+        time.sleep(0.2)
+    raise CommandError(f"Server did not answer {url} within {timeout}s.")
+
+
+def _load(urls: list[str], concurrency: int, duration: float) -> tuple[list, int]:
+    deadline = time.monotonic() + duration
+
+    def worker(offset: int) -> tuple[list, int]:
+        latencies, errors, i = [], 0, offset
+        while time.monotonic() < deadline:
+            latency = _fetch(urls[i % len(urls)])
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+            i += 1
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    return [lat for lats, _ in results for lat in lats], sum(e for _, e in results)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI (gunicorn, sync views) and ASGI (uvicorn, async views) "
+        "throughput by starting each server against the configured database "
+        "and replaying GET requests for a fixed duration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            default=["/"],
+            help="Request paths to cycle through (default: the blueprint list).",
+        )
+        parser.add_argument(
+            "--servers",
+            default=",".join(SERVERS),
+            help="Comma-separated servers to benchmark.",
+        )
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--warmup", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        servers = [name.strip() for name in options["servers"].split(",")]
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f"Unknown servers: {', '.join(sorted(unknown))}.")
+
+        base = f"http://{options['host']}:{options['port']}"
+        urls = [base + path for path in options["paths"]]
+
+        for server in servers:
+            env = {**os.environ, **SERVERS[server][1]}
+            process = subprocess.Popen(
+                _command(server, options["host"], options["port"], options["workers"]),
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_until_ready(urls[0], process, timeout=30)
+                _load(urls, options["concurrency"], options["warmup"])
+                latencies, errors = _load(
+                    urls, options["concurrency"], options["duration"]
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+            self.report(server, latencies, errors, options["duration"])
+
+    def report(self, server, latencies, errors, duration):
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{server}: no successful requests"))
+            return
+        latencies.sort()
+
+        def percentile(p):
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+
+        self.stdout.write(
+            f"{server:<10} {len(latencies) / duration:8.1f} req/s  "
+            f"p50 {percentile(0.5) * 1000:7.1f} ms  "
+            f"p95 {percentile(0.95) * 1000:7.1f} ms  "
+            f"mean {statistics.fmean(latencies) * 1000:7.1f} ms  "
+            f"errors {errors}"
+        )
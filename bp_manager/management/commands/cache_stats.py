@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from bp_manager import cache
+
+
+class Command(BaseCommand):
+    help = "Show hit and miss counters of the bp_manager caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters to zero."
+        )
+
+    def handle(self, *args, **options):
+        stats = cache.get_stats()
+        for name in ("card", "detail"):
+            hits, misses = stats[f"{name}_hits"], stats[f"{name}_misses"]
+            total = hits + misses
+            ratio = f"{hits / total:.1%}" if total else "n/a"
+            self.stdout.write(f"{name}: {hits} hits, {misses} misses ({ratio})")
+        self.stdout.write(f"detail: {stats['detail_stale']} stale entries served")
+
+        if options["reset"]:
+            cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bp_manager import likes
+
+
+class Command(BaseCommand):
+    help = (
+        "Write likes buffered with LIKE_BUFFER to the database. Run it "
+        "periodically when LIKE_BUFFER_FLUSH_INTERVAL is 0."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=likes.FLUSH_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        flushed = likes.flush(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} buffered likes."))
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from bp_manager import images
+from bp_manager.models import Blueprint
+
+
+def _generate(pk: int, name: str) -> tuple[int, dict]:
+    return pk, images.generate_derivatives(name)
+
+
+class Command(BaseCommand):
+    help = "Generate resized and WebP copies of uploaded blueprint images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate derivatives that already exist.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    @staticmethod
+    def save(blueprints: list[Blueprint]) -> None:
+        Blueprint.objects.bulk_update(blueprints, ["image_variants"])
+        # Cached cards and detail pages are keyed by the version
+        Blueprint.objects.filter(pk__in=[b.pk for b in blueprints]).touch()
+
+    def handle(self, *args, **options):
+        queryset = Blueprint.objects.exclude(blueprint_image="")
+        if not options["force"]:
+            queryset = queryset.filter(image_variants={})
+        pending = list(queryset.values_list("pk", "blueprint_image"))
+
+        updated = []
+        failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=django.setup
+        ) as executor:
+            futures = [executor.submit(_generate, pk, name) for pk, name in pending]
+            for future in as_completed(futures):
+                pk, variants = future.result()
+                if not variants:
+                    failed += 1
+                    continue
+                updated.append(Blueprint(pk=pk, image_variants=variants))
+                if len(updated) >= options["batch_size"]:
+                    self.save(updated)
+                    updated = []
+
+        self.save(updated)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated derivatives for {len(pending) - failed} images, "
+                f"{failed} failed."
+            )
+        )
@@ -0,0 +1,343 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bp_manager import codec, search, similarity, tags
+from bp_manager.models import (
+    Blueprint,
+    BlueprintBand,
+    BlueprintBookEntry,
+    BlueprintEntity,
+    BlueprintPayload,
+    Tag,
+    User,
+)
+
+TITLE_MAX_LENGTH = Blueprint._meta.get_field("title").max_length
+
+
+def iter_records(source: Path):
+    """Yield import records from a JSON-lines file or a directory.
+
+    Directories are walked in name order: ``*.jsonl`` files are read line by
+    line, any other file is taken as a single blueprint string titled after
+    the file name.
+    """
+    if source.is_dir():
+        for path in sorted(p for p in source.rglob("*") if p.is_file()):
+            yield from iter_records(path)
+    elif source.suffix == ".jsonl":
+        with source.open(encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                yield record if isinstance(record, dict) else {}
+    else:
+        yield {
+            "blueprint_string": source.read_text(encoding="utf-8"),
+            "title": source.stem,
+        }
+
+
+def _decode(blueprint_string) -> tuple[dict | None, dict, str | None]:
+    """Return the decoded ``Blueprint`` field values of a string and the
+    values of its related rows, or an error."""
+    if not isinstance(blueprint_string, str):
+        return None, {}, "missing blueprint_string"
+    try:
+        data = codec.decode(blueprint_string)
+    except codec.BlueprintDecodeError as error:
+        return None, {}, str(error)
+    try:
+        fields = {**codec.summarize(data), "payload_id": codec.content_hash(data)}
+        counts = codec.entity_counts(data)
+        related = {
+            "entries": codec.book_entries(data),
+            "entities": counts,
+            "buckets": similarity.buckets(counts),
+        }
+    except Exception as error:
+        # One record with contents nothing expected must not abort the import
+        return None, {}, f"invalid blueprint contents: {error!r}"
+    return fields, related, None
+
+
+def _tag_names(record: dict) -> list[str]:
+    names = record.get("tags") or []
+    if not isinstance(names, list):
+        return []
+    names = (Tag.normalize(name) for name in names)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class Command(BaseCommand):
+    help = (
+        "Import blueprints from a JSON-lines file or a directory. Each record "
+        'holds "blueprint_string" and optionally "title", "description", '
+        '"tags" and "author". Strings are decoded in worker processes, rows are '
+        "inserted in batches, and progress is checkpointed so an interrupted "
+        "import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=Path)
+        parser.add_argument(
+            "--user",
+            help="Username to attribute records without an author to.",
+        )
+        parser.add_argument(
+            "--create-users",
+            action="store_true",
+            help="Create unknown authors with an unusable password.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of decoding processes, 0 decodes in this process.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            help="Checkpoint file (default: <source>.checkpoint).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and import from the start.",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"]).resolve()
+        if not source.exists():
+            raise CommandError(f"{source} does not exist.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        self.options = options
+        self.default_author = None
+        if options["user"]:
+            try:
+                self.default_author = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        self.checkpoint_path = Path(
+            options["checkpoint"] or source.with_name(source.name + ".checkpoint")
+        )
+        self.state = {
+            "source": str(source),
+            "position": 0,
+            "imported": 0,
+            "rejected": 0,
+        }
+        if not options["restart"]:
+            self.load_checkpoint(source)
+        if self.state["position"]:
+            self.stdout.write(f"Resuming after record {self.state['position']}.")
+
+        records = islice(iter_records(source), self.state["position"], None)
+        started = time.monotonic()
+        imported = self.state["imported"]
+
+        if options["workers"] > 0:
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=django.setup
+            ) as executor:
+                chunksize = max(1, options["batch_size"] // (options["workers"] * 4))
+                self.run(records, partial(executor.map, chunksize=chunksize))
+        else:
+            self.run(records, map)
+
+        elapsed = time.monotonic() - started
+        tags.tags_changed()
+        imported = self.state["imported"] - imported
+        self.checkpoint_path.unlink(missing_ok=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} blueprints in {elapsed:.1f}s "
+                f"({imported / max(elapsed, 1e-9):.0f} blueprints/s), "
+                f"{self.state['rejected']} records rejected in total."
+            )
+        )
+
+    def run(self, records, map_function):
+        """Decode the next batch while the previous one is being inserted."""
+        pending = None
+        while batch := list(islice(records, self.options["batch_size"])):
+            strings = [record.get("blueprint_string") for record in batch]
+            summaries = map_function(_decode, strings)
+            if pending:
+                self.insert(*pending)
+            pending = (batch, summaries)
+        if pending:
+            self.insert(*pending)
+
+    def reject(self, position: int, error: str):
+        self.state["rejected"] += 1
+        if self.options["verbosity"] >= 2:
+            self.stderr.write(f"Record {position}: {error}")
+
+    def insert(self, batch, decoded):
+        position = self.state["position"]
+        rows = []
+        for offset, (record, (fields, related, error)) in enumerate(
+            zip(batch, decoded)
+        ):
+            if error is None and not (record.get("author") or self.default_author):
+                error = "no author and no --user given"
+            if error is None:
+                rows.append((position + offset + 1, record, fields, related))
+            else:
+                self.reject(position + offset + 1, error)
+
+        with transaction.atomic():
+            authors = self.resolve_authors([row[1] for row in rows])
+            # Users cannot own the same content twice, see BlueprintForm.clean()
+            owned = set(
+                Blueprint.objects.filter(
+                    payload_id__in={row[2]["payload_id"] for row in rows}
+                ).values_list("user_id", "payload_id")
+            )
+            valid = []
+            for (record_position, record, fields, related), author in zip(
+                rows, authors
+            ):
+                if author is None:
+                    self.reject(record_position, f"unknown author {record['author']}")
+                elif (author.pk, fields["payload_id"]) in owned:
+                    self.reject(
+                        record_position, f"duplicate of a blueprint by {author}"
+                    )
+                else:
+                    owned.add((author.pk, fields["payload_id"]))
+                    valid.append((record, fields, related, author))
+
+            BlueprintPayload.objects.bulk_create(
+                [
+                    BlueprintPayload(
+                        content_hash=fields["payload_id"],
+                        blueprint_string=record["blueprint_string"],
+                    )
+                    for record, fields, _, _ in valid
+                ],
+                ignore_conflicts=True,
+            )
+
+            blueprints = Blueprint.objects.bulk_create(
+                [
+                    self.build(record, fields, author)
+                    for record, fields, _, author in valid
+                ]
+            )
+            self.add_tags(blueprints, [record for record, _, _, _ in valid])
+            self.add_related(blueprints, [related for _, _, related, _ in valid])
+            search.get_backend().index(blueprint.pk for blueprint in blueprints)
+
+        self.state["position"] += len(batch)
+        self.state["imported"] += len(blueprints)
+        self.save_checkpoint()
+        if self.options["verbosity"] >= 2:
+            self.stdout.write(
+                f"{self.state['position']} records read, "
+                f"{self.state['imported']} imported."
+            )
+
+    @staticmethod
+    def add_related(blueprints, related):
+        BlueprintBookEntry.objects.bulk_create(
+            BlueprintBookEntry(book=blueprint, **values)
+            for blueprint, rows in zip(blueprints, related)
+            for values in rows["entries"]
+        )
+        BlueprintEntity.objects.bulk_create(
+            BlueprintEntity(blueprint=blueprint, entity_name=name, count=count)
+            for blueprint, rows in zip(blueprints, related)
+            for name, count in rows["entities"].items()
+        )
+        BlueprintBand.objects.bulk_create(
+            BlueprintBand(blueprint=blueprint, bucket=bucket)
+            for blueprint, rows in zip(blueprints, related)
+            for bucket in rows["buckets"]
+        )
+
+    def resolve_authors(self, records) -> list[User | None]:
+        names = {str(record["author"]) for record in records if record.get("author")}
+        users = User.objects.in_bulk(names, field_name="username") if names else {}
+        missing = names - users.keys()
+        if missing and self.options["create_users"]:
+            User.objects.bulk_create(
+                [User(username=name, password=make_password(None)) for name in missing],
+                ignore_conflicts=True,
+            )
+            users = User.objects.in_bulk(names, field_name="username")
+
+        return [
+            (
+                users.get(str(record["author"]))
+                if record.get("author")
+                else self.default_author
+            )
+            for record in records
+        ]
+
+    def build(self, record, fields, author) -> Blueprint:
+        title = str(record.get("title") or fields["label"] or "Imported blueprint")
+        return Blueprint(
+            user=author,
+            title=title[:TITLE_MAX_LENGTH],
+            description=str(record.get("description") or ""),
+            **fields,
+        )
+
+    def add_tags(self, blueprints, records):
+        tag_names = [_tag_names(record) for record in records]
+        names = {name for names in tag_names for name in names}
+        if not names:
+            return
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+        through = Blueprint.tags.through
+        through.objects.bulk_create(
+            [
+                through(blueprint_id=blueprint.pk, tag_id=tag_ids[name])
+                for blueprint, names in zip(blueprints, tag_names)
+                for name in names
+            ]
+        )
+        Tag.objects.filter(pk__in=tag_ids.values()).recount()
+
+    def load_checkpoint(self, source: Path):
+        try:
+            state = json.loads(self.checkpoint_path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as error:
+            raise CommandError(f"Cannot read checkpoint: {error}")
+        if state.get("source") != str(source):
+            raise CommandError(
+                f"Checkpoint {self.checkpoint_path} belongs to {state.get('source')}, "
+                f"use --restart or another --checkpoint."
+            )
+        self.state.update(state)
+
+    def save_checkpoint(self):
+        temporary = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        temporary.write_text(json.dumps(self.state))
+        os.replace(temporary, self.checkpoint_path)
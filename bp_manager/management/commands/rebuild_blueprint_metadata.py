@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bp_manager import books, codec, search
+from bp_manager.models import Blueprint, BlueprintBookEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Decode the stored blueprint strings again into the metadata columns "
+        "and book entries, e.g. after loading a fixture of raw payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    @staticmethod
+    def rebuild(blueprints: list[Blueprint]) -> int:
+        """Rebuild a batch, returns how many strings could not be decoded."""
+        entries = []
+        skipped = 0
+        for blueprint in blueprints:
+            data = blueprint.update_decoded_metadata()
+            skipped += data is None
+            entries.extend(books.build_entries(blueprint, data))
+
+        ids = [blueprint.pk for blueprint in blueprints]
+        with transaction.atomic():
+            Blueprint.objects.bulk_update(blueprints, list(codec.empty_summary()))
+            BlueprintBookEntry.objects.filter(book_id__in=ids).delete()
+            BlueprintBookEntry.objects.bulk_create(entries)
+            Blueprint.objects.filter(pk__in=ids).touch()
+        # Entry labels are part of the book's search document
+        search.get_backend().index(ids)
+        return skipped
+
+    def handle(self, *args, **options):
+        queryset = Blueprint.objects.select_related("payload").order_by("pk")
+        total = skipped = 0
+        batch = []
+        for blueprint in queryset.iterator(chunk_size=options["batch_size"]):
+            batch.append(blueprint)
+            if len(batch) >= options["batch_size"]:
+                skipped += self.rebuild(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            skipped += self.rebuild(batch)
+            total += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt metadata of {total - skipped} blueprints, "
+                f"skipped {skipped} undecodable strings."
+            )
+        )
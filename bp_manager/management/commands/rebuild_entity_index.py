@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bp_manager import codec, similarity
+from bp_manager.models import Blueprint, BlueprintBand, BlueprintEntity
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the entity index used by the has/lacks list filters and the "
+        "similar blueprint buckets from the stored blueprint strings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        rows = Blueprint.objects.values_list("pk", "payload__blueprint_string")
+        indexed = skipped = 0
+        with transaction.atomic():
+            BlueprintEntity.objects.all().delete()
+            BlueprintBand.objects.all().delete()
+            entities, bands = [], []
+            for pk, blueprint_string in rows.iterator(chunk_size=options["batch_size"]):
+                try:
+                    data = codec.decode(blueprint_string or "")
+                except codec.BlueprintDecodeError:
+                    skipped += 1
+                    continue
+                counts = codec.entity_counts(data)
+                entities.extend(
+                    BlueprintEntity(blueprint_id=pk, entity_name=name, count=count)
+                    for name, count in counts.items()
+                )
+                bands.extend(
+                    BlueprintBand(blueprint_id=pk, bucket=bucket)
+                    for bucket in similarity.buckets(counts)
+                )
+                indexed += 1
+                if len(entities) >= options["batch_size"]:
+                    BlueprintEntity.objects.bulk_create(entities)
+                    BlueprintBand.objects.bulk_create(bands)
+                    entities, bands = [], []
+            BlueprintEntity.objects.bulk_create(entities)
+            BlueprintBand.objects.bulk_create(bands)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed entities of {indexed} blueprints, "
+                f"skipped {skipped} undecodable strings."
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bp_manager.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the blueprint full-text search index from scratch."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt search index ({type(backend).__name__}).")
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from bp_manager.models import Blueprint, Commentary, Like, Tag
+
+
+def count_subquery(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(blueprint=OuterRef("pk"))
+            .order_by()
+            .values("blueprint")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized like and comment counters on blueprints "
+        "and the usage counters on tags."
+    )
+
+    def handle(self, *args, **options):
+        updated = Blueprint.objects.update(
+            like_count=count_subquery(Like),
+            comment_count=count_subquery(Commentary),
+        )
+        tags = Tag.objects.recount()
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted {updated} blueprints and {tags} tags.")
+        )
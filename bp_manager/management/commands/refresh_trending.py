@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bp_manager import ranking
+from bp_manager.models import Blueprint, Commentary, Like
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the trending scores of all blueprints from their likes and "
+        "comments. Run periodically to correct drift and after moving "
+        "ranking.EPOCH."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        scores = defaultdict(float)
+        for model, weight in (
+            (Like, ranking.LIKE_WEIGHT),
+            (Commentary, ranking.COMMENT_WEIGHT),
+        ):
+            for blueprint_id, created_time in model.objects.values_list(
+                "blueprint_id", "created_time"
+            ).iterator():
+                scores[blueprint_id] += ranking.weight_at(created_time, weight)
+
+        with transaction.atomic():
+            Blueprint.objects.update(trending_score=0.0)
+            Blueprint.objects.bulk_update(
+                [
+                    Blueprint(pk=pk, trending_score=score)
+                    for pk, score in scores.items()
+                ],
+                ["trending_score"],
+                batch_size=options["batch_size"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed trending scores of {len(scores)} blueprints."
+            )
+        )
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:44
+
+from django.db import migrations, models
+
+from bp_manager import codec
+
+
+def decode_existing_blueprints(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    # summarize() may return fields added by later migrations
+    fields = {field.name for field in Blueprint._meta.get_fields()}
+    for blueprint in Blueprint.objects.iterator():
+        try:
+            summary = codec.summarize(codec.decode(blueprint.blueprint_string))
+        except codec.BlueprintDecodeError:
+            continue
+        summary = {key: value for key, value in summary.items() if key in fields}
+        for field, value in summary.items():
+            setattr(blueprint, field, value)
+        blueprint.save(update_fields=list(summary))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="entity_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="game_version",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="height",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="icons",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="label",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="tile_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="width",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(decode_existing_blueprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_blueprints(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+
+    def count_subquery(model_name):
+        model = apps.get_model("bp_manager", model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(blueprint=OuterRef("pk"))
+                .order_by()
+                .values("blueprint")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    Blueprint.objects.update(
+        like_count=count_subquery("Like"),
+        comment_count=count_subquery("Commentary"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0002_blueprint_decoded_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(recount_blueprints, migrations.RunPython.noop),
+    ]
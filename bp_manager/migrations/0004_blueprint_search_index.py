@@ -0,0 +1,60 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS bp_manager_blueprint_fts USING fts5("
+    "title, description, tags, author, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO bp_manager_blueprint_fts (rowid, title, description, tags, author) "
+    "SELECT b.id, b.title, b.description, "
+    "COALESCE((SELECT group_concat(t.name, ' ') FROM bp_manager_tag t "
+    "JOIN bp_manager_blueprint_tags bt ON bt.tag_id = t.id "
+    "WHERE bt.blueprint_id = b.id), ''), u.username "
+    "FROM bp_manager_blueprint b JOIN bp_manager_user u ON u.id = b.user_id",
+]
+
+SQLITE_BACKWARD = ["DROP TABLE IF EXISTS bp_manager_blueprint_fts"]
+
+POSTGRES_FORWARD = [
+    "CREATE TABLE bp_manager_blueprint_search ("
+    "blueprint_id bigint PRIMARY KEY "
+    "REFERENCES bp_manager_blueprint (id) ON DELETE CASCADE, "
+    "search_vector tsvector NOT NULL)",
+    "CREATE INDEX bp_manager_blueprint_search_vector_gin "
+    "ON bp_manager_blueprint_search USING GIN (search_vector)",
+    "INSERT INTO bp_manager_blueprint_search (blueprint_id, search_vector) "
+    "SELECT b.id, "
+    "setweight(to_tsvector('simple', b.title), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE((SELECT string_agg(t.name, ' ') "
+    "FROM bp_manager_tag t JOIN bp_manager_blueprint_tags bt ON bt.tag_id = t.id "
+    "WHERE bt.blueprint_id = b.id), '')), 'B') || "
+    "setweight(to_tsvector('simple', u.username), 'B') || "
+    "setweight(to_tsvector('simple', b.description), 'C') "
+    "FROM bp_manager_blueprint b JOIN bp_manager_user u ON u.id = b.user_id",
+]
+
+POSTGRES_BACKWARD = ["DROP TABLE IF EXISTS bp_manager_blueprint_search"]
+
+
+def run_for_vendor(sqlite_statements, postgres_statements):
+    def run(apps, schema_editor):
+        statements = {
+            "sqlite": sqlite_statements,
+            "postgresql": postgres_statements,
+        }.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0003_blueprint_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(SQLITE_FORWARD, POSTGRES_FORWARD),
+            run_for_vendor(SQLITE_BACKWARD, POSTGRES_BACKWARD),
+        ),
+    ]
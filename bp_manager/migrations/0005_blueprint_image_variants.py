@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0004_blueprint_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
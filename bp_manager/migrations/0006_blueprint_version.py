@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0005_blueprint_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
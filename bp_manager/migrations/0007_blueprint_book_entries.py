@@ -0,0 +1,74 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from bp_manager import codec
+
+
+def explode_existing_books(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    BlueprintBookEntry = apps.get_model("bp_manager", "BlueprintBookEntry")
+    for blueprint in Blueprint.objects.iterator():
+        try:
+            data = codec.decode(blueprint.blueprint_string)
+        except codec.BlueprintDecodeError:
+            continue
+        blueprint.kind = codec.summarize(data)["kind"]
+        blueprint.save(update_fields=["kind"])
+        BlueprintBookEntry.objects.bulk_create(
+            BlueprintBookEntry(book=blueprint, **values)
+            for values in codec.book_entries(data)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0006_blueprint_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="kind",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.CreateModel(
+            name="BlueprintBookEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(blank=True, max_length=32)),
+                ("game_version", models.CharField(blank=True, max_length=32)),
+                ("label", models.CharField(blank=True, max_length=255)),
+                ("entity_count", models.PositiveIntegerField(default=0)),
+                ("tile_count", models.PositiveIntegerField(default=0)),
+                ("width", models.PositiveIntegerField(default=0)),
+                ("height", models.PositiveIntegerField(default=0)),
+                ("icons", models.JSONField(blank=True, default=list)),
+                ("index", models.PositiveIntegerField()),
+                ("blueprint_string", models.TextField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="book_entries",
+                        to="bp_manager.blueprint",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["book", "index"],
+                "unique_together": {("book", "index")},
+            },
+        ),
+        migrations.RunPython(explode_existing_books, migrations.RunPython.noop),
+    ]
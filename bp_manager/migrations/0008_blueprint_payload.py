@@ -0,0 +1,70 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:11
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from bp_manager import codec
+
+
+def move_strings_to_payloads(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    BlueprintPayload = apps.get_model("bp_manager", "BlueprintPayload")
+    for blueprint in Blueprint.objects.exclude(blueprint_string="").iterator():
+        try:
+            content_hash = codec.content_hash(codec.decode(blueprint.blueprint_string))
+        except codec.BlueprintDecodeError:
+            raw = "".join(blueprint.blueprint_string.split())
+            content_hash = hashlib.sha256(f"raw:{raw}".encode("utf-8")).hexdigest()
+        BlueprintPayload.objects.get_or_create(
+            content_hash=content_hash,
+            defaults={"blueprint_string": blueprint.blueprint_string},
+        )
+        blueprint.payload_id = content_hash
+        blueprint.save(update_fields=["payload"])
+
+
+def restore_strings(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    for blueprint in Blueprint.objects.select_related("payload").iterator():
+        if blueprint.payload is not None:
+            blueprint.blueprint_string = blueprint.payload.blueprint_string
+            blueprint.save(update_fields=["blueprint_string"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0007_blueprint_book_entries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlueprintPayload",
+            fields=[
+                (
+                    "content_hash",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("blueprint_string", models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="blueprint",
+            name="payload",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="content_hash",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="blueprints",
+                to="bp_manager.blueprintpayload",
+            ),
+        ),
+        migrations.RunPython(move_strings_to_payloads, restore_strings),
+        migrations.RemoveField(
+            model_name="blueprint",
+            name="blueprint_string",
+        ),
+    ]
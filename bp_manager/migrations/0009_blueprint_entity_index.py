@@ -0,0 +1,60 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from bp_manager import codec
+
+
+def index_existing_entities(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    BlueprintEntity = apps.get_model("bp_manager", "BlueprintEntity")
+    rows = Blueprint.objects.values_list("pk", "payload__blueprint_string")
+    for pk, blueprint_string in rows.iterator():
+        try:
+            data = codec.decode(blueprint_string or "")
+        except codec.BlueprintDecodeError:
+            continue
+        BlueprintEntity.objects.bulk_create(
+            BlueprintEntity(blueprint_id=pk, entity_name=name, count=count)
+            for name, count in codec.entity_counts(data).items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0008_blueprint_payload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlueprintEntity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity_name", models.CharField(max_length=100)),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "blueprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entities",
+                        to="bp_manager.blueprint",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["blueprint", "-count", "entity_name"],
+                "unique_together": {("entity_name", "blueprint")},
+            },
+        ),
+        migrations.RunPython(index_existing_entities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from bp_manager import similarity
+
+
+def bucket_existing_blueprints(apps, schema_editor):
+    BlueprintBand = apps.get_model("bp_manager", "BlueprintBand")
+    BlueprintEntity = apps.get_model("bp_manager", "BlueprintEntity")
+    counts = {}
+    for blueprint_id, name, count in BlueprintEntity.objects.values_list(
+        "blueprint_id", "entity_name", "count"
+    ).iterator():
+        counts.setdefault(blueprint_id, {})[name] = count
+    BlueprintBand.objects.bulk_create(
+        BlueprintBand(blueprint_id=blueprint_id, bucket=bucket)
+        for blueprint_id, entity_counts in counts.items()
+        for bucket in similarity.buckets(entity_counts)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0009_blueprint_entity_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlueprintBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "blueprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="bp_manager.blueprint",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("bucket", "blueprint")},
+            },
+        ),
+        migrations.RunPython(bucket_existing_blueprints, migrations.RunPython.noop),
+    ]
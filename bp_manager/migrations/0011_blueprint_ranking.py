@@ -0,0 +1,69 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+from bp_manager import ranking
+
+
+def score_existing_blueprints(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    scores = {}
+    for model_name, weight in (
+        ("Like", ranking.LIKE_WEIGHT),
+        ("Commentary", ranking.COMMENT_WEIGHT),
+    ):
+        model = apps.get_model("bp_manager", model_name)
+        for blueprint_id, created_time in model.objects.values_list(
+            "blueprint_id", "created_time"
+        ).iterator():
+            scores[blueprint_id] = scores.get(blueprint_id, 0.0) + ranking.weight_at(
+                created_time, weight
+            )
+    Blueprint.objects.bulk_update(
+        [Blueprint(pk=pk, trending_score=score) for pk, score in scores.items()],
+        ["trending_score"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0010_blueprint_band"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="trending_score",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="created_time",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="blueprint",
+            index=models.Index(
+                fields=["-created_time", "-id"], name="blueprint_new_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blueprint",
+            index=models.Index(
+                fields=["-like_count", "-id"], name="blueprint_popular_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blueprint",
+            index=models.Index(
+                fields=["-trending_score", "-id"], name="blueprint_trending_idx"
+            ),
+        ),
+        migrations.RunPython(score_existing_blueprints, migrations.RunPython.noop),
+    ]
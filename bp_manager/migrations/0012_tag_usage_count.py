@@ -0,0 +1,71 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.split()).lower()[:50].strip()
+
+
+def merge_and_count_tags(apps, schema_editor):
+    """Normalize tag names, folding tags that only differed in case or
+    whitespace into the oldest one, and fill usage_count."""
+    Tag = apps.get_model("bp_manager", "Tag")
+    Through = apps.get_model("bp_manager", "Blueprint").tags.through
+
+    groups = {}
+    for tag in Tag.objects.order_by("pk"):
+        groups.setdefault(normalize(tag.name), []).append(tag)
+
+    for kept, *duplicates in groups.values():
+        if duplicates:
+            duplicate_ids = [tag.pk for tag in duplicates]
+            tagged = set(
+                Through.objects.filter(tag_id=kept.pk).values_list(
+                    "blueprint_id", flat=True
+                )
+            )
+            moved = set(
+                Through.objects.filter(tag_id__in=duplicate_ids).values_list(
+                    "blueprint_id", flat=True
+                )
+            )
+            Through.objects.bulk_create(
+                Through(blueprint_id=blueprint_id, tag_id=kept.pk)
+                for blueprint_id in moved - tagged
+            )
+            Tag.objects.filter(pk__in=duplicate_ids).delete()
+    for name, (kept, *_) in groups.items():
+        if kept.name != name:
+            Tag.objects.filter(pk=kept.pk).update(name=name)
+
+    Tag.objects.update(
+        usage_count=Coalesce(
+            Subquery(
+                Through.objects.filter(tag=OuterRef("pk"))
+                .order_by()
+                .values("tag")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0011_blueprint_ranking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="usage_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(merge_and_count_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0012_tag_usage_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commentary",
+            index=models.Index(
+                fields=["blueprint", "-created_time", "-id"],
+                name="commentary_thread_idx",
+            ),
+        ),
+    ]
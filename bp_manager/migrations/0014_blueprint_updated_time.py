@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_created_time(apps, schema_editor):
+    Blueprint = apps.get_model("bp_manager", "Blueprint")
+    Blueprint.objects.update(updated_time=models.F("created_time"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bp_manager", "0013_commentary_thread_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blueprint",
+            name="updated_time",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_time, migrations.RunPython.noop),
+    ]
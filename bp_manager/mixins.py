@@ -1,6 +1,16 @@
-from bp_manager.models import User
+from urllib.parse import urlencode
 
+from bp_manager import cache, conditional, entities, ranking, search, similarity
+from bp_manager.models import Blueprint, Commentary, Tag, User
+from bp_manager.pagination import CursorPaginator
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
 
 
 class UserIsOwnerMixin:
@@ -15,3 +25,142 @@ class UserIsOwnerMixin:
             raise PermissionDenied("You are not allowed to modify this object.")
 
         return obj
+
+
+class BlueprintFilterMixin:
+    """Blueprint list filtering shared by the sync and async list views."""
+
+    paginate_by = 8
+    ordering = ("-created_time", "-id")
+
+    def get_base_queryset(self):
+        return Blueprint.objects.select_related("user")
+
+    def get_filters(self, user) -> dict:
+        """The active filters of the request in a normalized form, which
+        also keys cached results computed from them."""
+        params = self.request.GET
+        filters = {}
+        # Tags are stored normalized, links from before that may not be
+        tag = Tag.normalize(params.get("tag", ""))
+        if tag:
+            filters["tag"] = tag
+        # A tag narrows any of the other filters, as the facet links do
+        if params.get("liked", "") == "true" and user.is_authenticated:
+            filters["liked"] = user.pk
+        elif params.get("username", ""):
+            filters["username"] = params["username"]
+        elif params.get("query", "").strip():
+            filters["query"] = " ".join(params["query"].split())
+
+        has = entities.parse_names(params.getlist("has"))
+        lacks = entities.parse_names(params.getlist("lacks"))
+        if has:
+            filters["has"] = sorted(has)
+        if lacks:
+            filters["lacks"] = sorted(lacks)
+        return filters
+
+    def filter_blueprints(self, queryset, user):
+        self.filters = filters = self.get_filters(user)
+
+        if "tag" in filters:
+            # Tag names are unique, the join cannot repeat a blueprint
+            queryset = queryset.filter(tags__name=filters["tag"])
+        if "liked" in filters:
+            queryset = queryset.filter(likes__user=user).distinct()
+        elif "username" in filters:
+            queryset = queryset.filter(user__username=filters["username"]).distinct()
+        elif "query" in filters:
+            backend = search.get_backend()
+            queryset = backend.search(queryset, filters["query"])
+            self.ordering = backend.ordering
+
+        if "has" in filters or "lacks" in filters:
+            queryset = queryset.with_entities(
+                filters.get("has", ()), filters.get("lacks", ())
+            )
+
+        sort = self.request.GET.get("sort", "")
+        if sort in ranking.SORTS:
+            self.ordering = ranking.SORTS[sort]
+
+        return queryset
+
+    def get_etag(self, window) -> str:
+        """Validator of a list page, from the keys and versions of the rows
+        in its ``window`` rather than the rows themselves."""
+        return conditional.list_etag(self.request, window.values_list("pk", "version"))
+
+
+class CommentPageMixin:
+    """Comment threads are rendered a page at a time; the pages after the
+    first are fetched from ``CommentaryListView`` as the reader scrolls."""
+
+    comments_per_page = 20
+
+    def get_comment_paginator(self, blueprint_id: int) -> CursorPaginator:
+        return CursorPaginator(
+            Commentary.objects.filter(blueprint_id=blueprint_id).select_related("user"),
+            self.comments_per_page,
+        )
+
+    @staticmethod
+    def comment_context(page, blueprint_id: int) -> dict:
+        next_url = None
+        if page.has_next():
+            next_url = reverse("bp_manager:comment-list", kwargs={"pk": blueprint_id})
+            next_url += "?" + urlencode({"cursor": page.next_cursor})
+        return {"comments": page, "comments_next_url": next_url}
+
+
+class BlueprintDetailMixin(CommentPageMixin):
+    """The part of the detail page that is the same for every visitor: the
+    blueprint, the first page of comments and the similar blueprints. It
+    is cached per ``Blueprint.version``, which signals bump on edits,
+    retagging, comments and likes; ``DETAIL_CACHE_TIMEOUT`` bounds how old
+    the similar blueprints get."""
+
+    queryset = Blueprint.objects.for_detail()
+
+    def build_detail(self, pk: int) -> dict:
+        blueprint = get_object_or_404(self.queryset, pk=pk)
+        detail = self.comment_context(self.get_comment_paginator(pk).page(), pk)
+        detail["comments"] = detail["comments"].object_list
+        detail["blueprint"] = blueprint
+        detail["similar_blueprints"] = similarity.similar_blueprints(pk)
+        return detail
+
+    def get_detail(self, pk: int) -> dict:
+        row = conditional.blueprint_validators(self.request, pk)
+        if row is None:
+            raise Http404("No blueprint found matching the query")
+        detail, version = cache.read_through(
+            cache.detail_key(pk),
+            row["version"],
+            lambda: self.build_detail(pk),
+            settings.DETAIL_CACHE_TIMEOUT,
+            stat="detail",
+        )
+        self.detail_is_stale = version < row["version"]
+        return detail
+
+    def add_detail_validators(self, response, etag, last_modified):
+        """The validators describe the current version of the blueprint. A
+        stale detail, served while another worker rebuilds it, gets none and
+        must not be reused, or clients would keep it as the current one."""
+        if self.detail_is_stale:
+            patch_cache_control(response, no_cache=True)
+            return response
+        return conditional.add_validators(response, etag, last_modified)
+
+
+class AsyncLoginRequiredMixin:
+    """``LoginRequiredMixin`` for async views: resolves the user with
+    ``request.auser()`` instead of touching the lazy ``request.user``."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
@@ -1,6 +1,13 @@
-from django.db import models
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
 from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+
+from bp_manager import codec, ranking
 
 
 # Creates a dir for the current user where their drawings are stored
@@ -16,14 +23,150 @@ class User(AbstractUser):
         return reverse("bp_manager:user-detail", kwargs={"pk": self.pk})
 
 
+class TagQuerySet(models.QuerySet):
+    def adjust_usage(self, count: int) -> int:
+        return self.update(usage_count=models.F("usage_count") + count)
+
+    def recount(self) -> int:
+        """Recompute ``usage_count`` from the tag assignments."""
+        assignments = (
+            Blueprint.tags.through.objects.filter(tag=models.OuterRef("pk"))
+            .order_by()
+            .values("tag")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        return self.update(usage_count=Coalesce(models.Subquery(assignments), 0))
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    # Number of blueprints with this tag, maintained by bp_manager.signals
+    usage_count = models.PositiveIntegerField(default=0)
+
+    objects = TagQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def normalize(cls, name: str) -> str:
+        """Trimmed, lowercased, with inner whitespace collapsed."""
+        max_length = cls._meta.get_field("name").max_length
+        return " ".join(str(name).split()).lower()[:max_length].strip()
+
+
+class BlueprintPayloadQuerySet(models.QuerySet):
+    def delete_orphans(self) -> None:
+        self.filter(blueprints__isnull=True).delete()
+
+
+class BlueprintPayload(models.Model):
+    """An exchange string stored once for every blueprint with that content.
+
+    Keyed by ``codec.content_hash()`` of the decoded data, so re-encodings
+    of the same design share a row. Strings that cannot be decoded are
+    keyed by the hash of the string itself.
+    """
+
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    blueprint_string = models.TextField()
+
+    objects = BlueprintPayloadQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return self.content_hash
+
+    @staticmethod
+    def hash_for(blueprint_string: str, data: dict | None) -> str:
+        if data is not None:
+            return codec.content_hash(data)
+        raw = "".join(blueprint_string.split())
+        return hashlib.sha256(f"raw:{raw}".encode("utf-8")).hexdigest()
+
+
+class BlueprintQuerySet(models.QuerySet):
+    def touch(self, **fields) -> int:
+        return self.update(
+            version=models.F("version") + 1, updated_time=timezone.now(), **fields
+        )
+
+    def adjust_counts(
+        self, likes: int = 0, comments: int = 0, trending: float = 0.0
+    ) -> int:
+        """``trending`` is added to the trending score, see ``ranking``."""
+        return self.touch(
+            like_count=models.F("like_count") + likes,
+            comment_count=models.F("comment_count") + comments,
+            trending_score=models.F("trending_score") + trending,
+        )
+
+    def with_entities(self, has=(), lacks=()):
+        """Blueprints containing every entity in ``has`` and none in
+        ``lacks``. Each name is a semi-join on the (entity_name, blueprint)
+        index of ``BlueprintEntity``, so the cost follows the number of
+        matching rows rather than the size of the library."""
+        queryset = self
+        for name in has:
+            queryset = queryset.filter(
+                pk__in=BlueprintEntity.objects.filter(entity_name=name).values(
+                    "blueprint_id"
+                )
+            )
+        if lacks:
+            queryset = queryset.exclude(
+                pk__in=BlueprintEntity.objects.filter(entity_name__in=lacks).values(
+                    "blueprint_id"
+                )
+            )
+        return queryset
+
+    def for_detail(self):
+        """Rows for the detail page. Book strings stay in the database, the
+        page lists the book entries and links to their strings instead."""
+        return (
+            self.select_related("user")
+            .prefetch_related(
+                "tags",
+                models.Prefetch(
+                    "book_entries",
+                    queryset=BlueprintBookEntry.objects.defer("blueprint_string"),
+                ),
+            )
+            .annotate(
+                inline_string=models.Case(
+                    models.When(kind="blueprint_book", then=models.Value("")),
+                    default=models.F("payload__blueprint_string"),
+                    output_field=models.TextField(),
+                )
+            )
+        )
+
+
+class DecodedMetadata(models.Model):
+    """Fields decoded from the exchange string, see ``codec.summarize()``.
+
+    Filled when a blueprint is saved through the form.
+    """
+
+    kind = models.CharField(max_length=32, blank=True)
+    game_version = models.CharField(max_length=32, blank=True)
+    label = models.CharField(max_length=255, blank=True)
+    entity_count = models.PositiveIntegerField(default=0)
+    tile_count = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    icons = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def is_book(self) -> bool:
+        return self.kind == "blueprint_book"
+
 
-class Blueprint(models.Model):
+class Blueprint(DecodedMetadata):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -32,14 +175,44 @@ class Blueprint(models.Model):
     created_time = models.DateTimeField(auto_now_add=True)
     title = models.CharField(max_length=255)
     description = models.TextField()
-    blueprint_string = models.TextField()
+    # Shared exchange string, read and written through blueprint_string
+    payload = models.ForeignKey(
+        BlueprintPayload,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        db_column="content_hash",
+        related_name="blueprints",
+    )
     blueprint_image = models.ImageField(upload_to=user_blueprint_path)
+    # Resized copies of blueprint_image, see bp_manager.images
+    image_variants = models.JSONField(default=dict, blank=True)
     tags = models.ManyToManyField(Tag, related_name="tags", blank=True)
 
+    # Maintained by the like and comment views, see adjust_counts()
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Time-weighted likes and comments, see bp_manager.ranking
+    trending_score = models.FloatField(default=0.0)
+
+    # Bumped by touch() whenever anything rendered from this row changes
+    version = models.PositiveIntegerField(default=1)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    objects = BlueprintQuerySet.as_manager()
+
     class Meta:
         ordering = [
             "-created_time",
         ]
+        # One per sort order in ranking.SORTS
+        indexes = [
+            models.Index(fields=["-created_time", "-id"], name="blueprint_new_idx"),
+            models.Index(fields=["-like_count", "-id"], name="blueprint_popular_idx"),
+            models.Index(
+                fields=["-trending_score", "-id"], name="blueprint_trending_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.user.username})"
@@ -47,6 +220,156 @@ class Blueprint(models.Model):
     def get_absolute_url(self):
         return reverse("bp_manager:blueprint-detail", kwargs={"pk": self.pk})
 
+    def image_variant_url(self, variant: str, key: str = "fallback") -> str:
+        name = (self.image_variants.get(variant) or {}).get(key)
+        if name:
+            return default_storage.url(name)
+        return self.blueprint_image.url if self.blueprint_image else ""
+
+    @property
+    def thumbnail_url(self) -> str:
+        return self.image_variant_url("card")
+
+    _blueprint_string = None
+    _string_changed = False
+    _decoded = None
+
+    @property
+    def blueprint_string(self) -> str:
+        if self._blueprint_string is None:
+            self._blueprint_string = (
+                self.payload.blueprint_string if self.payload_id else ""
+            )
+        return self._blueprint_string
+
+    @blueprint_string.setter
+    def blueprint_string(self, value: str) -> None:
+        self._blueprint_string = value
+        self._string_changed = True
+        self._decoded = None
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._blueprint_string = self._decoded = None
+        self._string_changed = False
+
+    def decode(self) -> dict | None:
+        """The decoded ``blueprint_string``, None when it is not valid."""
+        if self._decoded is None:
+            try:
+                data = codec.decode(self.blueprint_string)
+            except codec.BlueprintDecodeError:
+                data = None
+            self._decoded = (data,)
+        return self._decoded[0]
+
+    @property
+    def content_hash(self) -> str:
+        return BlueprintPayload.hash_for(self.blueprint_string, self.decode())
+
+    def update_decoded_metadata(self) -> dict | None:
+        data = self.decode()
+        summary = codec.summarize(data) if data is not None else codec.empty_summary()
+
+        for field, value in summary.items():
+            setattr(self, field, value)
+        return data
+
+    # Columns only ever changed by single UPDATE statements, see
+    # BlueprintQuerySet. An ordinary save of an instance loaded earlier
+    # would write back their old values over adjustments made since, and
+    # move the version back to one that cached renderings already use.
+    ADJUSTED_FIELDS = frozenset(
+        {"like_count", "comment_count", "trending_score", "version"}
+    )
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.ADJUSTED_FIELDS
+            ]
+        previous = self.payload_id
+        if self._string_changed:
+            self.payload = self.store_payload()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "payload"}
+            self._string_changed = False
+        super().save(*args, **kwargs)
+        if previous and previous != self.payload_id:
+            BlueprintPayload.objects.filter(pk=previous).delete_orphans()
+
+    def store_payload(self) -> BlueprintPayload | None:
+        if not self.blueprint_string:
+            return None
+        payload, _ = BlueprintPayload.objects.get_or_create(
+            content_hash=self.content_hash,
+            defaults={"blueprint_string": self.blueprint_string},
+        )
+        return payload
+
+
+class BlueprintBookEntry(DecodedMetadata):
+    """A blueprint (or planner) inside a blueprint book, in slot order."""
+
+    book = models.ForeignKey(
+        Blueprint, on_delete=models.CASCADE, related_name="book_entries"
+    )
+    index = models.PositiveIntegerField()
+    blueprint_string = models.TextField()
+
+    class Meta:
+        ordering = ["book", "index"]
+        unique_together = (("book", "index"),)
+
+    def __str__(self) -> str:
+        return f"{self.book.title} #{self.index + 1}"
+
+    def get_absolute_url(self):
+        return reverse(
+            "bp_manager:book-entry-detail",
+            kwargs={"pk": self.book_id, "index": self.index},
+        )
+
+
+class BlueprintEntity(models.Model):
+    """How often an entity or item occurs in a blueprint, see
+    ``codec.entity_counts()``. Inverted index for the entity filters."""
+
+    blueprint = models.ForeignKey(
+        Blueprint, on_delete=models.CASCADE, related_name="entities"
+    )
+    entity_name = models.CharField(max_length=100)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["blueprint", "-count", "entity_name"]
+        unique_together = (("entity_name", "blueprint"),)
+
+    def __str__(self) -> str:
+        return f"{self.entity_name} x{self.count}"
+
+
+class BlueprintBand(models.Model):
+    """An LSH bucket of a blueprint's MinHash signature, see
+    ``bp_manager.similarity``."""
+
+    blueprint = models.ForeignKey(
+        Blueprint, on_delete=models.CASCADE, related_name="bands"
+    )
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        unique_together = (("bucket", "blueprint"),)
+
+    def __str__(self) -> str:
+        return f"{self.blueprint_id}: {self.bucket}"
+
 
 class Commentary(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
@@ -58,6 +381,13 @@ class Commentary(models.Model):
 
     class Meta:
         ordering = ["-created_time"]
+        # Keyset pages of one blueprint's thread
+        indexes = [
+            models.Index(
+                fields=["blueprint", "-created_time", "-id"],
+                name="commentary_thread_idx",
+            ),
+        ]
 
     def get_absolute_url(self):
         return (
@@ -68,11 +398,108 @@ class Commentary(models.Model):
         )
 
 
+class LikeQuerySet(models.QuerySet):
+    def toggle(self, user: User, blueprint_id: int) -> bool:
+        """Like or unlike the blueprint, returns whether it is now liked."""
+        with transaction.atomic():
+            like, created = self.get_or_create(user=user, blueprint_id=blueprint_id)
+            trending = ranking.weight_at(like.created_time, ranking.LIKE_WEIGHT)
+            if not created:
+                like.delete()
+            Blueprint.objects.filter(pk=blueprint_id).adjust_counts(
+                likes=1 if created else -1,
+                trending=trending if created else -trending,
+            )
+        return created
+
+    @staticmethod
+    def _adjust_like_count(
+        blueprint_id: int, likes: int, trending: float
+    ) -> int | None:
+        """``BlueprintQuerySet.adjust_counts()`` in one ``UPDATE ... RETURNING``,
+        returns the new like count or None when there is no such blueprint."""
+        table = connection.ops.quote_name(Blueprint._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET like_count = like_count + %s, "
+                "trending_score = trending_score + %s, version = version + 1, "
+                "updated_time = %s WHERE id = %s RETURNING like_count",
+                [
+                    likes,
+                    trending,
+                    connection.ops.adapt_datetimefield_value(timezone.now()),
+                    blueprint_id,
+                ],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def set_liked(self, user: User, blueprint_id: int, liked: bool) -> int:
+        """Like or unlike the blueprint whatever its current state, returns
+        its like count afterwards. Repeating a call changes nothing. Raises
+        ``Blueprint.DoesNotExist`` when there is no such blueprint.
+
+        The like is inserted unless it exists, or deleted, and the counters
+        updated returning the new count, so a change is two statements."""
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with transaction.atomic():
+            if liked:
+                now = timezone.now()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {table} (user_id, blueprint_id, created_time) "
+                        "VALUES (%s, %s, %s) "
+                        "ON CONFLICT (user_id, blueprint_id) DO NOTHING RETURNING id",
+                        [
+                            user.pk,
+                            blueprint_id,
+                            connection.ops.adapt_datetimefield_value(now),
+                        ],
+                    )
+                    changed = cursor.fetchone() is not None
+                created_time = now
+            else:
+                # raw() converts the returned time like any other read
+                like = next(
+                    iter(
+                        self.model.objects.raw(
+                            f"DELETE FROM {table} "
+                            "WHERE user_id = %s AND blueprint_id = %s "
+                            "RETURNING id, created_time",
+                            [user.pk, blueprint_id],
+                        )
+                    ),
+                    None,
+                )
+                changed = like is not None
+                created_time = like.created_time if changed else None
+
+            if changed:
+                trending = ranking.weight_at(created_time, ranking.LIKE_WEIGHT)
+                like_count = self._adjust_like_count(
+                    blueprint_id, 1 if liked else -1, trending if liked else -trending
+                )
+            else:
+                like_count = (
+                    Blueprint.objects.filter(pk=blueprint_id)
+                    .values_list("like_count", flat=True)
+                    .first()
+                )
+            if like_count is None:
+                # Also rolls back a like inserted for the missing blueprint,
+                # whose foreign key is only checked on commit
+                raise Blueprint.DoesNotExist("No blueprint found matching the query")
+            return like_count
+
+
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="likes")
     blueprint = models.ForeignKey(
         Blueprint, on_delete=models.CASCADE, related_name="likes"
     )
+    created_time = models.DateTimeField(auto_now_add=True)
+
+    objects = LikeQuerySet.as_manager()
 
     class Meta:
         unique_together = (("user", "blueprint"),)
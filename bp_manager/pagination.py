@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: list, direction: str) -> str:
+    payload = json.dumps(
+        {"v": [_encode_value(value) for value in values], "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[list, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload["v"], payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as error:
+        raise InvalidCursor("Invalid cursor.") from error
+
+    if not isinstance(values, list) or direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor("Invalid cursor.")
+    return values, direction
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self._has_next:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor_for(self.object_list[0], PREVIOUS)
+
+
+class CursorPaginator:
+    """Keyset paginator over ``ordering``, which must end in a unique field.
+
+    Pages are fetched with ``WHERE (keys) < (cursor keys) ... LIMIT n + 1``,
+    so every page costs the same and no ``COUNT(*)`` is issued.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering or ("-created_time", "-id"))
+        self.keys = [
+            (field.lstrip("-"), field.startswith("-")) for field in self.ordering
+        ]
+
+    def cursor_for(self, obj, direction: str) -> str:
+        return encode_cursor([getattr(obj, name) for name, _ in self.keys], direction)
+
+    def _after(self, values: list, reverse: bool) -> Q:
+        if len(values) != len(self.keys):
+            raise InvalidCursor("Cursor does not match the ordering.")
+
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def window(self, cursor: str | None = None) -> tuple[QuerySet, str]:
+        """Return the sliced queryset for the page at ``cursor`` and its
+        direction; the slice holds one extra row to detect further pages."""
+        direction = NEXT
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            values, direction = decode_cursor(cursor)
+            reverse = direction == PREVIOUS
+            try:
+                queryset = queryset.filter(self._after(values, reverse))
+            except (ValidationError, ValueError, TypeError) as error:
+                raise InvalidCursor("Cursor does not match the ordering.") from error
+            if reverse:
+                queryset = queryset.reverse()
+        return queryset[: self.per_page + 1], direction
+
+    def build_page(self, rows: list, direction: str, cursor: str | None) -> CursorPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if direction == PREVIOUS:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=bool(cursor))
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        queryset, direction = self.window(cursor)
+        return self.build_page(list(queryset), direction, cursor)
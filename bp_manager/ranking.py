@@ -0,0 +1,39 @@
+"""Sort orders of the blueprint list and the trending score behind one.
+
+``Blueprint.trending_score`` is the sum over likes and comments of
+``2 ** ((event time - EPOCH) / HALF_LIFE)``. Decaying every score by the
+same factor does not change their order, so instead of decaying old scores
+new events are simply worth more: a like adds its weight at its own time
+and never has to be revisited, and the column can be indexed. Removing an
+event subtracts its weight again, exact up to float rounding relative to
+the newest events.
+
+The exponent grows by about 120 a year, which a float holds for roughly
+eight years; moving ``EPOCH`` forward and running ``refresh_trending``
+rescales all scores.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.utils import timezone as django_timezone
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HALF_LIFE = timedelta(days=3)
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+
+# Keyset orderings of the list views, each ending in a unique field and
+# backed by an index on Blueprint
+SORTS = {
+    "new": ("-created_time", "-id"),
+    "popular": ("-like_count", "-id"),
+    "trending": ("-trending_score", "-id"),
+}
+DEFAULT_SORT = "new"
+
+
+def weight_at(when: datetime | None = None, weight: float = 1.0) -> float:
+    """What an event at ``when`` (default: now) adds to the trending score."""
+    when = when or django_timezone.now()
+    return weight * 2 ** ((when - EPOCH) / HALF_LIFE)
@@ -0,0 +1,226 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from bp_manager.models import Blueprint
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+BLUEPRINT_TABLE = Blueprint._meta.db_table
+TAG_TABLE = Blueprint.tags.field.related_model._meta.db_table
+BLUEPRINT_TAGS_TABLE = Blueprint.tags.through._meta.db_table
+USER_TABLE = Blueprint.user.field.related_model._meta.db_table
+ENTRY_TABLE = Blueprint.book_entries.rel.related_model._meta.db_table
+FTS_TABLE = "bp_manager_blueprint_fts"
+PG_TABLE = "bp_manager_blueprint_search"
+
+
+def tokenize(query: str) -> list[str]:
+    return TOKEN_RE.findall(query.lower())
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join(["%s"] * len(values))
+
+
+class BasicSearchBackend:
+    """Substring search for databases without a full-text index."""
+
+    ordering = ("-created_time", "-id")
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        return queryset.filter(
+            Q(user__username__icontains=query)
+            | Q(title__icontains=query)
+            | Q(tags__name__icontains=query)
+        ).distinct()
+
+    def index(self, blueprint_ids: Iterable[int]) -> None:
+        pass
+
+    def remove(self, blueprint_ids: Iterable[int]) -> None:
+        pass
+
+    def rebuild(self) -> None:
+        pass
+
+
+class _Rank(Func):
+    """Correlated rank subquery for the outer blueprint row.
+
+    ``sql`` takes the search term as its only parameter and refers to the
+    outer primary key as ``{pk}``, which is compiled so that it keeps its
+    alias when the queryset ends up nested in another query.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, sql: str, term: str):
+        super().__init__(F("pk"))
+        self.sql = sql
+        self.term = term
+
+    def as_sql(self, compiler, connection, **extra_context):
+        pk_sql, pk_params = compiler.compile(self.source_expressions[0])
+        return self.sql.format(pk=pk_sql), [self.term, *pk_params]
+
+
+class SQLiteSearchBackend(BasicSearchBackend):
+    """FTS5 shadow table keyed by blueprint id, ranked with bm25()."""
+
+    # bm25() scores are negative, the best match sorts first
+    ordering = ("search_rank", "-id")
+
+    # Column weights for title, description, tags, author
+    weights = (10.0, 1.0, 5.0, 5.0)
+
+    def _match(self, query: str) -> str:
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        match = self._match(query)
+        if not match:
+            return queryset.none()
+
+        weights = ", ".join(str(weight) for weight in self.weights)
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        )
+        rank = _Rank(
+            f"(SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {{pk}})",
+            match,
+        )
+        return (
+            queryset.filter(pk__in=matching_ids)
+            .annotate(search_rank=rank)
+            .order_by(*self.ordering)
+        )
+
+    def _insert_sql(self, where: str = "") -> str:
+        return (
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, tags, author) "
+            f"SELECT b.id, b.title, b.description || ' ' || "
+            f"COALESCE((SELECT group_concat(e.label, ' ') FROM {ENTRY_TABLE} e "
+            f"WHERE e.book_id = b.id), ''), "
+            f"COALESCE((SELECT group_concat(t.name, ' ') FROM {TAG_TABLE} t "
+            f"JOIN {BLUEPRINT_TAGS_TABLE} bt ON bt.tag_id = t.id "
+            f"WHERE bt.blueprint_id = b.id), ''), u.username "
+            f"FROM {BLUEPRINT_TABLE} b JOIN {USER_TABLE} u ON u.id = b.user_id "
+            f"{where}"
+        )
+
+    def index(self, blueprint_ids: Iterable[int]) -> None:
+        ids = list(blueprint_ids)
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({_placeholders(ids)})", ids
+            )
+            cursor.execute(
+                self._insert_sql(f"WHERE b.id IN ({_placeholders(ids)})"), ids
+            )
+
+    def remove(self, blueprint_ids: Iterable[int]) -> None:
+        ids = list(blueprint_ids)
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({_placeholders(ids)})", ids
+            )
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(self._insert_sql())
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    """``tsvector`` column with a GIN index in a table keyed by blueprint id."""
+
+    ordering = ("-search_rank", "-id")
+
+    def _tsquery(self, query: str) -> str:
+        return " & ".join(f"{token}:*" for token in tokenize(query))
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return queryset.none()
+
+        matching_ids = RawSQL(
+            f"SELECT blueprint_id FROM {PG_TABLE} "
+            f"WHERE search_vector @@ to_tsquery('simple', %s)",
+            [tsquery],
+        )
+        rank = _Rank(
+            f"(SELECT ts_rank(search_vector, to_tsquery('simple', %s)) "
+            f"FROM {PG_TABLE} WHERE blueprint_id = {{pk}})",
+            tsquery,
+        )
+        return (
+            queryset.filter(pk__in=matching_ids)
+            .annotate(search_rank=rank)
+            .order_by(*self.ordering)
+        )
+
+    def _upsert_sql(self, where: str = "") -> str:
+        return (
+            f"INSERT INTO {PG_TABLE} (blueprint_id, search_vector) "
+            f"SELECT b.id, "
+            f"setweight(to_tsvector('simple', b.title), 'A') || "
+            f"setweight(to_tsvector('simple', COALESCE((SELECT string_agg(t.name, ' ') "
+            f"FROM {TAG_TABLE} t JOIN {BLUEPRINT_TAGS_TABLE} bt ON bt.tag_id = t.id "
+            f"WHERE bt.blueprint_id = b.id), '')), 'B') || "
+            f"setweight(to_tsvector('simple', u.username), 'B') || "
+            f"setweight(to_tsvector('simple', b.description), 'C') || "
+            f"setweight(to_tsvector('simple', COALESCE((SELECT string_agg(e.label, ' ') "
+            f"FROM {ENTRY_TABLE} e WHERE e.book_id = b.id), '')), 'C') "
+            f"FROM {BLUEPRINT_TABLE} b JOIN {USER_TABLE} u ON u.id = b.user_id "
+            f"{where} "
+            f"ON CONFLICT (blueprint_id) "
+            f"DO UPDATE SET search_vector = EXCLUDED.search_vector"
+        )
+
+    def index(self, blueprint_ids: Iterable[int]) -> None:
+        ids = list(blueprint_ids)
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(self._upsert_sql("WHERE b.id = ANY(%s)"), [ids])
+
+    def remove(self, blueprint_ids: Iterable[int]) -> None:
+        ids = list(blueprint_ids)
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {PG_TABLE} WHERE blueprint_id = ANY(%s)", [ids]
+            )
+
+    def rebuild(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {PG_TABLE}")
+            cursor.execute(self._upsert_sql())
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> BasicSearchBackend:
+    path = getattr(settings, "BLUEPRINT_SEARCH_BACKEND", "")
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, BasicSearchBackend)()
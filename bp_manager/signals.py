@@ -0,0 +1,155 @@
+from collections import defaultdict
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from bp_manager import ranking, tags
+from bp_manager.models import Blueprint, BlueprintPayload, Commentary, Like, Tag, User
+from bp_manager.search import get_backend
+
+
+def blueprints_changed(blueprint_ids) -> None:
+    blueprint_ids = list(blueprint_ids)
+    if not blueprint_ids:
+        return
+    get_backend().index(blueprint_ids)
+    Blueprint.objects.filter(pk__in=blueprint_ids).touch()
+
+
+@receiver(post_save, sender=Blueprint)
+def index_saved_blueprint(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        get_backend().index([instance.pk])
+    else:
+        blueprints_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Blueprint)
+def unindex_deleted_blueprint(sender, instance, **kwargs):
+    get_backend().remove([instance.pk])
+    tags.tags_changed()
+    if getattr(instance, "_tag_ids", None):
+        Tag.objects.filter(pk__in=instance._tag_ids).adjust_usage(-1)
+    if instance.payload_id:
+        BlueprintPayload.objects.filter(pk=instance.payload_id).delete_orphans()
+
+
+@receiver(m2m_changed, sender=Blueprint.tags.through)
+def index_retagged_blueprints(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        instance._cleared_blueprint_ids = list(
+            instance.tags.values_list("pk", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    tags.tags_changed()
+    if not reverse:
+        blueprints_changed([instance.pk])
+    elif action == "post_clear":
+        blueprints_changed(getattr(instance, "_cleared_blueprint_ids", []))
+    elif pk_set:
+        blueprints_changed(pk_set)
+
+
+@receiver(m2m_changed, sender=Blueprint.tags.through)
+def count_tag_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list("pk", flat=True))
+    elif action == "post_add" and pk_set:
+        # pk_set only holds the newly added ids here
+        if reverse:
+            Tag.objects.filter(pk=instance.pk).adjust_usage(len(pk_set))
+        else:
+            Tag.objects.filter(pk__in=pk_set).adjust_usage(1)
+    elif action == "post_remove" and pk_set:
+        # ... but here also ids that were not assigned
+        Tag.objects.filter(pk__in=[instance.pk] if reverse else pk_set).recount()
+    elif action == "post_clear":
+        if reverse:
+            Tag.objects.filter(pk=instance.pk).update(usage_count=0)
+        else:
+            cleared = getattr(instance, "_cleared_tag_ids", [])
+            Tag.objects.filter(pk__in=cleared).adjust_usage(-1)
+
+
+@receiver(pre_delete, sender=Blueprint)
+def remember_blueprint_tags(sender, instance, **kwargs):
+    instance._tag_ids = list(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Tag)
+def index_renamed_tag(sender, instance, created, raw=False, **kwargs):
+    tags.tags_changed()
+    if not (created or raw):
+        blueprints_changed(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_blueprints(sender, instance, **kwargs):
+    instance._tagged_blueprint_ids = list(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def index_untagged_blueprints(sender, instance, **kwargs):
+    tags.tags_changed()
+    blueprints_changed(getattr(instance, "_tagged_blueprint_ids", []))
+
+
+@receiver(post_save, sender=User)
+def index_renamed_author(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if created or raw:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    blueprints_changed(instance.blueprints.values_list("pk", flat=True))
+    # Cached detail pages show the names of commenters too
+    Blueprint.objects.filter(pk__in=instance.comments.values("blueprint_id")).touch()
+
+
+@receiver(pre_delete, sender=User)
+def uncount_deleted_user_likes(sender, instance, **kwargs):
+    # The cascade deletes the user's likes without going through the like
+    # views, which maintain the counters of other blueprints. Comments are
+    # uncounted one by one by uncount_deleted_comment().
+    changes = defaultdict(lambda: [0, 0.0])
+    rows = (
+        Like.objects.filter(user=instance)
+        .exclude(blueprint__user=instance)
+        .values_list("blueprint_id", "created_time")
+    )
+    for blueprint_id, created_time in rows:
+        change = changes[blueprint_id]
+        change[0] += 1
+        change[1] += ranking.weight_at(created_time, ranking.LIKE_WEIGHT)
+    for blueprint_id, (likes, trending) in changes.items():
+        Blueprint.objects.filter(pk=blueprint_id).adjust_counts(
+            likes=-likes, trending=-trending
+        )
+
+
+@receiver(post_save, sender=Commentary)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # Bumps the version too, which invalidates cached detail pages
+        Blueprint.objects.filter(pk=instance.blueprint_id).adjust_counts(
+            comments=1,
+            trending=ranking.weight_at(instance.created_time, ranking.COMMENT_WEIGHT),
+        )
+    else:
+        Blueprint.objects.filter(pk=instance.blueprint_id).touch()
+
+
+@receiver(post_delete, sender=Commentary)
+def uncount_deleted_comment(sender, instance, **kwargs):
+    # Also runs for comments deleted with their blueprint, the update then
+    # matches no row
+    Blueprint.objects.filter(pk=instance.blueprint_id).adjust_counts(
+        comments=-1,
+        trending=-ranking.weight_at(instance.created_time, ranking.COMMENT_WEIGHT),
+    )
@@ -0,0 +1,149 @@
+"""Similar blueprints by entity composition.
+
+Each blueprint's entity multiset (see ``codec.entity_counts()``) gets a
+MinHash signature of ``BANDS * ROWS`` values. The signature is split into
+bands and every band is hashed into a ``BlueprintBand`` bucket, so two
+blueprints share at least one bucket with a probability that rises steeply
+around a Jaccard similarity of ``(1 / BANDS) ** (1 / ROWS)``, about 0.5.
+
+A lookup reads the buckets of one blueprint, keeps the ``MAX_CANDIDATES``
+blueprints sharing the most of them and re-ranks those by the exact
+weighted Jaccard similarity of their entity counts. Near-identical popular
+designs all land in the same buckets, so only the newest
+``MAX_BUCKET_ROWS`` members of each bucket are read: a lookup reads at most
+``BANDS * MAX_BUCKET_ROWS`` index entries however large the catalog grows.
+"""
+
+import hashlib
+import random
+
+from django.db.models import Count, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from bp_manager.models import Blueprint, BlueprintBand, BlueprintEntity
+
+BANDS = 16
+ROWS = 4
+
+MAX_CANDIDATES = 50
+MAX_BUCKET_ROWS = 200
+
+# Parameters of the hash functions h(x) = (a * x + b) mod p. The seed is
+# fixed because stored buckets are only comparable if these never change.
+PRIME = (1 << 61) - 1
+_random = random.Random(2024)
+PERMUTATIONS = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME)) for _ in range(BANDS * ROWS)
+]
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+def shingles(counts: dict[str, int]) -> set[str]:
+    """Tokens standing for the multiset: ``name#1``, ``name#2``, ``name#4``
+    ... up to the count, so amounts matter without a token per entity."""
+    tokens = set()
+    for name, count in counts.items():
+        step = 1
+        while step <= count:
+            tokens.add(f"{name}#{step}")
+            step *= 2
+    return tokens
+
+
+def signature(counts: dict[str, int]) -> list[int]:
+    hashes = [_hash64(token) for token in shingles(counts)]
+    if not hashes:
+        return []
+    return [min((a * x + b) % PRIME for x in hashes) for a, b in PERMUTATIONS]
+
+
+def buckets(counts: dict[str, int]) -> list[int]:
+    """One bucket per band, as signed 64-bit integers. The band number is
+    part of the hash so buckets of different bands never collide."""
+    values = signature(counts)
+    if not values:
+        return []
+    return list(
+        dict.fromkeys(
+            _hash64(f"{band}:{values[band * ROWS:(band + 1) * ROWS]}") - (1 << 63)
+            for band in range(BANDS)
+        )
+    )
+
+
+def jaccard(first: dict[str, int], second: dict[str, int]) -> float:
+    """Weighted Jaccard similarity of two entity multisets."""
+    names = first.keys() | second.keys()
+    union = sum(max(first.get(name, 0), second.get(name, 0)) for name in names)
+    if not union:
+        return 0.0
+    intersection = sum(min(first.get(name, 0), second.get(name, 0)) for name in names)
+    return intersection / union
+
+
+def sync_bands(blueprint: Blueprint, counts: dict[str, int]) -> None:
+    blueprint.bands.all().delete()
+    BlueprintBand.objects.bulk_create(
+        BlueprintBand(blueprint=blueprint, bucket=bucket) for bucket in buckets(counts)
+    )
+
+
+def candidate_ids(blueprint_id: int) -> list[int]:
+    """The ``MAX_CANDIDATES`` blueprints sharing the most buckets with the
+    given one, among the newest ``MAX_BUCKET_ROWS`` of each bucket."""
+    own = list(
+        BlueprintBand.objects.filter(blueprint_id=blueprint_id).values_list(
+            "bucket", flat=True
+        )
+    )
+    if not own:
+        return []
+
+    others = BlueprintBand.objects.exclude(blueprint_id=blueprint_id)
+    newest = Q()
+    for bucket in own:
+        # The id of the oldest member read; an uncorrelated subquery, so each
+        # bucket is a bounded range of the (bucket, blueprint) index
+        cutoff = Subquery(
+            others.filter(bucket=bucket)
+            .order_by("-blueprint_id")
+            .values("blueprint_id")[MAX_BUCKET_ROWS - 1 : MAX_BUCKET_ROWS]
+        )
+        newest |= Q(bucket=bucket, blueprint_id__gte=Coalesce(cutoff, 0))
+    return list(
+        others.filter(newest)
+        .values("blueprint_id")
+        .annotate(hits=Count("pk"))
+        .order_by("-hits", "-blueprint_id")
+        .values_list("blueprint_id", flat=True)[:MAX_CANDIDATES]
+    )
+
+
+def similar_blueprints(blueprint_id: int, limit: int = 4) -> list[Blueprint]:
+    """Up to ``limit`` blueprints most similar to the given one, each with a
+    ``similarity`` attribute between 0 and 1."""
+    candidates = candidate_ids(blueprint_id)
+    if not candidates:
+        return []
+
+    counts = {}
+    for pk, name, count in BlueprintEntity.objects.filter(
+        blueprint_id__in=[blueprint_id, *candidates]
+    ).values_list("blueprint_id", "entity_name", "count"):
+        counts.setdefault(pk, {})[name] = count
+
+    own = counts.get(blueprint_id, {})
+    ranked = sorted(
+        ((jaccard(own, counts.get(pk, {})), pk) for pk in candidates),
+        reverse=True,
+    )[:limit]
+    found = Blueprint.objects.select_related("user").in_bulk([pk for _, pk in ranked])
+    similar = []
+    for score, pk in ranked:
+        if pk in found:
+            found[pk].similarity = score
+            similar.append(found[pk])
+    return similar
@@ -0,0 +1,108 @@
+"""Tag ingestion, and the in-process prefix index of tag names behind the
+tag autocomplete.
+
+Every process keeps a sorted array of lowercased tag names with their
+usage counts. A generation counter in the shared cache is bumped whenever
+tags or tag assignments change; a lookup compares it with the generation
+its index was built for and rebuilds the array when they differ, so a
+lookup normally costs one cache read and a binary search.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from bp_manager.models import Tag
+
+GENERATION_KEY = "bp_manager:tags:generation"
+
+MAX_SUGGESTIONS = 20
+
+
+class TagIndex:
+    def __init__(self, rows):
+        """``rows`` are ``(pk, name, usage count)`` tuples."""
+        entries = sorted((name.lower(), pk, name, count) for pk, name, count in rows)
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def complete(self, prefix: str, limit: int = 10) -> list[dict]:
+        """The ``limit`` most used tags starting with ``prefix``, ignoring
+        case."""
+        prefix = prefix.strip().lower()
+        start = bisect_left(self.keys, prefix)
+        # Every key starting with the prefix sorts before prefix + U+10FFFF
+        end = bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+        matches = heapq.nsmallest(
+            limit,
+            self.entries[start:end],
+            key=lambda entry: (-entry[3], entry[0]),
+        )
+        return [
+            {"id": pk, "name": name, "blueprint_count": count}
+            for _, pk, name, count in matches
+        ]
+
+
+_lock = threading.Lock()
+_index: TagIndex | None = None
+_generation = None
+
+
+def _new_generation() -> int:
+    # Starting from the clock keeps a counter that was evicted from the
+    # cache from coming back with a value an index was already built for
+    cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    return cache.get(GENERATION_KEY)
+
+
+def current_generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = _new_generation()
+    return generation
+
+
+def tags_changed() -> None:
+    """Make every process rebuild its index on its next lookup."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        _new_generation()
+
+
+def get_index() -> TagIndex:
+    global _index, _generation
+    generation = current_generation()
+    with _lock:
+        if _index is None or _generation != generation:
+            _index = TagIndex(Tag.objects.values_list("pk", "name", "usage_count"))
+            _generation = generation
+        return _index
+
+
+def complete(prefix: str, limit: int = 10) -> list[dict]:
+    return get_index().complete(prefix, max(1, min(limit, MAX_SUGGESTIONS)))
+
+
+def parse(text: str) -> list[str]:
+    """Normalized, distinct tag names from comma-separated ``text``."""
+    names = (Tag.normalize(name) for name in text.split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def ingest(names) -> list[int]:
+    """Primary keys of the tags named ``names``, creating the missing ones.
+
+    Names must already be normalized. Costs two queries however many names
+    there are: an insert that skips existing names and a select.
+    """
+    names = list(names)
+    if not names:
+        return []
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tags_changed()
+    return list(Tag.objects.filter(name__in=names).values_list("pk", flat=True))
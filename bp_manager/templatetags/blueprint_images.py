@@ -0,0 +1,54 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from bp_manager.images import VARIANTS
+
+register = template.Library()
+
+
+def _srcset(variants: dict, key: str) -> str:
+    candidates = [
+        (default_storage.url(variants[name][key]), variants[name]["width"])
+        for name in VARIANTS
+        if name in variants
+    ]
+    return ", ".join(f"{url} {width}w" for url, width in candidates)
+
+
+@register.simple_tag
+def blueprint_picture(blueprint, variant, css_class="", sizes="100vw", lazy=True):
+    """Render ``blueprint_image`` as a ``<picture>`` with WebP and fallback
+    ``srcset`` candidates, or the original file when no derivatives exist."""
+    if not blueprint.blueprint_image:
+        return ""
+
+    loading = "lazy" if lazy else "eager"
+    variants = blueprint.image_variants or {}
+    if variant not in variants:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}">',
+            blueprint.blueprint_image.url,
+            css_class,
+            blueprint.title,
+            loading,
+        )
+
+    selected = variants[variant]
+    return format_html(
+        "<picture>"
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'class="{}" alt="{}" loading="{}">'
+        "</picture>",
+        _srcset(variants, "webp"),
+        sizes,
+        default_storage.url(selected["fallback"]),
+        _srcset(variants, "fallback"),
+        sizes,
+        selected["width"],
+        selected["height"],
+        css_class,
+        blueprint.title,
+        loading,
+    )
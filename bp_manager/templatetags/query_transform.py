@@ -2,10 +2,20 @@ from django import template
 
 register = template.Library()
 
+# Parameters that position the reader inside one result set. A cursor is only
+# meaningful for the filters and ordering it was issued for.
+PAGINATION_PARAMS = ("cursor", "page")
+
 
 @register.simple_tag
 def query_transform(request, **kwargs):
     updated = request.GET.copy()
+    if any(key not in PAGINATION_PARAMS for key in kwargs):
+        for key in PAGINATION_PARAMS:
+            updated.pop(key, 0)
+    elif "cursor" in kwargs:
+        updated.pop("page", 0)
+
     for key, value in kwargs.items():
         if value is not None:
             updated[key] = value
@@ -1,8 +1,22 @@
+from django.conf import settings
 from django.urls import path
 
+from bp_manager.api import (
+    BlueprintListApiView,
+    BlueprintDetailApiView,
+    BlueprintBatchApiView,
+    BookEntryListApiView,
+    BookEntryDetailApiView,
+    TagCompleteApiView,
+    TagListApiView,
+    UserBlueprintListApiView,
+)
 from bp_manager.views import (
     BlueprintListView,
     BlueprintDetailView,
+    BlueprintStringView,
+    BookEntryDetailView,
+    BookEntryStringView,
     BlueprintCreateView,
     BlueprintUpdateView,
     BlueprintDeleteView,
@@ -11,16 +25,39 @@ from bp_manager.views import (
     UserUpdateView,
     UserDeleteView,
     CommentaryCreateView,
+    CommentaryListView,
     ToggleLikeView,
     CommentaryDeleteView,
     CommentaryUpdateView,
 )
 
+if settings.ASYNC_VIEWS:
+    from bp_manager.async_views import (
+        AsyncBlueprintListView as BlueprintListView,
+        AsyncBlueprintDetailView as BlueprintDetailView,
+        AsyncToggleLikeView as ToggleLikeView,
+    )
+
 urlpatterns = [
     path("", BlueprintListView.as_view(), name="index"),
     path(
         "blueprints/<int:pk>/", BlueprintDetailView.as_view(), name="blueprint-detail"
     ),
+    path(
+        "blueprints/<int:pk>/string/",
+        BlueprintStringView.as_view(),
+        name="blueprint-string",
+    ),
+    path(
+        "blueprints/<int:pk>/entries/<int:index>/",
+        BookEntryDetailView.as_view(),
+        name="book-entry-detail",
+    ),
+    path(
+        "blueprints/<int:pk>/entries/<int:index>/string/",
+        BookEntryStringView.as_view(),
+        name="book-entry-string",
+    ),
     path("blueprints/create/", BlueprintCreateView.as_view(), name="blueprint-create"),
     path(
         "blueprints/<int:pk>/update/",
@@ -34,10 +71,15 @@ urlpatterns = [
     ),
     path("blueprints/<int:pk>/like/", ToggleLikeView.as_view(), name="toggle-like"),
     path(
-        "comments/create/",
+        "blueprints/<int:pk>/comments/",
         CommentaryCreateView.as_view(),
         name="add-comment",
     ),
+    path(
+        "blueprints/<int:pk>/comments/page/",
+        CommentaryListView.as_view(),
+        name="comment-list",
+    ),
     path(
         "comments/<int:pk>/update/",
         CommentaryUpdateView.as_view(),
@@ -60,6 +102,42 @@ urlpatterns = [
         UserDeleteView.as_view(),
         name="user-delete",
     ),
+    path(
+        "api/v1/blueprints/",
+        BlueprintListApiView.as_view(),
+        name="api-blueprint-list",
+    ),
+    path(
+        "api/v1/blueprints/batch/",
+        BlueprintBatchApiView.as_view(),
+        name="api-blueprint-batch",
+    ),
+    path(
+        "api/v1/blueprints/<int:pk>/",
+        BlueprintDetailApiView.as_view(),
+        name="api-blueprint-detail",
+    ),
+    path(
+        "api/v1/blueprints/<int:pk>/entries/",
+        BookEntryListApiView.as_view(),
+        name="api-book-entry-list",
+    ),
+    path(
+        "api/v1/blueprints/<int:pk>/entries/<int:index>/",
+        BookEntryDetailApiView.as_view(),
+        name="api-book-entry-detail",
+    ),
+    path("api/v1/tags/", TagListApiView.as_view(), name="api-tag-list"),
+    path(
+        "api/v1/tags/complete/",
+        TagCompleteApiView.as_view(),
+        name="api-tag-complete",
+    ),
+    path(
+        "api/v1/users/<str:username>/blueprints/",
+        UserBlueprintListApiView.as_view(),
+        name="api-user-blueprint-list",
+    ),
 ]
 
 app_name = "bp_manager"
@@ -1,7 +1,10 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import redirect, get_object_or_404
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
+from django.utils.functional import cached_property
 from django.views import View
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import (
@@ -11,6 +14,7 @@ from django.views.generic.edit import (
     FormView,
 )
 
+from bp_manager import cache, conditional, facets, likes
 from bp_manager.forms import (
     CommentaryForm,
     BlueprintForm,
@@ -19,40 +23,47 @@ from bp_manager.forms import (
     UserDeleteForm,
     BlueprintSearchForm,
 )
-from bp_manager.models import Blueprint, Commentary, User, Like
-from bp_manager.mixins import UserIsOwnerMixin
+from bp_manager.models import Blueprint, BlueprintBookEntry, Commentary, User, Like
+from bp_manager.mixins import (
+    BlueprintDetailMixin,
+    BlueprintFilterMixin,
+    CommentPageMixin,
+    UserIsOwnerMixin,
+)
+from bp_manager.pagination import CursorPaginator, InvalidCursor
 
 
-class BlueprintListView(ListView):
+class BlueprintListView(BlueprintFilterMixin, ListView):
     model = Blueprint
     context_object_name = "blueprint_list"
     template_name = "bp_manager/blueprint_list.html"
 
-    paginate_by = 8
+    def get(self, request, *args, **kwargs):
+        paginator = CursorPaginator(
+            self.get_queryset(), self.paginate_by, ordering=self.ordering
+        )
+        try:
+            window, _ = paginator.window(request.GET.get("cursor"))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        etag = self.get_etag(window)
+        response = conditional.not_modified(request, etag)
+        if response is None:
+            response = conditional.add_validators(
+                super().get(request, *args, **kwargs), etag
+            )
+        return response
 
     def get_queryset(self):
-        queryset = Blueprint.objects.select_related("user").prefetch_related(
-            "tags", "comments"
-        )
-        query = self.request.GET.get("query", "")
-        tag = self.request.GET.get("tag", "")
-        username = self.request.GET.get("username", "")
-        liked = self.request.GET.get("liked", "")
-
-        if tag:
-            queryset = queryset.filter(tags__name=tag).distinct()
-        elif liked == "true" and self.request.user.is_authenticated:
-            queryset = queryset.filter(likes__user=self.request.user).distinct()
-        elif username:
-            queryset = queryset.filter(user__username=username).distinct()
-        elif query:
-            queryset = queryset.filter(
-                Q(user__username__icontains=query)
-                | Q(title__icontains=query)
-                | Q(tags__name__icontains=query)
-            ).distinct()
-
-        return queryset
+        return self.filter_blueprints(self.get_base_queryset(), self.request.user)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, ordering=self.ordering)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -60,35 +71,102 @@ class BlueprintListView(ListView):
         liked_blueprints = []
 
         if user.is_authenticated:
-            liked_blueprints = Like.objects.filter(user=user).values_list(
-                "blueprint_id", flat=True
+            blueprint_ids = [blueprint.pk for blueprint in context["blueprint_list"]]
+            liked_blueprints = likes.merge_liked(
+                user,
+                blueprint_ids,
+                Like.objects.filter(user=user, blueprint__in=blueprint_ids).values_list(
+                    "blueprint_id", flat=True
+                ),
             )
 
         context["search_form"] = BlueprintSearchForm(self.request.GET or None)
+        context["tag_facets"] = facets.tag_facets(self.object_list, self.filters)
         context["liked_blueprints"] = liked_blueprints
+        context["blueprint_cards"] = cache.render_cards(
+            context["blueprint_list"], self.request, liked_blueprints
+        )
         return context
 
 
-class BlueprintDetailView(DetailView):
+class BlueprintDetailView(BlueprintDetailMixin, DetailView):
     model = Blueprint
     template_name = "bp_manager/blueprint_detail.html"
     context_object_name = "blueprint"
-    queryset = Blueprint.objects.prefetch_related("tags")
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = conditional.detail_validators(request, kwargs["pk"])
+        if etag is not None:
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+        response = super().get(request, *args, **kwargs)
+        return self.add_detail_validators(response, etag, last_modified)
+
+    def get_object(self, queryset=None):
+        self.detail = self.get_detail(self.kwargs["pk"])
+        return self.detail["blueprint"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context.update(self.detail)
         context["commentary_form"] = CommentaryForm()
-        context["comments"] = Commentary.objects.filter(
-            blueprint=self.object
-        ).select_related("user")
-        self.request.session["blueprint_id"] = self.object.pk
+        user = self.request.user
+        context["liked"] = user.is_authenticated and likes.is_liked(
+            user, self.object.pk
+        )
+        likes.add_pending_counts([self.object])
         return context
 
 
+class BlueprintStringView(View):
+    """The full exchange string as text, for books too large to inline."""
+
+    @staticmethod
+    def get(request, pk, *args, **kwargs):
+        blueprint_string = get_object_or_404(
+            Blueprint.objects.values_list("payload__blueprint_string", flat=True),
+            pk=pk,
+        )
+        return HttpResponse(
+            blueprint_string or "", content_type="text/plain; charset=utf-8"
+        )
+
+
+class BookEntryDetailView(DetailView):
+    model = BlueprintBookEntry
+    template_name = "bp_manager/book_entry_detail.html"
+    context_object_name = "entry"
+
+    def get_object(self, queryset=None):
+        return get_object_or_404(
+            BlueprintBookEntry.objects.select_related("book__user"),
+            book_id=self.kwargs["pk"],
+            index=self.kwargs["index"],
+        )
+
+
+class BookEntryStringView(View):
+    @staticmethod
+    def get(request, pk, index, *args, **kwargs):
+        blueprint_string = get_object_or_404(
+            BlueprintBookEntry.objects.values_list("blueprint_string", flat=True),
+            book_id=pk,
+            index=index,
+        )
+        return HttpResponse(blueprint_string, content_type="text/plain; charset=utf-8")
+
+
 class BlueprintCreateView(LoginRequiredMixin, CreateView):
     model = Blueprint
     form_class = BlueprintForm
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # The owner is needed during validation for the duplicate check
+        kwargs["instance"] = Blueprint(user=self.request.user)
+        return kwargs
+
     def form_valid(self, form):
         form.instance.user = self.request.user
         return super().form_valid(form)
@@ -158,25 +236,59 @@ class UserDeleteView(LoginRequiredMixin, UserIsOwnerMixin, FormView):
             return self.form_invalid(form)
 
 
-class CommentaryCreateView(LoginRequiredMixin, CreateView):
+class CommentaryListView(CommentPageMixin, View):
+    """A page of a blueprint's comments as an HTML fragment."""
+
+    template_name = "bp_manager/commentary_page.html"
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            page = self.get_comment_paginator(pk).page(request.GET.get("cursor"))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return TemplateResponse(
+            request, self.template_name, self.comment_context(page, pk)
+        )
+
+
+class CommentaryCreateView(LoginRequiredMixin, CommentPageMixin, CreateView):
     model = Commentary
     form_class = CommentaryForm
     template_name = "bp_manager/blueprint_detail.html"
 
+    @cached_property
+    def blueprint(self):
+        # Looked up once the login check has passed
+        return get_object_or_404(Blueprint, pk=self.kwargs["pk"])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["commentary_form"] = context["form"]
+        context["blueprint"] = Blueprint.objects.for_detail().get(pk=self.blueprint.pk)
+        context.update(
+            self.comment_context(
+                self.get_comment_paginator(self.blueprint.pk).page(),
+                self.blueprint.pk,
+            )
+        )
+        return context
+
     def form_valid(self, form):
-        blueprint_id = self.request.session.get("blueprint_id")
-        blueprint = get_object_or_404(Blueprint, pk=blueprint_id)
+        blueprint = self.blueprint
 
         commentary = form.save(commit=False)
         commentary.blueprint = blueprint
         commentary.user = self.request.user
-        commentary.save()
+        # The comment count is adjusted by bp_manager.signals
+        with transaction.atomic():
+            commentary.save()
 
         return redirect(commentary.get_absolute_url())
 
 
 class CommentaryUpdateView(LoginRequiredMixin, UserIsOwnerMixin, UpdateView):
     model = Commentary
+    queryset = Commentary.objects.select_related("user")
     form_class = CommentaryForm
     template_name = "bp_manager/blueprint_detail.html"
 
@@ -187,10 +299,11 @@ class CommentaryUpdateView(LoginRequiredMixin, UserIsOwnerMixin, UpdateView):
         context = super().get_context_data(**kwargs)
         context["edit_comment_form"] = self.get_form()
         context["comment_to_edit"] = self.object
-        context["blueprint"] = self.object.blueprint
-        context["comments"] = Commentary.objects.filter(
-            blueprint=self.object.blueprint
-        ).select_related("user")
+        context["blueprint"] = Blueprint.objects.for_detail().get(
+            pk=self.object.blueprint_id
+        )
+        # Only the comment being edited, not the whole thread
+        context["comments"] = [self.object]
         return context
 
     def form_valid(self, form):
@@ -202,7 +315,8 @@ class CommentaryDeleteView(LoginRequiredMixin, UserIsOwnerMixin, View):
     @staticmethod
     def post(request, pk, *args, **kwargs):
         commentary = get_object_or_404(Commentary, pk=pk)
-        blueprint_pk = commentary.blueprint.pk
+        blueprint_pk = commentary.blueprint_id
+        # Deleting runs in a transaction with the signal adjusting the count
         commentary.delete()
         return redirect(
             reverse_lazy("bp_manager:blueprint-detail", kwargs={"pk": blueprint_pk})
@@ -211,15 +325,33 @@ class CommentaryDeleteView(LoginRequiredMixin, UserIsOwnerMixin, View):
 
 
 class ToggleLikeView(LoginRequiredMixin, View):
+    """``PUT`` likes and ``DELETE`` unlikes, answering with the new state as
+    JSON for the like buttons. ``POST`` toggles and redirects, for forms
+    submitted without JavaScript."""
+
+    def handle_no_permission(self):
+        if self.request.method in ("PUT", "DELETE"):
+            return JsonResponse({"error": "Log in to like blueprints."}, status=401)
+        return super().handle_no_permission()
+
+    def put(self, request, pk, *args, **kwargs):
+        return self.set_liked(request, pk, True)
+
+    def delete(self, request, pk, *args, **kwargs):
+        return self.set_liked(request, pk, False)
+
+    @staticmethod
+    def set_liked(request, pk, liked: bool):
+        try:
+            like_count = likes.set_liked(request.user, pk, liked)
+        except Blueprint.DoesNotExist:
+            return JsonResponse({"error": "Blueprint not found."}, status=404)
+        return JsonResponse({"liked": liked, "like_count": like_count})
+
     @staticmethod
     def post(request, pk, *args, **kwargs):
         blueprint = get_object_or_404(Blueprint, pk=pk)
-        user = request.user
-
-        like, created = Like.objects.get_or_create(user=user, blueprint=blueprint)
-
-        if not created:
-            like.delete()
+        likes.toggle(request.user, blueprint.pk)
         return redirect(reverse_lazy("bp_manager:index") + f"#blueprint-{blueprint.pk}")
 
     @staticmethod
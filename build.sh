@@ -18,3 +18,22 @@ python manage.py migrate
 
 # Load demo data
 python manage.py loaddata demo_data.json
+
+# Fill the denormalized like and comment counters for the demo data
+python manage.py recount_blueprints
+
+# The fixture only holds the raw strings: decode them into the metadata
+# columns and book entries
+python manage.py rebuild_blueprint_metadata
+
+# Index the demo data for full-text search
+python manage.py rebuild_search_index
+
+# Index the demo data for the has/lacks filters and similar blueprints
+python manage.py rebuild_entity_index
+
+# Compute the trending scores of the demo likes and comments
+python manage.py refresh_trending
+
+# Generate thumbnails and WebP copies of the demo images
+python manage.py generate_image_variants
@@ -0,0 +1,146 @@
+import mimetypes
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from bp_manager.images import DERIVATIVE_NAME_RE
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return the inclusive byte range requested by a single-range header.
+
+    Raises ValueError for unsatisfiable ranges and returns None when the
+    header should be ignored (multiple ranges or a malformed value).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    if size == 0:
+        raise ValueError("Empty file.")
+
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if length == 0:
+            raise ValueError("Empty suffix range.")
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range starts beyond the end of the file.")
+    return start, end
+
+
+def _range_matches(request, etag: str, mtime: int) -> bool:
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == mtime
+
+
+def _read_range(path: Path, start: int, length: int):
+    with path.open("rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve uploaded media with validators, byte ranges and cache headers.
+
+    With ``MEDIA_SENDFILE_HEADER`` set, only headers are produced and the
+    body transfer is delegated to the front server.
+    """
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404("Invalid media path.")
+
+    try:
+        stat = full_path.stat()
+    except OSError:
+        raise Http404("Media file not found.")
+    if not full_path.is_file():
+        raise Http404("Media file not found.")
+
+    mtime = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL
+        if DERIVATIVE_NAME_RE.search(path)
+        else f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+    )
+
+    def with_validators(response):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(mtime)
+        response["Cache-Control"] = cache_control
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if not_modified is not None:
+        return with_validators(not_modified)
+
+    content_type, encoding = mimetypes.guess_type(str(full_path))
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_SENDFILE_HEADER:
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_SENDFILE_HEADER == "X-Accel-Redirect":
+            target = settings.MEDIA_SENDFILE_PREFIX + quote(path)
+        else:
+            target = os.fspath(full_path)
+        response[settings.MEDIA_SENDFILE_HEADER] = target
+        if encoding:
+            response["Content-Encoding"] = encoding
+        return with_validators(response)
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and _range_matches(request, etag, mtime):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return with_validators(response)
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(
+        _read_range(full_path, start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type,
+    )
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return with_validators(response)
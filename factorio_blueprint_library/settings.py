@@ -97,6 +97,56 @@ DATABASES = {
 db_from_env = dj_database_url.config(conn_max_age=500)
 DATABASES["default"].update(db_from_env)
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+# The default memory cache is per process. Deployments running several
+# processes should share one, e.g. CACHE_BACKEND set to
+# django.core.cache.backends.redis.RedisCache with a redis:// location, or
+# to FileBasedCache with a directory.
+
+CACHES = {
+    "default": {
+        "BACKEND": getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Dotted path to the blueprint search backend. When empty, the backend is
+# picked from the database vendor (Postgres tsvector or SQLite FTS5).
+
+BLUEPRINT_SEARCH_BACKEND = getenv("BLUEPRINT_SEARCH_BACKEND", "")
+
+# Serve the list, detail and like views with their async implementations.
+# Only worth enabling when the project runs under ASGI (uvicorn).
+
+ASYNC_VIEWS = getenv("ASYNC_VIEWS", "False") == "True"
+
+# Lifetime of rendered blueprint cards in the cache. Entries are keyed by the
+# blueprint version, so this only bounds how long stale versions linger.
+
+CARD_CACHE_TIMEOUT = int(getenv("CARD_CACHE_TIMEOUT", 24 * 60 * 60))
+
+# Lifetime of cached tag counts for filtered blueprint lists, see
+# bp_manager.facets.
+
+FACET_CACHE_TIMEOUT = int(getenv("FACET_CACHE_TIMEOUT", 5 * 60))
+
+# How long the shared part of a blueprint detail page is served from the
+# cache. Entries are keyed by the blueprint version, so this only bounds how
+# stale the similar blueprints get. See bp_manager.cache.read_through.
+
+DETAIL_CACHE_TIMEOUT = int(getenv("DETAIL_CACHE_TIMEOUT", 10 * 60))
+
+# Record likes in a cache journal written to the database in batches, see
+# bp_manager.likes. The cache must be shared by all processes and must not
+# evict keys. With the interval at 0 run the flush_likes command instead of
+# the per-process flusher threads.
+
+LIKE_BUFFER = getenv("LIKE_BUFFER", "False") == "True"
+LIKE_BUFFER_FLUSH_INTERVAL = float(getenv("LIKE_BUFFER_FLUSH_INTERVAL", 5))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -144,6 +194,19 @@ MEDIA_URL = "/media/"
 
 MEDIA_ROOT = BASE_DIR / "media/"
 
+# Browser cache lifetime for original uploads. Resized derivatives embed a
+# content digest in their name and are always served as immutable.
+
+MEDIA_CACHE_MAX_AGE = int(getenv("MEDIA_CACHE_MAX_AGE", 24 * 60 * 60))
+
+# Hand media transfers to the front server instead of streaming them from a
+# worker: "X-Accel-Redirect" for nginx (the file is looked up under
+# MEDIA_SENDFILE_PREFIX, an internal location) or "X-Sendfile" for
+# Apache/lighttpd. Empty serves the files from Django.
+
+MEDIA_SENDFILE_HEADER = getenv("MEDIA_SENDFILE_HEADER", "")
+MEDIA_SENDFILE_PREFIX = getenv("MEDIA_SENDFILE_PREFIX", "/protected-media/")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -0,0 +1,52 @@
+// static/js/comments.js
+
+// Comment threads render their first page inline. The "More comments" item
+// at the end fetches the next page as an HTML fragment when it scrolls into
+// view or is clicked, and is replaced by it.
+function loadMoreComments(item, observer) {
+    if (item.dataset.loading) {
+        return;
+    }
+    item.dataset.loading = "true";
+    fetch(item.getAttribute("data-comments-next-url"))
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            observer.unobserve(item);
+            const fragment = document.createElement("template");
+            fragment.innerHTML = html;
+            const next = fragment.content.querySelector("[data-comments-next-url]");
+            item.replaceWith(fragment.content);
+            if (next) {
+                watchMoreComments(next, observer);
+            }
+        })
+        .catch(function (err) {
+            delete item.dataset.loading;
+            console.error("Error loading comments: ", err);
+        });
+}
+
+function watchMoreComments(item, observer) {
+    item.querySelector("button").addEventListener("click", function () {
+        loadMoreComments(item, observer);
+    });
+    observer.observe(item);
+}
+
+document.addEventListener("DOMContentLoaded", function () {
+    const observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                loadMoreComments(entry.target, observer);
+            }
+        });
+    }, {rootMargin: "200px"});
+    document.querySelectorAll("[data-comments-next-url]").forEach(function (item) {
+        watchMoreComments(item, observer);
+    });
+});
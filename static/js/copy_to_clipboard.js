@@ -1,35 +1,66 @@
 // static/js/copy_to_clipboard.js
 
+function showCopyMessage(successful) {
+    document.getElementById("copyMessage").innerHTML = successful ? "Copied!" : "Failed to copy!";
+}
+
+function copyElementContents(copyElement) {
+    const range = document.createRange();
+    range.selectNodeContents(copyElement);
+
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+
+    selection.addRange(range);
+
+    try {
+        showCopyMessage(document.execCommand('copy'));
+    } catch (err) {
+        console.error('Error copying text: ', err);
+    }
+
+    selection.removeAllRanges();
+}
+
+// Large strings (blueprint books) are not inlined in the page and are
+// fetched only when copied.
+function copyFromUrl(url) {
+    fetch(url)
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (text) {
+            return navigator.clipboard.writeText(text);
+        })
+        .then(function () {
+            showCopyMessage(true);
+        })
+        .catch(function (err) {
+            console.error('Error copying text: ', err);
+            showCopyMessage(false);
+        });
+}
+
 document.addEventListener("DOMContentLoaded", function () {
     const copyButtons = document.querySelectorAll(".copyBtn");
 
     copyButtons.forEach(function (button) {
         button.addEventListener("click", function () {
+            const url = button.getAttribute("data-copy-url");
+            if (url) {
+                copyFromUrl(url);
+                return;
+            }
+
             const targetId = button.getAttribute("data-copy-target");
 
             const copyElement = document.getElementById(targetId);
 
             if (copyElement) {
-                const range = document.createRange();
-                range.selectNodeContents(copyElement);
-
-                const selection = window.getSelection();
-                selection.removeAllRanges();
-
-                selection.addRange(range);
-
-                try {
-                    const successful = document.execCommand('copy');
-                    if (successful) {
-                        document.getElementById("copyMessage").innerHTML = "Copied!";
-                    } else {
-                        document.getElementById("copyMessage").innerHTML = "Failed to copy!";
-                    }
-                } catch (err) {
-                    console.error('Error copying text: ', err);
-                }
-
-                selection.removeAllRanges();
+                copyElementContents(copyElement);
             }
         });
     });
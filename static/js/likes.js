@@ -0,0 +1,54 @@
+// static/js/likes.js
+
+// Like buttons are forms posting to the toggle-like URL. With JavaScript the
+// heart and count flip at once and the like is set with PUT or DELETE on the
+// same URL; the response corrects them, and failures restore them.
+function showLike(form, liked, likeCount) {
+    const icon = form.querySelector(".like-btn i");
+    icon.classList.toggle("bxs-heart", liked);
+    icon.classList.toggle("bx-heart", !liked);
+    form.querySelector(".like-count").textContent = likeCount;
+}
+
+function attachLikeForm(form) {
+    form.addEventListener("submit", function (event) {
+        event.preventDefault();
+        if (form.dataset.pending) {
+            return;
+        }
+        const wasLiked = form.querySelector(".like-btn i").classList.contains("bxs-heart");
+        const previousCount = parseInt(form.querySelector(".like-count").textContent, 10);
+        const liked = !wasLiked;
+        showLike(form, liked, previousCount + (liked ? 1 : -1));
+
+        form.dataset.pending = "true";
+        fetch(form.action, {
+            method: liked ? "PUT" : "DELETE",
+            headers: {"X-CSRFToken": form.querySelector("[name=csrfmiddlewaretoken]").value},
+        })
+            .then(function (response) {
+                if (response.status === 401) {
+                    // Let the fallback redirect to the login page
+                    form.submit();
+                }
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                showLike(form, data.liked, data.like_count);
+            })
+            .catch(function (err) {
+                showLike(form, wasLiked, previousCount);
+                console.error("Error updating like: ", err);
+            })
+            .finally(function () {
+                delete form.dataset.pending;
+            });
+    });
+}
+
+document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("form.like-form").forEach(attachLikeForm);
+});
@@ -0,0 +1,70 @@
+// static/js/tag_autocomplete.js
+
+// Tag selects only render the selected tags. A search box above each one
+// suggests more from the tag completion endpoint.
+function createSuggestionButton(select, tag, suggestions, input) {
+    const button = document.createElement("button");
+    button.type = "button";
+    button.className = "btn btn-sm btn-secondary bg-gradient me-1 mb-1";
+    button.textContent = tag.name + " (" + tag.blueprint_count + ")";
+    button.addEventListener("click", function () {
+        let option = select.querySelector('option[value="' + tag.id + '"]');
+        if (!option) {
+            option = new Option(tag.name, tag.id);
+            select.add(option);
+        }
+        option.selected = true;
+        suggestions.replaceChildren();
+        input.value = "";
+        input.focus();
+    });
+    return button;
+}
+
+function attachTagAutocomplete(select) {
+    const url = select.getAttribute("data-autocomplete-url");
+    const input = document.createElement("input");
+    input.type = "search";
+    input.className = "form-control mb-1";
+    input.placeholder = "Search tags";
+    const suggestions = document.createElement("div");
+    select.before(input, suggestions);
+
+    let timer = null;
+    let controller = null;
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            if (controller) {
+                controller.abort();
+            }
+            const prefix = input.value.trim();
+            if (!prefix) {
+                suggestions.replaceChildren();
+                return;
+            }
+            controller = new AbortController();
+            fetch(url + "?q=" + encodeURIComponent(prefix), {signal: controller.signal})
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .then(function (data) {
+                    suggestions.replaceChildren(...data.results.map(function (tag) {
+                        return createSuggestionButton(select, tag, suggestions, input);
+                    }));
+                })
+                .catch(function (err) {
+                    if (err.name !== "AbortError") {
+                        console.error("Error loading tags: ", err);
+                    }
+                });
+        }, 150);
+    });
+}
+
+document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select[data-autocomplete-url]").forEach(attachTagAutocomplete);
+});
@@ -0,0 +1,28 @@
+from django.urls import include, path
+
+from bp_manager import urls
+from bp_manager.async_views import (
+    AsyncBlueprintListView,
+    AsyncBlueprintDetailView,
+    AsyncToggleLikeView,
+)
+
+# bp_manager.urls as wired with ASYNC_VIEWS enabled
+async_patterns = [
+    path("", AsyncBlueprintListView.as_view(), name="index"),
+    path(
+        "blueprints/<int:pk>/",
+        AsyncBlueprintDetailView.as_view(),
+        name="blueprint-detail",
+    ),
+    path(
+        "blueprints/<int:pk>/like/",
+        AsyncToggleLikeView.as_view(),
+        name="toggle-like",
+    ),
+]
+
+urlpatterns = [
+    path("", include((async_patterns + urls.urlpatterns, "bp_manager"))),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from bp_manager.models import Blueprint, Like, Tag
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.other = User.objects.create_user(username="other", password="password")
+        self.tag = Tag.objects.create(name="smelting")
+        self.blueprints = [
+            Blueprint.objects.create(
+                title=f"Blueprint {i}",
+                user=self.user if i % 2 else self.other,
+                blueprint_string=f"0string{i}",
+            )
+            for i in range(5)
+        ]
+        self.blueprints[0].tags.add(self.tag)
+
+    def test_list_is_cursor_paginated(self):
+        url = reverse("bp_manager:api-blueprint-list")
+        response = self.client.get(url, {"limit": 3})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [item["id"] for item in data["results"]],
+            [bp.pk for bp in self.blueprints[:1:-1]],
+        )
+        self.assertIsNone(data["previous"])
+        self.assertNotIn("blueprint_string", data["results"][0])
+
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(
+            [item["id"] for item in data["results"]],
+            [bp.pk for bp in self.blueprints[1::-1]],
+        )
+        self.assertIsNone(data["next"])
+        self.assertEqual(data["results"][1]["tags"], ["smelting"])
+
+    def test_list_filters_and_errors(self):
+        url = reverse("bp_manager:api-blueprint-list")
+        data = self.client.get(url, {"tag": "Smelting"}).json()
+        self.assertEqual(
+            [item["id"] for item in data["results"]], [self.blueprints[0].pk]
+        )
+
+        self.assertEqual(self.client.get(url, {"cursor": "garbage"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"fields": "password"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"limit": "many"}).status_code, 400)
+
+    def test_heavy_fields_are_opt_in(self):
+        url = reverse("bp_manager:api-blueprint-list")
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {"fields": "blueprint_string"}).json()
+        self.assertEqual(
+            [item["blueprint_string"] for item in data["results"]],
+            [f"0string{i}" for i in range(4, -1, -1)],
+        )
+
+    def test_user_listing(self):
+        url = reverse("bp_manager:api-user-blueprint-list", args=["testuser"])
+        data = self.client.get(url).json()
+        self.assertEqual(
+            [item["id"] for item in data["results"]],
+            [self.blueprints[3].pk, self.blueprints[1].pk],
+        )
+        self.assertEqual({item["author"] for item in data["results"]}, {"testuser"})
+
+        url = reverse("bp_manager:api-user-blueprint-list", args=["nobody"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_batch(self):
+        first, second = self.blueprints[1], self.blueprints[3]
+        url = reverse("bp_manager:api-blueprint-batch")
+        response = self.client.get(url, {"ids": f"{second.pk},0,{first.pk}"})
+        data = response.json()
+        self.assertEqual(
+            [item["id"] for item in data["results"]], [second.pk, first.pk]
+        )
+        self.assertEqual(data["missing"], [0])
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"ids": "1,x"}).status_code, 400)
+        ids = ",".join(str(i) for i in range(101))
+        self.assertEqual(self.client.get(url, {"ids": ids}).status_code, 400)
+
+    def test_detail_etag_follows_version(self):
+        blueprint = self.blueprints[0]
+        url = reverse("bp_manager:api-blueprint-detail", args=[blueprint.pk])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(response.json()["title"], "Blueprint 0")
+
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        Like.objects.toggle(self.user, blueprint.pk)
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["like_count"], 1)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # Optional fields are part of the representation
+        response = self.client.get(
+            url, {"fields": "blueprint_string"}, headers={"if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        missing = reverse("bp_manager:api-blueprint-detail", args=[0])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_list_etag(self):
+        url = reverse("bp_manager:api-blueprint-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, headers={"if-none-match": etag}).status_code, 304
+        )
+
+        self.tag.name = "Smelter"
+        self.tag.save()
+        self.assertEqual(
+            self.client.get(url, headers={"if-none-match": etag}).status_code, 200
+        )
+
+    def test_tags(self):
+        url = reverse("bp_manager:api-tag-list")
+        response = self.client.get(url)
+        self.assertEqual(
+            response.json()["results"], [{"name": "smelting", "blueprint_count": 1}]
+        )
+        self.assertEqual(
+            self.client.get(
+                url, headers={"if-none-match": response["ETag"]}
+            ).status_code,
+            304,
+        )
+        self.assertEqual(self.client.post(url).status_code, 405)
+
+    def test_tag_completion(self):
+        smelters = Tag.objects.create(name="smelter-array")
+        Tag.objects.create(name="Mining")
+        for blueprint in self.blueprints[:2]:
+            blueprint.tags.add(smelters)
+        url = reverse("bp_manager:api-tag-complete")
+
+        response = self.client.get(url, {"q": "SMEL"})
+        self.assertEqual(
+            [tag["name"] for tag in response.json()["results"]],
+            ["smelter-array", "smelting"],
+        )
+        self.assertEqual(
+            self.client.get(
+                url, {"q": "smel"}, headers={"if-none-match": response["ETag"]}
+            ).status_code,
+            304,
+        )
+        with self.assertNumQueries(0):
+            self.client.get(url, {"q": "m"})
+
+        self.blueprints[3].tags.add(Tag.objects.get(name="Mining"))
+        data = self.client.get(url, {"q": "m"}).json()
+        self.assertEqual(data["results"][0]["blueprint_count"], 1)
+        self.assertEqual(self.client.get(url, {"q": "x"}).json()["results"], [])
@@ -0,0 +1,154 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from bp_manager import cache
+from bp_manager.models import Blueprint, Commentary, Like, Tag
+
+User = get_user_model()
+
+
+@override_settings(ROOT_URLCONF="tests.async_urls")
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.other = User.objects.create_user(username="other", password="password")
+        self.tag = Tag.objects.create(name="test tag")
+        self.blueprints = [
+            Blueprint.objects.create(title=f"Blueprint {i}", user=self.user)
+            for i in range(10)
+        ]
+        self.blueprints[0].tags.add(self.tag)
+        Like.objects.toggle(self.user, self.blueprints[-1].pk)
+        Commentary.objects.create(
+            content="Nice", blueprint=self.blueprints[0], user=self.other
+        )
+
+    async def test_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse("bp_manager:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context["blueprint_list"]),
+            self.blueprints[::-1][:8],
+        )
+        self.assertEqual(response.context["liked_blueprints"], [])
+        self.assertContains(response, "Blueprint 9")
+
+        next_page = await self.async_client.get(
+            reverse("bp_manager:index"),
+            {"cursor": response.context["page_obj"].next_cursor},
+        )
+        self.assertEqual(
+            list(next_page.context["blueprint_list"]), self.blueprints[1::-1]
+        )
+
+    async def test_list_liked_set_and_filters(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("bp_manager:index"))
+        self.assertEqual(response.context["liked_blueprints"], {self.blueprints[-1].pk})
+        self.assertContains(response, "bxs-heart", count=1)
+
+        response = await self.async_client.get(
+            reverse("bp_manager:index"), {"tag": "Test Tag"}
+        )
+        self.assertEqual(list(response.context["blueprint_list"]), self.blueprints[:1])
+
+        response = await self.async_client.get(
+            reverse("bp_manager:index"), {"liked": "true"}
+        )
+        self.assertEqual(list(response.context["blueprint_list"]), self.blueprints[-1:])
+
+        response = await self.async_client.get(
+            reverse("bp_manager:index"), {"query": "blueprint 9"}
+        )
+        self.assertEqual(list(response.context["blueprint_list"]), self.blueprints[-1:])
+        self.assertEqual(response.context["liked_blueprints"], {self.blueprints[-1].pk})
+
+    async def test_list_invalid_cursor(self):
+        response = await self.async_client.get(
+            reverse("bp_manager:index"), {"cursor": "garbage"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_detail(self):
+        blueprint = self.blueprints[0]
+        response = await self.async_client.get(blueprint.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["blueprint"], blueprint)
+        self.assertContains(response, "test tag")
+        self.assertContains(response, "Nice")
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        response = await self.async_client.get(
+            reverse("bp_manager:blueprint-detail", kwargs={"pk": 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_conditional_get(self):
+        for url in (reverse("bp_manager:index"), self.blueprints[0].get_absolute_url()):
+            response = await self.async_client.get(url)
+            response = await self.async_client.get(
+                url, headers={"if-none-match": response["ETag"]}
+            )
+            self.assertEqual(response.status_code, 304)
+
+    async def test_stale_detail_has_no_validators(self):
+        blueprint = self.blueprints[0]
+        await self.async_client.get(blueprint.get_absolute_url())
+        await Blueprint.objects.filter(pk=blueprint.pk).aupdate(
+            version=F("version") + 1
+        )
+        django_cache.add(f"{cache.detail_key(blueprint.pk)}:lock", True)
+
+        response = await self.async_client.get(blueprint.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    async def test_toggle_like(self):
+        blueprint = self.blueprints[0]
+        url = reverse("bp_manager:toggle-like", kwargs={"pk": blueprint.pk})
+
+        response = await self.async_client.post(url)
+        self.assertRedirects(
+            response, f"{reverse('login')}?next={url}", fetch_redirect_response=False
+        )
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(url)
+        self.assertRedirects(
+            response,
+            reverse("bp_manager:index") + f"#blueprint-{blueprint.pk}",
+            fetch_redirect_response=False,
+        )
+        await blueprint.arefresh_from_db()
+        self.assertEqual(blueprint.like_count, 1)
+        self.assertTrue(
+            await Like.objects.filter(user=self.user, blueprint=blueprint).aexists()
+        )
+
+        await self.async_client.post(url)
+        await blueprint.arefresh_from_db()
+        self.assertEqual(blueprint.like_count, 0)
+
+    async def test_set_like(self):
+        blueprint = self.blueprints[0]
+        url = reverse("bp_manager:toggle-like", kwargs={"pk": blueprint.pk})
+
+        response = await self.async_client.put(url)
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.put(url)
+        self.assertEqual(response.json(), {"liked": True, "like_count": 1})
+        response = await self.async_client.delete(url)
+        self.assertEqual(response.json(), {"liked": False, "like_count": 0})
+
+        response = await self.async_client.post(
+            reverse("bp_manager:toggle-like", kwargs={"pk": 0})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,158 @@
+import json
+import io
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from bp_manager import books, codec, search
+from bp_manager.models import Blueprint
+
+User = get_user_model()
+
+
+def blueprint(label: str, entities: int) -> dict:
+    return {
+        "item": "blueprint",
+        "label": label,
+        "version": 281479273644032,
+        "entities": [
+            {"entity_number": i, "name": "inserter", "position": {"x": i, "y": 0}}
+            for i in range(entities)
+        ],
+    }
+
+
+BOOK = {
+    "blueprint_book": {
+        "item": "blueprint-book",
+        "label": "Main bus",
+        "version": 281479273644032,
+        "blueprints": [
+            {"index": 1, "blueprint": blueprint("Smelting", 3)},
+            {"index": 0, "blueprint": blueprint("Mining", 2)},
+        ],
+    }
+}
+
+
+class BlueprintBookTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.book_string = codec.encode(BOOK)
+        self.book = Blueprint.objects.create(
+            title="Starter book", user=self.user, blueprint_string=self.book_string
+        )
+        books.sync_entries(self.book, self.book.update_decoded_metadata())
+        self.book.save()
+
+    def test_entries_follow_book_slots(self):
+        entries = list(self.book.book_entries.all())
+        self.assertTrue(self.book.is_book)
+        self.assertEqual([entry.index for entry in entries], [0, 1])
+        self.assertEqual([entry.label for entry in entries], ["Mining", "Smelting"])
+        self.assertEqual(entries[1].entity_count, 3)
+        self.assertEqual(
+            codec.decode(entries[1].blueprint_string),
+            {"blueprint": blueprint("Smelting", 3)},
+        )
+
+        self.book.blueprint_string = codec.encode({"blueprint": blueprint("Solo", 1)})
+        books.sync_entries(self.book, self.book.update_decoded_metadata())
+        self.assertFalse(self.book.is_book)
+        self.assertFalse(self.book.book_entries.exists())
+
+    def test_book_is_found_by_entry_label(self):
+        results = search.get_backend().search(Blueprint.objects.all(), "smelting")
+        self.assertEqual(list(results), [self.book])
+
+    def test_detail_page_does_not_inline_book_string(self):
+        response = self.client.get(self.book.get_absolute_url())
+        self.assertNotContains(response, self.book_string)
+        self.assertContains(
+            response, reverse("bp_manager:blueprint-string", args=[self.book.pk])
+        )
+        for entry in self.book.book_entries.all():
+            self.assertContains(response, entry.get_absolute_url())
+
+        response = self.client.get(
+            reverse("bp_manager:blueprint-string", args=[self.book.pk])
+        )
+        self.assertEqual(response.content.decode(), self.book_string)
+
+    def test_entry_pages(self):
+        entry = self.book.book_entries.get(index=1)
+        response = self.client.get(entry.get_absolute_url())
+        self.assertContains(response, "Smelting")
+        self.assertContains(response, entry.blueprint_string)
+
+        response = self.client.get(
+            reverse("bp_manager:book-entry-string", args=[self.book.pk, 1])
+        )
+        self.assertEqual(response.content.decode(), entry.blueprint_string)
+        response = self.client.get(
+            reverse("bp_manager:book-entry-detail", args=[self.book.pk, 5])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_entries(self):
+        data = self.client.get(
+            reverse("bp_manager:api-blueprint-detail", args=[self.book.pk])
+        ).json()
+        self.assertEqual(data["kind"], "blueprint_book")
+
+        data = self.client.get(data["entries_url"]).json()
+        self.assertEqual(
+            [entry["label"] for entry in data["results"]], ["Mining", "Smelting"]
+        )
+        self.assertNotIn("blueprint_string", data["results"][0])
+
+        data = self.client.get(
+            reverse("bp_manager:api-book-entry-detail", args=[self.book.pk, 1]),
+            {"fields": "blueprint_string"},
+        ).json()
+        self.assertEqual(
+            codec.decode(data["blueprint_string"]),
+            {"blueprint": blueprint("Smelting", 3)},
+        )
+
+    def test_import_explodes_books(self):
+        User.objects.create_user(username="importer", password="password")
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "books.jsonl"
+            source.write_text(json.dumps({"blueprint_string": self.book_string}))
+            call_command(
+                "import_blueprints",
+                str(source),
+                user="importer",
+                workers=0,
+                stdout=io.StringIO(),
+            )
+        imported = Blueprint.objects.get(title="Main bus")
+        self.assertEqual(imported.payload, self.book.payload)
+        self.assertEqual(
+            list(imported.book_entries.values_list("label", flat=True)),
+            ["Mining", "Smelting"],
+        )
+
+    def test_rebuild_metadata_restores_entries(self):
+        # As loaddata leaves a book: the payload without what is decoded from it
+        self.book.book_entries.all().delete()
+        Blueprint.objects.filter(pk=self.book.pk).update(kind="", entity_count=0)
+
+        output = io.StringIO()
+        call_command("rebuild_blueprint_metadata", stdout=output)
+        self.assertIn("skipped 0 undecodable strings", output.getvalue())
+
+        self.book.refresh_from_db()
+        self.assertTrue(self.book.is_book)
+        self.assertEqual(self.book.entity_count, 5)
+        self.assertEqual(
+            list(self.book.book_entries.values_list("label", flat=True)),
+            ["Mining", "Smelting"],
+        )
+        results = search.get_backend().search(Blueprint.objects.all(), "smelting")
+        self.assertEqual(list(results), [self.book])
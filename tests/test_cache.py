@@ -0,0 +1,130 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from bp_manager import cache
+from bp_manager.models import Blueprint, Commentary, Tag
+
+User = get_user_model()
+
+
+class CardCacheTest(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.blueprint = Blueprint.objects.create(user=self.user, title="Smelter")
+        self.request = RequestFactory().get("/")
+
+    def render(self, liked_ids=()):
+        self.blueprint.refresh_from_db()
+        return cache.render_cards([self.blueprint], self.request, set(liked_ids))[0]
+
+    def test_hits_and_misses_are_counted(self):
+        self.render()
+        self.render()
+        stats = cache.get_stats()
+        self.assertEqual((stats["card_hits"], stats["card_misses"]), (1, 1))
+        cache.reset_stats()
+        self.assertEqual(set(cache.get_stats().values()), {0})
+
+    def test_liked_state_is_overlaid_on_shared_html(self):
+        liked = self.render({self.blueprint.pk})
+        not_liked = self.render()
+        self.assertIn("bxs-heart", liked)
+        self.assertNotIn("bxs-heart", not_liked)
+        self.assertNotIn(cache.HEART_MARKER, liked)
+        self.assertNotIn(cache.CSRF_MARKER, liked)
+        self.assertEqual(cache.get_stats()["card_misses"], 1)
+
+    def test_version_is_bumped_by_changes(self):
+        version = Blueprint.objects.get(pk=self.blueprint.pk).version
+
+        Blueprint.objects.filter(pk=self.blueprint.pk).adjust_counts(likes=1)
+        self.blueprint.tags.add(Tag.objects.create(name="Smelting"))
+        self.blueprint.refresh_from_db()
+        self.blueprint.title = "Big smelter"
+        self.blueprint.save()
+
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.version, version + 3)
+        html = self.render()
+        self.assertIn("Big smelter", html)
+
+    def test_list_view_uses_cached_cards(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("bp_manager:toggle-like", args=[self.blueprint.pk]))
+        response = self.client.get(reverse("bp_manager:index"))
+        self.assertContains(response, "bxs-heart")
+        self.assertContains(response, f'id="blueprint-{self.blueprint.pk}"')
+
+        self.client.logout()
+        response = self.client.get(reverse("bp_manager:index"))
+        self.assertNotContains(response, "bxs-heart")
+        stats = cache.get_stats()
+        self.assertEqual((stats["card_hits"], stats["card_misses"]), (1, 1))
+
+    def test_cache_stats_command(self):
+        self.render()
+        output = io.StringIO()
+        call_command("cache_stats", reset=True, stdout=output)
+        self.assertIn("card: 0 hits, 1 misses", output.getvalue())
+        self.assertEqual(cache.get_stats()["card_misses"], 0)
+
+
+class DetailCacheTest(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.blueprint = Blueprint.objects.create(user=self.user, title="Smelter")
+        self.url = self.blueprint.get_absolute_url()
+
+    def test_second_view_only_reads_the_version(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["blueprint"], self.blueprint)
+        stats = cache.get_stats()
+        self.assertEqual((stats["detail_hits"], stats["detail_misses"]), (1, 1))
+
+    def test_changes_are_shown(self):
+        self.client.get(self.url)
+        commentary = Commentary.objects.create(
+            content="First", blueprint=self.blueprint, user=self.user
+        )
+        Blueprint.objects.filter(pk=self.blueprint.pk).adjust_counts(comments=1)
+        self.assertContains(self.client.get(self.url), "First")
+
+        commentary.content = "Edited"
+        commentary.save()
+        self.assertContains(self.client.get(self.url), "Edited")
+
+        self.blueprint.tags.add(Tag.objects.create(name="smelting"))
+        self.assertContains(self.client.get(self.url), "smelting")
+
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertContains(self.client.get(self.url), "renamed")
+
+    def test_stale_entry_is_served_while_another_caller_rebuilds(self):
+        key = cache.detail_key(self.blueprint.pk)
+        builds = []
+
+        def build():
+            builds.append(True)
+            return len(builds)
+
+        self.assertEqual(cache.read_through(key, 1, build, 60, stat="detail"), (1, 1))
+        self.assertEqual(cache.read_through(key, 1, build, 60, stat="detail"), (1, 1))
+
+        django_cache.add(f"{key}:lock", True)
+        self.assertEqual(cache.read_through(key, 2, build, 60, stat="detail"), (1, 1))
+        self.assertEqual(cache.get_stats()["detail_stale"], 1)
+
+        django_cache.delete(f"{key}:lock")
+        self.assertEqual(cache.read_through(key, 2, build, 60, stat="detail"), (2, 2))
+        self.assertEqual(cache.read_through(key, 2, build, 60, stat="detail"), (2, 2))
+        self.assertEqual(len(builds), 2)
@@ -0,0 +1,170 @@
+import zlib
+
+from django.test import SimpleTestCase
+
+from bp_manager import codec
+
+BLUEPRINT = {
+    "blueprint": {
+        "item": "blueprint",
+        "label": "Smelter",
+        "version": 281479273644032,
+        "icons": [
+            {"signal": {"type": "virtual", "name": "signal-S"}, "index": 2},
+            {"signal": {"type": "item", "name": "stone-furnace"}, "index": 1},
+        ],
+        "entities": [
+            {"entity_number": 1, "name": "stone-furnace", "position": {"x": 1, "y": 1}},
+            {"entity_number": 2, "name": "inserter", "position": {"x": 0.5, "y": 2.5}},
+            {"entity_number": 3, "name": "transport-belt", "position": {"x": 3.5, "y": 3.5}},
+        ],
+        "tiles": [{"name": "concrete", "position": {"x": 0, "y": 4}}],
+    }
+}
+
+
+class CodecTest(SimpleTestCase):
+    def test_round_trip(self):
+        blueprint_string = codec.encode(BLUEPRINT)
+        self.assertTrue(blueprint_string.startswith("0"))
+        self.assertEqual(codec.decode(blueprint_string), BLUEPRINT)
+
+    def test_decode_ignores_whitespace(self):
+        blueprint_string = codec.encode(BLUEPRINT)
+        wrapped = "\n".join(
+            blueprint_string[i:i + 40] for i in range(0, len(blueprint_string), 40)
+        )
+        self.assertEqual(codec.decode(f"  {wrapped}\n"), BLUEPRINT)
+
+    def test_decode_rejects_garbage(self):
+        for value in ["", "some blueprint string", "1abc", "0!!!!", "0" + "A" * 8]:
+            with self.assertRaises(codec.BlueprintDecodeError):
+                codec.decode(value)
+
+    def test_inflate_is_size_bounded(self):
+        bomb = zlib.compress(b"\0" * (4 * 1024 * 1024))
+        with self.assertRaises(codec.BlueprintDecodeError):
+            codec.inflate(bomb, max_size=1024 * 1024)
+        self.assertEqual(len(codec.inflate(bomb)), 4 * 1024 * 1024)
+
+    def test_inflate_rejects_truncated_stream(self):
+        with self.assertRaises(codec.BlueprintDecodeError):
+            codec.inflate(zlib.compress(b"x" * 1000)[:-6])
+
+    def test_summarize_blueprint(self):
+        summary = codec.summarize(BLUEPRINT)
+        self.assertEqual(summary["kind"], "blueprint")
+        self.assertEqual(summary["game_version"], "1.1.30")
+        self.assertEqual(summary["label"], "Smelter")
+        self.assertEqual(summary["entity_count"], 3)
+        self.assertEqual(summary["tile_count"], 1)
+        self.assertEqual((summary["width"], summary["height"]), (4, 4))
+        self.assertEqual(
+            summary["icons"],
+            [
+                {"type": "item", "name": "stone-furnace"},
+                {"type": "virtual", "name": "signal-S"},
+            ],
+        )
+
+    def test_summarize_book(self):
+        book = {
+            "blueprint_book": {
+                "item": "blueprint-book",
+                "label": "Book",
+                "version": 281479273644032,
+                "blueprints": [
+                    {"index": 0, "blueprint": BLUEPRINT["blueprint"]},
+                    {"index": 1, "blueprint": BLUEPRINT["blueprint"]},
+                ],
+            }
+        }
+        summary = codec.summarize(book)
+        self.assertEqual(summary["kind"], "blueprint_book")
+        self.assertEqual(summary["label"], "Book")
+        self.assertEqual(summary["entity_count"], 6)
+        self.assertEqual(summary["tile_count"], 2)
+        self.assertEqual((summary["width"], summary["height"]), (4, 4))
+
+    def test_book_children(self):
+        other = dict(BLUEPRINT["blueprint"], label="Other")
+        book = {
+            "blueprint_book": {
+                "item": "blueprint-book",
+                "blueprints": [
+                    {"index": 3, "blueprint": BLUEPRINT["blueprint"]},
+                    {"index": 1, "blueprint": other},
+                    {"index": 2, "deconstruction_planner": {"label": "Clear"}},
+                    {"index": 4},
+                ],
+            }
+        }
+        children = codec.book_children(book)
+        self.assertEqual(
+            children,
+            [
+                {"blueprint": other},
+                {"deconstruction_planner": {"label": "Clear"}},
+                BLUEPRINT,
+            ],
+        )
+        self.assertEqual(codec.book_children(BLUEPRINT), [])
+
+    def test_entity_counts(self):
+        beacons = {
+            "blueprint": {
+                "item": "blueprint",
+                "entities": [
+                    {"name": "beacon", "items": {"speed-module-3": 2}},
+                    {
+                        "name": "assembling-machine-3",
+                        "items": [
+                            {
+                                "id": {"name": "productivity-module-3"},
+                                "items": {"in_inventory": [{}, {}, {}, {}]},
+                            }
+                        ],
+                    },
+                    {"name": "beacon"},
+                ],
+            }
+        }
+        self.assertEqual(
+            codec.entity_counts(beacons),
+            {
+                "beacon": 2,
+                "speed-module-3": 2,
+                "assembling-machine-3": 1,
+                "productivity-module-3": 4,
+            },
+        )
+        book = {
+            "blueprint_book": {
+                "item": "blueprint-book",
+                "blueprints": [{"index": 0, **BLUEPRINT}, {"index": 1, **beacons}],
+            }
+        }
+        counts = codec.entity_counts(book)
+        self.assertEqual(counts["beacon"], 2)
+        self.assertEqual(counts["stone-furnace"], 1)
+
+    def test_malformed_items_are_skipped(self):
+        for data in (
+            {"blueprint": {"entities": [1, {"position": [0]}], "tiles": "x"}},
+            {"blueprint": {"label": 5, "icons": [3, {"signal": "s", "index": "1"}]}},
+            {"blueprint": {"entities": [{"position": {"x": "a", "y": float("nan")}}]}},
+            {"blueprint": {"entities": [{"name": "beacon", "items": [{"id": 1}]}]}},
+            {"blueprint_book": {"blueprints": [1, {"blueprint": []}], "label": {}}},
+        ):
+            with self.subTest(data):
+                summary = codec.summarize(data)
+                self.assertEqual(summary["label"], "")
+                self.assertLessEqual(summary["width"], 1)
+                codec.entity_counts(data)
+                codec.book_entries(data)
+
+        summary = codec.summarize(
+            {"blueprint": {"entities": [1, {"position": {"x": 2, "y": 3}}]}}
+        )
+        self.assertEqual(summary["entity_count"], 2)
+        self.assertEqual((summary["width"], summary["height"]), (1, 1))
@@ -0,0 +1,54 @@
+import io
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from bp_manager import similarity
+from bp_manager.models import Blueprint
+
+
+class DemoDataTest(TestCase):
+    def load(self):
+        call_command(
+            "loaddata",
+            settings.BASE_DIR / "demo_data.json",
+            stdout=io.StringIO(),
+        )
+
+    def test_fixture_loads(self):
+        self.load()
+        self.assertEqual(Blueprint.objects.count(), 11)
+        self.assertFalse(
+            Blueprint.objects.filter(updated_time__lt=F("created_time")).exists()
+        )
+
+    def test_build_steps_fill_the_derived_data(self):
+        self.load()
+        # The commands build.sh runs after loading the fixture
+        for command in (
+            "recount_blueprints",
+            "rebuild_blueprint_metadata",
+            "rebuild_search_index",
+            "rebuild_entity_index",
+            "refresh_trending",
+        ):
+            call_command(command, stdout=io.StringIO())
+
+        self.assertFalse(Blueprint.objects.filter(kind="").exists())
+        self.assertFalse(Blueprint.objects.filter(entity_count=0).exists())
+        self.assertFalse(Blueprint.objects.filter(entities__isnull=True).exists())
+        self.assertTrue(Blueprint.objects.filter(trending_score__gt=0).exists())
+        blueprint = Blueprint.objects.first()
+        self.assertTrue(
+            Blueprint.objects.with_entities(
+                has=[blueprint.entities.first().entity_name]
+            ).exists()
+        )
+        self.assertTrue(
+            any(
+                similarity.similar_blueprints(pk)
+                for pk in Blueprint.objects.values_list("pk", flat=True)
+            )
+        )
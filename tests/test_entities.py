@@ -0,0 +1,99 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from bp_manager import codec, entities
+from bp_manager.models import Blueprint, BlueprintEntity
+
+User = get_user_model()
+
+
+def blueprint(*names: str) -> dict:
+    return {
+        "blueprint": {
+            "item": "blueprint",
+            "entities": [
+                {"entity_number": i, "name": name, "position": {"x": i, "y": 0}}
+                for i, name in enumerate(names)
+            ],
+        }
+    }
+
+
+class EntityIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.beacons = self.create("Beacons", "beacon", "assembling-machine-3")
+        self.assemblers = self.create(
+            "Assemblers", "assembling-machine-3", "assembling-machine-3"
+        )
+        self.smelting = self.create("Smelting", "stone-furnace", "inserter")
+
+    def create(self, title, *names) -> Blueprint:
+        instance = Blueprint.objects.create(
+            title=title,
+            user=self.user,
+            blueprint_string=codec.encode(blueprint(*names)),
+        )
+        entities.sync_entities(instance, instance.decode())
+        return instance
+
+    def test_sync_counts_entities(self):
+        self.assertEqual(
+            dict(self.assemblers.entities.values_list("entity_name", "count")),
+            {"assembling-machine-3": 2},
+        )
+        entities.sync_entities(self.assemblers, None)
+        self.assertFalse(self.assemblers.entities.exists())
+
+    def test_has_and_lacks(self):
+        blueprints = Blueprint.objects.order_by("title")
+        self.assertEqual(
+            list(blueprints.with_entities(has=["assembling-machine-3"])),
+            [self.assemblers, self.beacons],
+        )
+        self.assertEqual(
+            list(blueprints.with_entities(has=["assembling-machine-3", "beacon"])),
+            [self.beacons],
+        )
+        self.assertEqual(
+            list(blueprints.with_entities(lacks=["beacon", "inserter"])),
+            [self.assemblers],
+        )
+        self.assertEqual(
+            list(
+                blueprints.with_entities(has=["assembling-machine-3"], lacks=["beacon"])
+            ),
+            [self.assemblers],
+        )
+
+    def test_list_filters(self):
+        response = self.client.get(
+            reverse("bp_manager:index"),
+            {"has": "Beacon, assembling-machine-3"},
+        )
+        self.assertEqual(list(response.context["blueprint_list"]), [self.beacons])
+
+        response = self.client.get(
+            reverse("bp_manager:index"),
+            {"has": "assembling-machine-3", "lacks": "beacon"},
+        )
+        self.assertEqual(list(response.context["blueprint_list"]), [self.assemblers])
+
+    def test_rebuild_command(self):
+        BlueprintEntity.objects.all().delete()
+        output = io.StringIO()
+        call_command("rebuild_entity_index", stdout=output)
+        self.assertIn("skipped 0 undecodable strings", output.getvalue())
+        self.assertEqual(
+            list(
+                Blueprint.objects.with_entities(has=["stone-furnace"]).values_list(
+                    "title", flat=True
+                )
+            ),
+            ["Smelting"],
+        )
+        self.assertEqual(BlueprintEntity.objects.count(), 5)
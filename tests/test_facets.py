@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.test import TestCase
+from django.urls import reverse
+
+from bp_manager import facets
+from bp_manager.models import Blueprint, Tag
+
+User = get_user_model()
+
+
+class TagFacetTest(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.early = Tag.objects.create(name="early")
+        self.smelting = Tag.objects.create(name="smelting")
+        self.trains = Tag.objects.create(name="trains")
+        self.smelter = Blueprint.objects.create(user=self.user, title="Smelter")
+        self.smelter.tags.add(self.early, self.smelting)
+        self.furnaces = Blueprint.objects.create(user=self.user, title="Furnace row")
+        self.furnaces.tags.add(self.smelting)
+        self.station = Blueprint.objects.create(user=self.user, title="Train station")
+        self.station.tags.add(self.trains, self.early)
+
+    def test_unfiltered_counts_come_from_usage_counters(self):
+        with self.assertNumQueries(1):
+            found = facets.tag_facets(Blueprint.objects.all(), {})
+        self.assertEqual(
+            found,
+            [
+                {"name": "early", "count": 2},
+                {"name": "smelting", "count": 2},
+                {"name": "trains", "count": 1},
+            ],
+        )
+
+    def test_filtered_counts_are_cached(self):
+        queryset = Blueprint.objects.filter(title__icontains="s")
+        filters = {"query": "s"}
+        expected = [
+            {"name": "early", "count": 2},
+            {"name": "smelting", "count": 1},
+            {"name": "trains", "count": 1},
+        ]
+        with self.assertNumQueries(1):
+            self.assertEqual(facets.tag_facets(queryset, filters), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.tag_facets(queryset, filters), expected)
+
+    def test_tag_changes_invalidate_cached_counts(self):
+        queryset = Blueprint.objects.filter(title__icontains="station")
+        filters = {"query": "station"}
+        self.assertEqual(len(facets.tag_facets(queryset, filters)), 2)
+        self.station.tags.add(self.smelting)
+        self.assertEqual(len(facets.tag_facets(queryset, filters)), 3)
+
+    def test_list_shows_facets_of_search_result(self):
+        response = self.client.get(reverse("bp_manager:index"), {"query": "furnace"})
+        self.assertEqual(
+            response.context["tag_facets"], [{"name": "smelting", "count": 1}]
+        )
+        self.assertContains(response, "?query=furnace&amp;tag=smelting")
+
+    def test_facet_link_narrows_the_search(self):
+        url = reverse("bp_manager:index")
+        response = self.client.get(url, {"query": "s"})
+        self.assertEqual(
+            {facet["name"] for facet in response.context["tag_facets"]},
+            {"early", "smelting", "trains"},
+        )
+
+        response = self.client.get(url, {"query": "s", "tag": "early"})
+        self.assertEqual(
+            set(response.context["blueprint_list"]), {self.smelter, self.station}
+        )
+        response = self.client.get(url, {"query": "furnace", "tag": "smelting"})
+        self.assertEqual(list(response.context["blueprint_list"]), [self.furnaces])
+        response = self.client.get(url, {"query": "furnace", "tag": "early"})
+        self.assertEqual(list(response.context["blueprint_list"]), [])
+
+    def test_tag_combines_with_the_author_filter(self):
+        other = User.objects.create_user(username="other", password="password")
+        Blueprint.objects.create(user=other, title="Other smelter").tags.add(
+            self.smelting
+        )
+        response = self.client.get(
+            reverse("bp_manager:index"), {"username": "other", "tag": "smelting"}
+        )
+        self.assertEqual(
+            [blueprint.title for blueprint in response.context["blueprint_list"]],
+            ["Other smelter"],
+        )
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
+from bp_manager import codec, images
 from bp_manager.forms import (
     CommentaryForm,
     BlueprintForm,
@@ -49,6 +50,7 @@ class BlueprintFormTest(BaseTestCase):
         if blueprint and blueprint.blueprint_image:
             if os.path.exists(blueprint.blueprint_image.path):
                 os.remove(blueprint.blueprint_image.path)
+            images.delete_derivatives(blueprint.image_variants)
 
     def test_valid_form_with_existing_tags(self):
         form_data = {
@@ -78,8 +80,98 @@ class BlueprintFormTest(BaseTestCase):
         self.assertTrue(form.is_valid(), msg=f"Form errors: {form.errors}")
         blueprint = form.save()
         self.assertEqual(blueprint.tags.count(), 2)
-        self.assertIn(Tag.objects.get(name="Tag3"), blueprint.tags.all())
-        self.assertIn(Tag.objects.get(name="Tag4"), blueprint.tags.all())
+        self.assertIn(Tag.objects.get(name="tag3"), blueprint.tags.all())
+        self.assertIn(Tag.objects.get(name="tag4"), blueprint.tags.all())
+
+    def test_tags_are_normalized_and_batched(self):
+        Tag.objects.create(name="smelting")
+        form_data = {
+            "title": "Test Blueprint",
+            "description": "A blueprint for testing.",
+            "blueprint_string": "some blueprint string",
+            "existing_tags": [self.tag1.pk, self.tag2.pk],
+            "new_tags": " Smelting ,Early  Game, smelting,,early game",
+        }
+        form = BlueprintForm(data=form_data, files={"blueprint_image": self.image_file})
+        form.instance.user = self.user
+        self.assertTrue(form.is_valid(), msg=f"Form errors: {form.errors}")
+        blueprint = form.save()
+        blueprint.tags.clear()
+        Tag.objects.recount()
+        # Tag upsert and lookup, through table check and insert, search index
+        # refresh (2), version bump, usage counts: whatever the number of tags
+        with self.assertNumQueries(8):
+            form.save_tags(blueprint)
+        self.assertEqual(
+            sorted(blueprint.tags.values_list("name", flat=True)),
+            ["Tag1", "Tag2", "early game", "smelting"],
+        )
+        self.assertEqual(Tag.objects.filter(name__iexact="smelting").count(), 1)
+        self.assertEqual(
+            set(Tag.objects.values_list("name", "usage_count")),
+            {("Tag1", 1), ("Tag2", 1), ("smelting", 1), ("early game", 1)},
+        )
+
+    def test_save_stores_decoded_metadata(self):
+        blueprint_string = codec.encode(
+            {
+                "blueprint": {
+                    "item": "blueprint",
+                    "label": "Belts",
+                    "version": 281479273644032,
+                    "entities": [
+                        {"name": "transport-belt", "position": {"x": 0.5, "y": 0.5}},
+                        {"name": "transport-belt", "position": {"x": 1.5, "y": 0.5}},
+                    ],
+                }
+            }
+        )
+        form_data = {
+            "title": "Test Blueprint",
+            "description": "A blueprint for testing.",
+            "blueprint_string": blueprint_string,
+            "new_tags": "",
+        }
+        form = BlueprintForm(data=form_data, files={"blueprint_image": self.image_file})
+        form.instance.user = self.user
+        self.assertTrue(form.is_valid(), msg=f"Form errors: {form.errors}")
+        blueprint = form.save()
+        blueprint.refresh_from_db()
+        self.assertEqual(blueprint.label, "Belts")
+        self.assertEqual(blueprint.game_version, "1.1.30")
+        self.assertEqual(blueprint.entity_count, 2)
+        self.assertEqual((blueprint.width, blueprint.height), (2, 1))
+
+    def test_duplicate_upload_is_rejected_per_user(self):
+        blueprint_string = codec.encode({"blueprint": {"item": "blueprint"}})
+        Blueprint.objects.create(
+            user=self.user, title="Original", blueprint_string=blueprint_string
+        )
+        form_data = {
+            "title": "Copy",
+            "description": "Same design",
+            "blueprint_string": blueprint_string,
+            "new_tags": "",
+        }
+
+        form = BlueprintForm(data=form_data, instance=Blueprint(user=self.user))
+        self.assertFalse(form.is_valid())
+        self.assertIn('"Original"', form.errors["blueprint_string"][0])
+
+        other_user = get_user_model().objects.create_user(username="OtherUser")
+        form = BlueprintForm(
+            data=form_data,
+            files={"blueprint_image": self.image_file},
+            instance=Blueprint(user=other_user),
+        )
+        self.assertTrue(form.is_valid(), msg=f"Form errors: {form.errors}")
+
+    def test_tag_widget_renders_selected_tags_only(self):
+        form = BlueprintForm(data={"existing_tags": [self.tag2.pk]})
+        html = str(form["existing_tags"])
+        self.assertIn("Tag2", html)
+        self.assertNotIn("Tag1", html)
+        self.assertIn('data-autocomplete-url="/api/v1/tags/complete/"', html)
 
     def test_invalid_form(self):
         form_data = {
@@ -0,0 +1,100 @@
+import io
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from bp_manager import images
+from bp_manager.forms import BlueprintForm
+from bp_manager.models import Blueprint
+
+User = get_user_model()
+
+
+def png_upload(name="plan.png", size=(1600, 800)):
+    buffer = BytesIO()
+    Image.new("RGBA", size, (200, 120, 40, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ImageVariantsTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username="testuser", password="password")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_generate_derivatives(self):
+        name = default_storage.save("user_1/plan.png", png_upload())
+        variants = images.generate_derivatives(name)
+
+        self.assertEqual((variants["width"], variants["height"]), (1600, 800))
+        self.assertEqual(
+            (variants["card"]["width"], variants["card"]["height"]), (400, 200)
+        )
+        self.assertEqual(variants["detail"]["width"], 1000)
+        for variant in images.VARIANTS:
+            self.assertTrue(variants[variant]["webp"].startswith("user_1/plan."))
+            self.assertTrue(variants[variant]["webp"].endswith(".webp"))
+            self.assertTrue(variants[variant]["fallback"].endswith(".png"))
+            self.assertTrue(default_storage.exists(variants[variant]["webp"]))
+
+        images.delete_derivatives(variants)
+        self.assertFalse(default_storage.exists(variants["card"]["webp"]))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_unreadable_image(self):
+        name = default_storage.save("user_1/broken.png", BytesIO(b"not an image"))
+        self.assertEqual(images.generate_derivatives(name), {})
+
+    def test_form_saves_variants_and_template_renders_srcset(self):
+        form = BlueprintForm(
+            data={
+                "title": "Plan",
+                "description": "Description",
+                "blueprint_string": "string",
+            },
+            files={"blueprint_image": png_upload()},
+        )
+        form.instance.user = self.user
+        self.assertTrue(form.is_valid(), msg=form.errors)
+        blueprint = form.save()
+        blueprint.refresh_from_db()
+        self.assertIn("card", blueprint.image_variants)
+        self.assertTrue(blueprint.thumbnail_url.endswith(".png"))
+
+        html = Template(
+            '{% load blueprint_images %}{% blueprint_picture blueprint "card" %}'
+        ).render(Context({"blueprint": blueprint}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(" 400w", html)
+        self.assertIn(" 1000w", html)
+
+    def test_backfill_command(self):
+        blueprint = Blueprint.objects.create(
+            user=self.user, title="Plan", blueprint_image=png_upload()
+        )
+        self.assertEqual(blueprint.image_variants, {})
+        version = blueprint.version
+
+        output = io.StringIO()
+        call_command("generate_image_variants", workers=1, stdout=output)
+        self.assertIn(
+            "Generated derivatives for 1 images, 0 failed.", output.getvalue()
+        )
+
+        blueprint.refresh_from_db()
+        self.assertEqual(blueprint.image_variants["card"]["width"], 400)
+        # Cached cards with the full-size image are not served any more
+        self.assertGreater(blueprint.version, version)
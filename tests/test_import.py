@@ -0,0 +1,175 @@
+import json
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bp_manager import codec, search
+from bp_manager.models import Blueprint, Tag
+
+User = get_user_model()
+
+
+def blueprint_string(label: str, entities: int = 1) -> str:
+    return codec.encode(
+        {
+            "blueprint": {
+                "item": "blueprint",
+                "label": label,
+                "version": 281479273644032,
+                "entities": [
+                    {
+                        "entity_number": i,
+                        "name": "inserter",
+                        "position": {"x": i, "y": 0},
+                    }
+                    for i in range(entities)
+                ],
+            }
+        }
+    )
+
+
+class ImportBlueprintsCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = Path(self.directory.name) / "blueprints.jsonl"
+
+    def write_records(self, records):
+        self.source.write_text("\n".join(json.dumps(record) for record in records))
+
+    def call(self, *args, **kwargs) -> str:
+        """Run the import, returns what it reported."""
+        output = io.StringIO()
+        call_command(
+            "import_blueprints",
+            str(self.source),
+            *args,
+            workers=0,
+            stdout=output,
+            stderr=io.StringIO(),
+            **kwargs,
+        )
+        return output.getvalue()
+
+    def test_import(self):
+        self.write_records(
+            [
+                {
+                    "blueprint_string": blueprint_string("Smelter", entities=3),
+                    "tags": ["Smelting", "Early", "Smelting"],
+                    "description": "Stone furnaces",
+                },
+                {"blueprint_string": blueprint_string("Labels"), "title": "Science"},
+                {"blueprint_string": "0garbage"},
+                {"blueprint_string": blueprint_string("Orphan"), "author": "ghost"},
+                {"title": "No string"},
+            ]
+        )
+        output = self.call(user="testuser", batch_size=2)
+        self.assertIn("Imported 2 blueprints", output)
+        self.assertIn("3 records rejected in total", output)
+
+        smelter = Blueprint.objects.get(title="Smelter")
+        self.assertEqual(smelter.user, self.user)
+        self.assertEqual(smelter.entity_count, 3)
+        self.assertEqual(smelter.game_version, "1.1.30")
+        self.assertEqual(smelter.description, "Stone furnaces")
+        self.assertEqual(
+            sorted(smelter.tags.values_list("name", "usage_count")),
+            [("early", 1), ("smelting", 1)],
+        )
+        self.assertEqual(
+            dict(smelter.entities.values_list("entity_name", "count")), {"inserter": 3}
+        )
+        self.assertEqual(Blueprint.objects.get(title="Science").label, "Labels")
+        self.assertEqual(Blueprint.objects.count(), 2)
+        self.assertFalse(User.objects.filter(username="ghost").exists())
+        self.assertEqual(
+            list(search.get_backend().search(Blueprint.objects.all(), "smelting")),
+            [smelter],
+        )
+        self.assertFalse(self.source.with_name("blueprints.jsonl.checkpoint").exists())
+
+    def test_records_failing_to_summarize_are_rejected(self):
+        entity_counts = codec.entity_counts
+
+        def failing(data):
+            if data["blueprint"]["label"] == "Bad":
+                raise TypeError("unexpected contents")
+            return entity_counts(data)
+
+        self.write_records(
+            [
+                {"blueprint_string": blueprint_string("Good")},
+                {"blueprint_string": blueprint_string("Bad")},
+            ]
+        )
+        with mock.patch.object(codec, "entity_counts", failing):
+            self.call(user="testuser")
+
+        self.assertEqual(
+            list(Blueprint.objects.values_list("label", flat=True)), ["Good"]
+        )
+
+    def test_create_users(self):
+        self.write_records(
+            [{"blueprint_string": blueprint_string("Orphan"), "author": "ghost"}]
+        )
+        self.call(create_users=True)
+        ghost = User.objects.get(username="ghost")
+        self.assertFalse(ghost.has_usable_password())
+        self.assertEqual(ghost.blueprints.get().title, "Orphan")
+
+    def test_resume_from_checkpoint(self):
+        self.write_records(
+            [{"blueprint_string": blueprint_string(f"Blueprint {i}")} for i in range(5)]
+        )
+        checkpoint = Path(self.directory.name) / "state.json"
+        checkpoint.write_text(
+            json.dumps(
+                {
+                    "source": str(self.source.resolve()),
+                    "position": 3,
+                    "imported": 3,
+                    "rejected": 0,
+                }
+            )
+        )
+        self.call(user="testuser", checkpoint=str(checkpoint))
+        self.assertEqual(
+            sorted(Blueprint.objects.values_list("title", flat=True)),
+            ["Blueprint 3", "Blueprint 4"],
+        )
+        self.assertFalse(checkpoint.exists())
+
+        checkpoint.write_text(json.dumps({"source": "elsewhere", "position": 1}))
+        with self.assertRaises(CommandError):
+            self.call(user="testuser", checkpoint=str(checkpoint))
+        # Records the user already owns are skipped as duplicates
+        self.call(user="testuser", checkpoint=str(checkpoint), restart=True)
+        self.assertEqual(Blueprint.objects.count(), 5)
+
+    def test_directory_with_worker_processes(self):
+        directory = Path(self.directory.name)
+        (directory / "Belts.txt").write_text(blueprint_string("Belt", entities=2))
+        self.write_records([{"blueprint_string": blueprint_string("Line")}])
+        call_command(
+            "import_blueprints",
+            self.directory.name,
+            user="testuser",
+            workers=2,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(
+            sorted(Blueprint.objects.values_list("title", "entity_count")),
+            [("Belts", 2), ("Line", 1)],
+        )
+        self.assertEqual(Tag.objects.count(), 0)
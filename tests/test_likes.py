@@ -0,0 +1,134 @@
+import io
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from bp_manager import cache, likes
+from bp_manager.models import Blueprint, Like
+
+User = get_user_model()
+
+
+@override_settings(LIKE_BUFFER=True, LIKE_BUFFER_FLUSH_INTERVAL=0)
+class LikeBufferTest(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.users = [
+            User.objects.create_user(username=f"user{index}", password="password")
+            for index in range(4)
+        ]
+        self.blueprints = [
+            Blueprint.objects.create(user=self.users[0], title=f"Blueprint {index}")
+            for index in range(3)
+        ]
+
+    def like_count(self, blueprint) -> int:
+        blueprint.refresh_from_db()
+        return blueprint.like_count
+
+    def test_likes_wait_for_the_flush(self):
+        user, blueprint = self.users[0], self.blueprints[0]
+        self.assertEqual(likes.set_liked(user, blueprint.pk, True), 1)
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(self.like_count(blueprint), 0)
+
+        # The user sees their own like, everyone sees the count
+        self.assertTrue(likes.is_liked(user, blueprint.pk))
+        self.assertEqual(likes.merge_liked(user, [blueprint.pk], []), {blueprint.pk})
+        card = cache.render_cards([blueprint], RequestFactory().get("/"), set())[0]
+        self.assertIn('<p class="like-count h5 m-0">1</p>', card)
+
+        self.assertEqual(likes.flush(), 1)
+        self.assertTrue(Like.objects.filter(user=user, blueprint=blueprint).exists())
+        self.assertEqual(self.like_count(blueprint), 1)
+        self.assertEqual(likes.pending_counts([blueprint.pk]), {})
+        self.assertEqual(likes.flush(), 0)
+
+    def test_repeated_changes_are_coalesced(self):
+        user, blueprint = self.users[0], self.blueprints[0]
+        for _ in range(3):
+            likes.toggle(user, blueprint.pk)
+            likes.toggle(user, blueprint.pk)
+        likes.set_liked(user, blueprint.pk, False)
+        self.assertEqual(likes.pending_counts([blueprint.pk]), {})
+
+        # Savepoint, users, blueprints, existing likes, release; no writes
+        with self.assertNumQueries(5):
+            self.assertEqual(likes.flush(), 6)
+        self.assertFalse(Like.objects.exists())
+        version = blueprint.version
+        blueprint.refresh_from_db()
+        self.assertEqual(blueprint.version, version)
+
+    def test_no_change_is_lost_across_flushes(self):
+        rng = random.Random(7)
+        expected = set()
+        for step in range(300):
+            user = rng.choice(self.users)
+            blueprint = rng.choice(self.blueprints)
+            pair = (user.pk, blueprint.pk)
+            if rng.random() < 0.5:
+                liked = likes.toggle(user, blueprint.pk)
+            else:
+                liked = rng.random() < 0.5
+                likes.set_liked(user, blueprint.pk, liked)
+            if liked:
+                expected.add(pair)
+            else:
+                expected.discard(pair)
+            if rng.random() < 0.05:
+                likes.flush(batch_size=rng.randint(1, 20))
+
+            self.assertEqual(likes.is_liked(user, blueprint.pk), liked)
+
+        likes.flush()
+        self.assertEqual(
+            set(Like.objects.values_list("user_id", "blueprint_id")), expected
+        )
+        for blueprint in self.blueprints:
+            self.assertEqual(
+                self.like_count(blueprint),
+                sum(1 for _, pk in expected if pk == blueprint.pk),
+            )
+        self.assertEqual(likes.pending_counts([bp.pk for bp in self.blueprints]), {})
+
+    def test_unwritten_entry_is_waited_for_once(self):
+        user, blueprint = self.users[0], self.blueprints[0]
+        likes.set_liked(user, blueprint.pk, True)
+        # A writer that took a sequence number and died before its entry
+        django_cache.incr(likes.SEQUENCE_KEY)
+        likes.set_liked(self.users[1], blueprint.pk, True)
+
+        self.assertEqual(likes.flush(), 1)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(likes.flush(), 2)
+        self.assertEqual(Like.objects.count(), 2)
+
+    def test_likes_of_deleted_blueprints_are_dropped(self):
+        blueprint = self.blueprints[0]
+        likes.set_liked(self.users[0], blueprint.pk, True)
+        blueprint.delete()
+        self.assertEqual(likes.flush(), 1)
+        self.assertFalse(Like.objects.exists())
+
+    def test_views_and_command(self):
+        blueprint = self.blueprints[0]
+        url = reverse("bp_manager:toggle-like", kwargs={"pk": blueprint.pk})
+        self.client.force_login(self.users[1])
+        response = self.client.put(url)
+        self.assertEqual(response.json(), {"liked": True, "like_count": 1})
+
+        response = self.client.get(blueprint.get_absolute_url())
+        self.assertTrue(response.context["liked"])
+        self.assertEqual(response.context["blueprint"].like_count, 1)
+        response = self.client.get(reverse("bp_manager:index"))
+        self.assertEqual(response.context["liked_blueprints"], {blueprint.pk})
+
+        output = io.StringIO()
+        call_command("flush_likes", stdout=output)
+        self.assertIn("Flushed 1 buffered likes.", output.getvalue())
+        self.assertEqual(self.like_count(blueprint), 1)
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+
+class MediaServingTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        user_dir = Path(self.media_root, "user_1")
+        user_dir.mkdir()
+        self.original = user_dir / "plan.png"
+        self.original.write_bytes(bytes(range(256)) * 4)
+        (user_dir / "plan.card.0123456789ab.webp").write_bytes(b"webp")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_response_headers(self):
+        response = self.client.get("/media/user_1/plan.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.original.read_bytes())
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Content-Length"], "1024")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", response)
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    def test_derivatives_are_immutable(self):
+        response = self.client.get("/media/user_1/plan.card.0123456789ab.webp")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_conditional_requests(self):
+        etag = self.client.get("/media/user_1/plan.png")["ETag"]
+
+        response = self.client.get("/media/user_1/plan.png", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            "/media/user_1/plan.png",
+            HTTP_IF_MODIFIED_SINCE=http_date(self.original.stat().st_mtime),
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        data = self.original.read_bytes()
+
+        response = self.client.get("/media/user_1/plan.png", HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(b"".join(response.streaming_content), data[10:20])
+
+        response = self.client.get("/media/user_1/plan.png", HTTP_RANGE="bytes=-4")
+        self.assertEqual(b"".join(response.streaming_content), data[-4:])
+
+        response = self.client.get("/media/user_1/plan.png", HTTP_RANGE="bytes=2000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+        response = self.client.get(
+            "/media/user_1/plan.png", HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_SENDFILE_HEADER="X-Accel-Redirect")
+    def test_sendfile_mode(self):
+        response = self.client.get("/media/user_1/plan.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/user_1/plan.png")
+        self.assertEqual(response.content, b"")
+
+    def test_missing_and_unsafe_paths(self):
+        self.assertEqual(self.client.get("/media/user_1/missing.png").status_code, 404)
+        self.assertEqual(self.client.get("/media/user_1/").status_code, 404)
+        self.assertEqual(self.client.get("/media/../settings.py").status_code, 404)
+        self.assertEqual(self.client.post("/media/user_1/plan.png").status_code, 405)
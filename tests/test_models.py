@@ -3,7 +3,14 @@ import os
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from bp_manager.models import Tag, Blueprint, Commentary, user_blueprint_path
+from bp_manager import codec
+from bp_manager.models import (
+    Tag,
+    Blueprint,
+    BlueprintPayload,
+    Commentary,
+    user_blueprint_path,
+)
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 User = get_user_model()
@@ -60,6 +67,114 @@ class BlueprintModelTest(BaseTestCase):
         )
 
 
+class BlueprintCountersTest(BaseTestCase):
+    def test_save_keeps_counts_adjusted_meanwhile(self):
+        loaded = Blueprint.objects.get(pk=self.blueprint.pk)
+        Blueprint.objects.filter(pk=self.blueprint.pk).update(trending_score=0.0)
+        Blueprint.objects.filter(pk=self.blueprint.pk).adjust_counts(
+            likes=1, comments=2, trending=3.0
+        )
+        loaded.title = "Edited"
+        loaded.save()
+
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.title, "Edited")
+        # The comment of setUp() counts too
+        self.assertEqual(
+            (
+                self.blueprint.like_count,
+                self.blueprint.comment_count,
+                self.blueprint.trending_score,
+            ),
+            (1, 3, 3.0),
+        )
+
+    def test_save_never_moves_the_version_back(self):
+        loaded = Blueprint.objects.get(pk=self.blueprint.pk)
+        Blueprint.objects.filter(pk=self.blueprint.pk).touch()
+        self.blueprint.refresh_from_db()
+        touched = self.blueprint.version
+
+        loaded.title = "Edited"
+        loaded.save()
+        self.blueprint.refresh_from_db()
+        # Saving bumps the version once more, past every version used before
+        self.assertGreater(self.blueprint.version, touched)
+
+
+class BlueprintPayloadTest(BaseTestCase):
+    DATA = {
+        "blueprint": {
+            "item": "blueprint",
+            "label": "Belts",
+            "entities": [{"name": "transport-belt", "position": {"x": 0, "y": 0}}],
+        }
+    }
+
+    def tearDown(self):
+        if os.path.exists(self.blueprint.blueprint_image.path):
+            os.remove(self.blueprint.blueprint_image.path)
+
+    def create(self, blueprint_string):
+        return Blueprint.objects.create(
+            user=self.user, title="Copy", blueprint_string=blueprint_string
+        )
+
+    def test_equal_content_shares_one_payload(self):
+        blueprint_string = codec.encode(self.DATA)
+        # Same data, different key order and compression, wrapped in whitespace
+        reordered = {"blueprint": dict(reversed(list(self.DATA["blueprint"].items())))}
+        reencoded = "0" + codec.encode(reordered)[1:]
+        first = self.create(blueprint_string)
+        second = self.create(f"  {reencoded}\n")
+
+        self.assertEqual(first.payload_id, second.payload_id)
+        self.assertEqual(first.payload_id, codec.content_hash(self.DATA))
+        self.assertEqual(BlueprintPayload.objects.filter(pk=first.payload_id).count(), 1)
+        second.refresh_from_db()
+        self.assertEqual(second.blueprint_string, blueprint_string)
+
+    def test_payload_is_replaced_and_orphans_removed(self):
+        self.assertEqual(self.blueprint.blueprint_string, "Blueprint data")
+        old_payload = self.blueprint.payload_id
+
+        self.blueprint.blueprint_string = codec.encode(self.DATA)
+        self.blueprint.save()
+        self.assertFalse(BlueprintPayload.objects.filter(pk=old_payload).exists())
+
+        shared = self.create(self.blueprint.blueprint_string)
+        self.blueprint.delete()
+        self.assertTrue(BlueprintPayload.objects.filter(pk=shared.payload_id).exists())
+        shared.delete()
+        self.assertFalse(BlueprintPayload.objects.exists())
+
+
+class TagUsageCountTest(BaseTestCase):
+    def usage(self, tag):
+        tag.refresh_from_db()
+        return tag.usage_count
+
+    def test_usage_count_follows_assignments(self):
+        other = Tag.objects.create(name="Other")
+        self.blueprint.tags.add(self.tag, other)
+        self.blueprint.tags.add(self.tag)
+        self.assertEqual((self.usage(self.tag), self.usage(other)), (1, 1))
+
+        self.blueprint.tags.remove(other, other)
+        self.assertEqual(self.usage(other), 0)
+        self.tag.tags.add(Blueprint.objects.create(user=self.user, title="Second"))
+        self.assertEqual(self.usage(self.tag), 2)
+
+        self.blueprint.tags.clear()
+        self.assertEqual(self.usage(self.tag), 1)
+        Blueprint.objects.filter(title="Second").delete()
+        self.assertEqual(self.usage(self.tag), 0)
+
+    def test_normalize(self):
+        self.assertEqual(Tag.normalize("  Early   GAME "), "early game")
+        self.assertEqual(len(Tag.normalize("x" * 80)), 50)
+
+
 class CommentaryModelTest(BaseTestCase):
     def setUp(self):
         super().setUp()
@@ -77,3 +192,23 @@ class CommentaryModelTest(BaseTestCase):
                 + f"#comment-{self.commentary.pk}"
         )
         self.assertEqual(self.commentary.get_absolute_url(), expected_url)
+
+    def test_comments_saved_anywhere_are_counted(self):
+        # As the admin does, without the comment views
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.comment_count, 1)
+        version = self.blueprint.version
+
+        other = Commentary.objects.create(
+            user=self.user, blueprint=self.blueprint, content="Another"
+        )
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.comment_count, 2)
+        self.assertGreater(self.blueprint.version, version)
+        version = self.blueprint.version
+
+        other.delete()
+        self.commentary.delete()
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.comment_count, 0)
+        self.assertGreater(self.blueprint.version, version)
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from bp_manager.models import Blueprint
+from bp_manager.pagination import CursorPaginator, InvalidCursor
+from bp_manager.templatetags.query_transform import query_transform
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="password")
+        cls.blueprints = [
+            Blueprint.objects.create(user=cls.user, title=f"Blueprint {index}")
+            for index in range(7)
+        ]
+        # Identical timestamps exercise the id tie-breaker
+        Blueprint.objects.update(created_time=cls.blueprints[0].created_time)
+
+    def test_walks_forward_and_back(self):
+        paginator = CursorPaginator(Blueprint.objects.all(), 3)
+        expected = sorted(self.blueprints, key=lambda b: b.pk, reverse=True)
+
+        first = paginator.page()
+        self.assertEqual(list(first), expected[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(list(second), expected[3:6])
+        third = paginator.page(second.next_cursor)
+        self.assertEqual(list(third), expected[6:])
+        self.assertFalse(third.has_next())
+        self.assertIsNone(third.next_cursor)
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), expected[3:6])
+        self.assertTrue(back.has_previous())
+        self.assertEqual(list(paginator.page(back.previous_cursor)), expected[:3])
+        self.assertFalse(paginator.page(back.previous_cursor).has_previous())
+
+    def test_page_does_not_count(self):
+        paginator = CursorPaginator(Blueprint.objects.all(), 3)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_invalid_cursor(self):
+        paginator = CursorPaginator(Blueprint.objects.all(), 3)
+        for cursor in ["garbage", "eyJ2IjpbMV0sImQiOiJuIn0", "eyJ2IjpbIngiLDFdLCJkIjoibiJ9"]:
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_list_view_pages_and_rejects_bad_cursor(self):
+        for index in range(3):
+            Blueprint.objects.create(user=self.user, title=f"Extra {index}")
+
+        response = self.client.get(reverse("bp_manager:index"))
+        self.assertTrue(response.context["is_paginated"])
+        self.assertEqual(len(response.context["blueprint_list"]), 8)
+
+        next_cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(reverse("bp_manager:index"), {"cursor": next_cursor})
+        self.assertEqual(len(response.context["blueprint_list"]), 2)
+        self.assertFalse(response.context["page_obj"].has_next())
+
+        response = self.client.get(reverse("bp_manager:index"), {"cursor": "bad"})
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryTransformTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_cursor_replaces_page(self):
+        request = self.factory.get("/", {"query": "belt", "page": "3"})
+        self.assertEqual(
+            query_transform(request, cursor="abc"), "query=belt&cursor=abc"
+        )
+
+    def test_other_parameters_reset_cursor(self):
+        request = self.factory.get("/", {"query": "belt", "cursor": "abc"})
+        self.assertEqual(query_transform(request, tag="rails"), "query=belt&tag=rails")
@@ -0,0 +1,342 @@
+"""Query budgets of every ``bp_manager`` URL.
+
+Each case requests one URL against a seeded library and fails like
+``assertNumQueries`` when it runs more queries than ``query_budgets.json``
+allows. Lower a budget when a change saves queries, raise it only on
+purpose. SQL and wall times vary with the machine and are reported, not
+checked: set ``QUERY_BUDGET_REPORT`` to a file path to write every case's
+numbers there as JSON, e.g. to track them across commits.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from bp_manager import books, codec, entities, urls
+from bp_manager.models import Blueprint, Commentary, Like, Tag
+
+User = get_user_model()
+
+BUDGETS_FILE = Path(__file__).with_name("query_budgets.json")
+
+ENTITY_NAMES = ("inserter", "transport-belt", "assembling-machine-2", "beacon")
+TAG_NAMES = ("smelting", "trains", "oil", "mall", "defense", "early game")
+
+
+def blueprint_data(label: str, index: int) -> dict:
+    names = ENTITY_NAMES[: index % len(ENTITY_NAMES) + 1]
+    return {
+        "item": "blueprint",
+        "label": label,
+        "version": 281479273644032,
+        "entities": [
+            {
+                "entity_number": number,
+                "name": names[number % len(names)],
+                "position": {"x": number, "y": 0},
+            }
+            for number in range(5 + index % 7)
+        ],
+    }
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f"engineer{index}", password="password")
+            for index in range(6)
+        ]
+        cls.user = cls.users[0]
+        tags = [Tag.objects.create(name=name) for name in TAG_NAMES]
+
+        cls.blueprints = []
+        for index in range(40):
+            title = f"Layout {index}"
+            blueprint = Blueprint.objects.create(
+                title=title,
+                description=f"Description of layout {index}",
+                user=cls.users[index % len(cls.users)],
+                blueprint_string=codec.encode(
+                    {"blueprint": blueprint_data(title, index)}
+                ),
+            )
+            data = blueprint.update_decoded_metadata()
+            blueprint.save()
+            entities.sync_entities(blueprint, data)
+            blueprint.tags.add(tags[index % len(tags)], tags[(index + 1) % len(tags)])
+            cls.blueprints.append(blueprint)
+        cls.blueprint = cls.blueprints[0]
+
+        cls.book = Blueprint.objects.create(
+            title="Main bus",
+            user=cls.user,
+            blueprint_string=codec.encode(
+                {
+                    "blueprint_book": {
+                        "item": "blueprint-book",
+                        "label": "Main bus",
+                        "version": 281479273644032,
+                        "blueprints": [
+                            {"index": index, "blueprint": blueprint_data(label, index)}
+                            for index, label in enumerate(("Mining", "Smelting", "Bus"))
+                        ],
+                    }
+                }
+            ),
+        )
+        data = cls.book.update_decoded_metadata()
+        books.sync_entries(cls.book, data)
+        cls.book.save()
+        entities.sync_entities(cls.book, data)
+
+        for index, user in enumerate(cls.users):
+            for blueprint in cls.blueprints[index::3]:
+                Like.objects.toggle(user, blueprint.pk)
+
+        # Enough comments on the first blueprint for several pages
+        for blueprint, count in (
+            (cls.blueprint, 45),
+            *((b, 2) for b in cls.blueprints[1:]),
+        ):
+            Commentary.objects.bulk_create(
+                Commentary(
+                    content=f"Comment {index}",
+                    blueprint=blueprint,
+                    user=cls.users[index % len(cls.users)],
+                )
+                for index in range(count)
+            )
+            Blueprint.objects.filter(pk=blueprint.pk).adjust_counts(comments=count)
+        cls.comment = cls.blueprint.comments.filter(user=cls.user).first()
+
+    def get_cases(self) -> list[dict]:
+        """Each case names a request and whose it is: ``user`` logs in,
+        ``warm`` makes the same request once before the measured one."""
+        blueprint, book, user = self.blueprint, self.book, self.user
+        other = self.blueprints[1]
+        index = reverse("bp_manager:index")
+        detail = reverse("bp_manager:blueprint-detail", args=[blueprint.pk])
+        next_cursor = self.client.get(index).context["page_obj"].next_cursor
+        comments_next_url = self.client.get(detail).context["comments_next_url"]
+
+        def case(name, url, method="get", data=None, login=False, warm=False):
+            return {
+                "name": name,
+                "method": method,
+                "url": url,
+                "data": data,
+                "user": user if login else None,
+                "warm": warm,
+            }
+
+        return [
+            case("index anonymous", index),
+            case("index user", index, login=True),
+            case("index second page", f"{index}?cursor={next_cursor}"),
+            case("index tag", f"{index}?tag=trains"),
+            case("index query", f"{index}?query=layout"),
+            case("index username", f"{index}?username={user.username}"),
+            case("index liked", f"{index}?liked=true", login=True),
+            case("index has lacks", f"{index}?has=beacon&lacks=inserter"),
+            case("index popular", f"{index}?sort=popular"),
+            case("index trending", f"{index}?sort=trending", login=True),
+            case("detail anonymous", detail),
+            case("detail user", detail, login=True),
+            case("detail warm", detail, warm=True),
+            case("detail warm user", detail, login=True, warm=True),
+            case("detail book", reverse("bp_manager:blueprint-detail", args=[book.pk])),
+            case(
+                "blueprint string",
+                reverse("bp_manager:blueprint-string", args=[blueprint.pk]),
+            ),
+            case(
+                "book entry detail",
+                reverse("bp_manager:book-entry-detail", args=[book.pk, 1]),
+            ),
+            case(
+                "book entry string",
+                reverse("bp_manager:book-entry-string", args=[book.pk, 1]),
+            ),
+            case("create form", reverse("bp_manager:blueprint-create"), login=True),
+            case(
+                "update form",
+                reverse("bp_manager:blueprint-update", args=[blueprint.pk]),
+                login=True,
+            ),
+            case(
+                "delete form",
+                reverse("bp_manager:blueprint-delete", args=[blueprint.pk]),
+                login=True,
+            ),
+            case(
+                "like post",
+                reverse("bp_manager:toggle-like", args=[other.pk]),
+                method="post",
+                login=True,
+            ),
+            case(
+                "like put",
+                reverse("bp_manager:toggle-like", args=[other.pk]),
+                method="put",
+                login=True,
+            ),
+            case(
+                "like delete",
+                reverse("bp_manager:toggle-like", args=[blueprint.pk]),
+                method="delete",
+                login=True,
+            ),
+            case(
+                "add comment",
+                reverse("bp_manager:add-comment", args=[blueprint.pk]),
+                method="post",
+                data={"content": "Nice layout"},
+                login=True,
+            ),
+            case("comment page", comments_next_url),
+            case(
+                "comment update form",
+                reverse("bp_manager:comment-update", args=[self.comment.pk]),
+                login=True,
+            ),
+            case(
+                "comment update",
+                reverse("bp_manager:comment-update", args=[self.comment.pk]),
+                method="post",
+                data={"content": "Edited"},
+                login=True,
+            ),
+            case(
+                "comment delete",
+                reverse("bp_manager:comment-delete", args=[self.comment.pk]),
+                method="post",
+                login=True,
+            ),
+            case(
+                "user detail",
+                reverse("bp_manager:user-detail", args=[user.pk]),
+                login=True,
+            ),
+            case("register form", reverse("bp_manager:user-register")),
+            case(
+                "user update form",
+                reverse("bp_manager:user-update", args=[user.pk]),
+                login=True,
+            ),
+            case(
+                "user delete form",
+                reverse("bp_manager:user-delete", args=[user.pk]),
+                login=True,
+            ),
+            case("api list", reverse("bp_manager:api-blueprint-list")),
+            case(
+                "api list filtered",
+                reverse("bp_manager:api-blueprint-list") + "?tag=oil&has=beacon",
+            ),
+            case(
+                "api batch",
+                reverse("bp_manager:api-blueprint-batch")
+                + "?ids="
+                + ",".join(str(b.pk) for b in self.blueprints[:10]),
+            ),
+            case(
+                "api detail",
+                reverse("bp_manager:api-blueprint-detail", args=[blueprint.pk]),
+            ),
+            case(
+                "api book entries",
+                reverse("bp_manager:api-book-entry-list", args=[book.pk]),
+            ),
+            case(
+                "api book entry",
+                reverse("bp_manager:api-book-entry-detail", args=[book.pk, 1]),
+            ),
+            case("api tags", reverse("bp_manager:api-tag-list")),
+            case("api tag complete", reverse("bp_manager:api-tag-complete") + "?q=s"),
+            case(
+                "api user blueprints",
+                reverse("bp_manager:api-user-blueprint-list", args=[user.username]),
+            ),
+        ]
+
+    def measure(self, case: dict) -> dict:
+        self.client.logout()
+        if case["user"] is not None:
+            self.client.force_login(case["user"])
+        django_cache.clear()
+        request = getattr(self.client, case["method"])
+
+        # Every case sees the seeded library, whatever the previous changed
+        with transaction.atomic():
+            if case["warm"]:
+                request(case["url"], case["data"])
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request(case["url"], case["data"])
+                wall_time = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        return {
+            "status": response.status_code,
+            "queries": len(queries),
+            "sql_time": sum(float(query["time"]) for query in queries),
+            "wall_time": wall_time,
+            "sql": [query["sql"] for query in queries],
+        }
+
+    def test_views_stay_within_query_budgets(self):
+        budgets = json.loads(BUDGETS_FILE.read_text())
+        cases = self.get_cases()
+        names = {case["name"] for case in cases}
+        self.assertEqual(
+            set(budgets) - names, set(), "Budgets of cases that no longer exist"
+        )
+        self.assertEqual(
+            {resolve(case["url"].split("?")[0]).url_name for case in cases},
+            {pattern.name for pattern in urls.urlpatterns},
+            "Every URL needs a case",
+        )
+
+        report = {}
+        for case in cases:
+            with self.subTest(case["name"]):
+                result = self.measure(case)
+                budget = budgets.get(case["name"])
+                report[case["name"]] = {
+                    "method": case["method"].upper(),
+                    "url": case["url"],
+                    "status": result["status"],
+                    "queries": result["queries"],
+                    "budget": budget,
+                    "sql_time": round(result["sql_time"], 6),
+                    "wall_time": round(result["wall_time"], 6),
+                }
+                self.assertLess(result["status"], 400)
+                self.assertIsNotNone(
+                    budget, f"No budget for {result['queries']} queries"
+                )
+                if result["queries"] > budget:
+                    self.fail(
+                        "%d queries executed, %d budgeted\nCaptured queries were:\n%s"
+                        % (
+                            result["queries"],
+                            budget,
+                            "\n".join(
+                                "%d. %s" % (number, sql)
+                                for number, sql in enumerate(result["sql"], start=1)
+                            ),
+                        )
+                    )
+
+        report_path = os.environ.get("QUERY_BUDGET_REPORT")
+        if report_path:
+            Path(report_path).write_text(json.dumps(report, indent=2) + "\n")
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from bp_manager.models import Blueprint, Tag
+from bp_manager.search import BasicSearchBackend, get_backend
+
+User = get_user_model()
+
+
+class SearchBackendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="builder", password="password")
+        self.smelter = Blueprint.objects.create(
+            user=self.user, title="Smelting column", description="Iron plates"
+        )
+        self.belts = Blueprint.objects.create(
+            user=self.user, title="Belt balancer", description="Feeds smelting arrays"
+        )
+        self.tag = Tag.objects.create(name="Trains")
+        self.belts.tags.add(self.tag)
+
+    def search(self, query):
+        return list(get_backend().search(Blueprint.objects.all(), query))
+
+    def test_title_match_ranks_above_description_match(self):
+        self.assertEqual(self.search("smelting"), [self.smelter, self.belts])
+
+    def test_prefix_and_all_terms_required(self):
+        self.assertEqual(self.search("bal"), [self.belts])
+        self.assertEqual(self.search("belt iron"), [])
+        self.assertEqual(self.search("  "), [])
+
+    def test_tags_and_author_are_indexed(self):
+        self.assertEqual(self.search("trains"), [self.belts])
+        self.assertEqual(set(self.search("builder")), {self.smelter, self.belts})
+
+    def test_index_follows_changes(self):
+        self.tag.name = "Rails"
+        self.tag.save()
+        self.assertEqual(self.search("rails"), [self.belts])
+        self.assertEqual(self.search("trains"), [])
+
+        self.belts.tags.remove(self.tag)
+        self.assertEqual(self.search("rails"), [])
+
+        self.user.username = "planner"
+        self.user.save()
+        self.assertEqual(set(self.search("planner")), {self.smelter, self.belts})
+
+        self.smelter.delete()
+        self.assertEqual(self.search("smelting"), [self.belts])
+
+    def test_basic_backend(self):
+        results = BasicSearchBackend().search(Blueprint.objects.all(), "Trains")
+        self.assertEqual(list(results), [self.belts])
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.test import SimpleTestCase, TestCase
+
+from bp_manager import codec, entities, similarity
+from bp_manager.models import Blueprint
+
+User = get_user_model()
+
+
+def blueprint_string(counts: dict[str, int]) -> str:
+    names = [name for name, count in counts.items() for _ in range(count)]
+    return codec.encode(
+        {
+            "blueprint": {
+                "item": "blueprint",
+                "entities": [
+                    {"entity_number": i, "name": name, "position": {"x": i, "y": 0}}
+                    for i, name in enumerate(names)
+                ],
+            }
+        }
+    )
+
+
+SMELTING = {"stone-furnace": 24, "inserter": 48, "transport-belt": 40, "pole": 8}
+
+
+class MinHashTest(SimpleTestCase):
+    def test_jaccard(self):
+        self.assertEqual(similarity.jaccard(SMELTING, SMELTING), 1.0)
+        self.assertEqual(similarity.jaccard({"a": 1, "b": 3}, {"b": 1}), 0.25)
+        self.assertEqual(similarity.jaccard({}, {}), 0.0)
+
+    def test_buckets_are_deterministic(self):
+        self.assertEqual(len(similarity.buckets(SMELTING)), similarity.BANDS)
+        self.assertEqual(similarity.buckets(SMELTING), similarity.buckets(SMELTING))
+        self.assertEqual(similarity.buckets({}), [])
+
+    def test_similar_sets_share_buckets(self):
+        close = dict(SMELTING, pole=9)
+        unrelated = {"assembling-machine-3": 12, "beacon": 20, "substation": 4}
+        buckets = set(similarity.buckets(SMELTING))
+        self.assertTrue(buckets & set(similarity.buckets(close)))
+        self.assertFalse(buckets & set(similarity.buckets(unrelated)))
+
+
+class SimilarBlueprintsTest(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.smelting = self.create("Smelting", SMELTING)
+        self.bigger = self.create("Bigger smelting", dict(SMELTING, pole=10))
+        self.close = self.create("Close smelting", dict(SMELTING, pole=9))
+        self.unrelated = self.create("Beacons", {"beacon": 20, "substation": 4})
+
+    def create(self, title, counts) -> Blueprint:
+        instance = Blueprint.objects.create(
+            title=title, user=self.user, blueprint_string=blueprint_string(counts)
+        )
+        entities.sync_entities(instance, instance.decode())
+        return instance
+
+    def test_candidates_are_ranked_by_exact_similarity(self):
+        similar = similarity.similar_blueprints(self.smelting.pk)
+        self.assertEqual(similar, [self.close, self.bigger])
+        self.assertAlmostEqual(similar[0].similarity, 120 / 121)
+        self.assertEqual(similarity.similar_blueprints(self.unrelated.pk), [])
+
+    def test_candidates_are_read_from_the_newest_bucket_members(self):
+        copies = [self.create(f"Copy {index}", SMELTING) for index in range(3)]
+        with mock.patch.object(similarity, "MAX_BUCKET_ROWS", 1):
+            # the blueprint's buckets, then the newest member of each
+            with self.assertNumQueries(2):
+                candidates = similarity.candidate_ids(self.smelting.pk)
+        self.assertEqual(candidates, [copies[-1].pk])
+
+    def test_buckets_follow_the_string(self):
+        self.unrelated.blueprint_string = blueprint_string(SMELTING)
+        self.unrelated.save()
+        entities.sync_entities(self.unrelated, self.unrelated.decode())
+        self.assertEqual(
+            similarity.similar_blueprints(self.smelting.pk)[0], self.unrelated
+        )
+
+    def test_detail_page_lists_similar_blueprints(self):
+        response = self.client.get(self.smelting.get_absolute_url())
+        self.assertEqual(
+            response.context["similar_blueprints"], [self.close, self.bigger]
+        )
+        self.assertContains(response, self.close.get_absolute_url())
+        self.assertContains(response, "99% alike")
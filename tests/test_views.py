@@ -1,9 +1,15 @@
+import io
 import os
 
 from django.contrib.auth import get_user_model
+from django.conf import settings
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.sessions.models import Session
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from bp_manager import cache, codec, images, ranking
 from bp_manager.models import Like, Tag, Commentary
 from django.test import TestCase
 from django.urls import reverse
@@ -17,6 +23,7 @@ User = get_user_model()
 
 class BaseTestCase(TestCase):
     def setUp(self):
+        django_cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username="testuser", password="password")
         self.blueprint = Blueprint.objects.create(
@@ -52,6 +59,7 @@ class BaseTestCase(TestCase):
         if blueprint and blueprint.blueprint_image:
             if os.path.exists(blueprint.blueprint_image.path):
                 os.remove(blueprint.blueprint_image.path)
+            images.delete_derivatives(blueprint.image_variants)
 
 
 class BlueprintListViewTests(BaseTestCase):
@@ -89,6 +97,13 @@ class BlueprintListViewTests(BaseTestCase):
         self.assertIn(self.blueprint1, response.context_data["blueprint_list"])
         self.assertNotIn(self.blueprint2, response.context_data["blueprint_list"])
 
+    def test_tag_filter_is_normalized(self):
+        smelting = Tag.objects.create(name="smelting")
+        self.blueprint2.tags.add(smelting)
+
+        response = self.client.get(self.BLUEPRINTS_URL, {"tag": " Smelting "})
+        self.assertEqual(list(response.context["blueprint_list"]), [self.blueprint2])
+
     def test_blueprint_list_view_liked_blueprints(self):
         Like.objects.create(user=self.user, blueprint=self.blueprint1)
 
@@ -100,6 +115,27 @@ class BlueprintListViewTests(BaseTestCase):
         self.assertIn(self.blueprint1, response.context_data["blueprint_list"])
         self.assertNotIn(self.blueprint2, response.context_data["blueprint_list"])
 
+    def test_blueprint_list_view_query_count_is_constant(self):
+        for index in range(10):
+            blueprint = self.create_blueprint(f"Extra {index}")
+            Like.objects.create(user=self.user, blueprint=blueprint)
+            Commentary.objects.create(
+                content="Comment", blueprint=blueprint, user=self.user
+            )
+        self.login_user()
+
+        # session, user, page keys for the ETag, page, liked set, tag facets
+        with self.assertNumQueries(6):
+            response = self.client.get(self.BLUEPRINTS_URL)
+        self.assertEqual(response.status_code, 200)
+
+        # session, user, page keys
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.BLUEPRINTS_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+
     def test_blueprint_list_view_anonymous_user(self):
         request = self.factory.get(self.BLUEPRINTS_URL)
         request.user = AnonymousUser()
@@ -135,6 +171,12 @@ class BlueprintDetailViewTests(BaseTestCase):
         self.assertEqual(response.context_data["blueprint"], self.blueprint)
         self.assertIsNotNone(response.context_data["commentary_form"])
 
+    def test_blueprint_detail_view_does_not_write_the_session(self):
+        response = self.client.get(self.BLUEPRINT_DETAIL_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
 
 class BlueprintCreateViewTest(BaseTestCase):
     def setUp(self):
@@ -159,6 +201,22 @@ class BlueprintCreateViewTest(BaseTestCase):
         self.assertEqual(Blueprint.objects.count(), 2)
         self.assertEqual(response.url, Blueprint.objects.first().get_absolute_url())
 
+    def test_create_blueprint_with_malformed_contents(self):
+        response = self.client.post(
+            reverse("bp_manager:blueprint-create"),
+            {
+                "title": "Odd blueprint",
+                "description": "Decodes, but not into a blueprint",
+                "blueprint_string": codec.encode(
+                    {"blueprint": {"entities": [1], "label": 5}}
+                ),
+                "blueprint_image": self.image_file,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        blueprint = Blueprint.objects.get(title="Odd blueprint")
+        self.assertEqual((blueprint.kind, blueprint.entity_count), ("blueprint", 1))
+
 
 class BlueprintUpdateViewTest(BaseTestCase):
     def setUp(self):
@@ -212,9 +270,12 @@ class ToggleLikeViewTests(BaseTestCase):
         self.assertTrue(
             Like.objects.filter(user=self.user, blueprint=self.blueprint).exists()
         )
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.like_count, 1)
 
     def test_toggle_like_view_unlike(self):
         Like.objects.create(user=self.user, blueprint=self.blueprint)
+        Blueprint.objects.filter(pk=self.blueprint.pk).adjust_counts(likes=1)
 
         request = self.factory.post(self.TOGGLE_LIKE_URL)
         request.user = self.user
@@ -224,6 +285,43 @@ class ToggleLikeViewTests(BaseTestCase):
         self.assertFalse(
             Like.objects.filter(user=self.user, blueprint=self.blueprint).exists()
         )
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.like_count, 0)
+
+    def test_put_and_delete_set_the_like_idempotently(self):
+        self.login_user()
+        for _ in range(2):
+            response = self.client.put(self.TOGGLE_LIKE_URL)
+            self.assertEqual(response.json(), {"liked": True, "like_count": 1})
+        self.assertEqual(Like.objects.filter(blueprint=self.blueprint).count(), 1)
+
+        for _ in range(2):
+            response = self.client.delete(self.TOGGLE_LIKE_URL)
+            self.assertEqual(response.json(), {"liked": False, "like_count": 0})
+        self.assertFalse(Like.objects.filter(blueprint=self.blueprint).exists())
+        self.blueprint.refresh_from_db()
+        # Only the comment of setUp() is left in the score
+        comment = ranking.weight_at(
+            self.commentary.created_time, ranking.COMMENT_WEIGHT
+        )
+        self.assertAlmostEqual(self.blueprint.trending_score / comment, 1.0)
+
+    def test_put_requires_login_and_an_existing_blueprint(self):
+        response = self.client.put(self.TOGGLE_LIKE_URL)
+        self.assertEqual(response.status_code, 401)
+
+        self.login_user()
+        url = reverse("bp_manager:toggle-like", kwargs={"pk": 0})
+        self.assertEqual(self.client.put(url).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertFalse(Like.objects.exists())
+
+    def test_detail_shows_liked_state(self):
+        self.login_user()
+        self.client.put(self.TOGGLE_LIKE_URL)
+        response = self.client.get(self.blueprint.get_absolute_url())
+        self.assertTrue(response.context["liked"])
+        self.assertContains(response, "bxs-heart")
 
 
 class UserRegisterViewTests(TestCase):
@@ -272,6 +370,36 @@ class UserDeleteViewTests(BaseTestCase):
         self.assertEqual(response.status_code, 302)
         self.assertFalse(User.objects.filter(username="testuser").exists())
 
+    def test_deleting_a_fan_uncounts_their_likes_and_comments(self):
+        fan = User.objects.create_user(username="fan", password="password")
+        self.client.login(username="fan", password="password")
+        self.client.put(reverse("bp_manager:toggle-like", args=[self.blueprint.pk]))
+        self.client.post(
+            reverse("bp_manager:add-comment", args=[self.blueprint.pk]),
+            {"content": "Great"},
+        )
+        self.blueprint.refresh_from_db()
+        # The comment of setUp() and the fan's
+        self.assertEqual(
+            (self.blueprint.like_count, self.blueprint.comment_count), (1, 2)
+        )
+        version = self.blueprint.version
+
+        response = self.client.post(
+            reverse("bp_manager:user-delete", kwargs={"pk": fan.pk}),
+            {"password": "password"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.blueprint.refresh_from_db()
+        self.assertEqual(
+            (self.blueprint.like_count, self.blueprint.comment_count), (0, 1)
+        )
+        comment = ranking.weight_at(
+            self.commentary.created_time, ranking.COMMENT_WEIGHT
+        )
+        self.assertAlmostEqual(self.blueprint.trending_score / comment, 1.0)
+        self.assertGreater(self.blueprint.version, version)
+
     def test_delete_user_incorrect_password(self):
         self.login_user()
         data = {"password": "wrong_password"}
@@ -280,21 +408,147 @@ class UserDeleteViewTests(BaseTestCase):
         self.assertTrue(User.objects.filter(username="testuser").exists())
 
 
+class ConditionalGetTests(BaseTestCase):
+    def assertNotModified(self, url, response):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def assertModified(self, url, response):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail(self):
+        url = self.blueprint.get_absolute_url()
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        self.assertNotModified(url, response)
+
+        self.blueprint.tags.add(Tag.objects.create(name="smelting"))
+        self.assertModified(url, response)
+
+        response = self.client.get(url)
+        self.login_user()
+        self.assertModified(url, response)
+
+    def test_detail_last_modified(self):
+        url = self.blueprint.get_absolute_url()
+        response = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_detail_has_no_validators(self):
+        url = self.blueprint.get_absolute_url()
+        self.client.get(url)
+        Blueprint.objects.filter(pk=self.blueprint.pk).touch()
+        # Another worker is rebuilding the detail
+        django_cache.add(f"{cache.detail_key(self.blueprint.pk)}:lock", True)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        django_cache.delete(f"{cache.detail_key(self.blueprint.pk)}:lock")
+        response = self.client.get(url)
+        self.assertIn("ETag", response)
+        self.assertNotModified(url, response)
+
+    def test_list(self):
+        url = reverse("bp_manager:index")
+        response = self.client.get(url)
+        self.assertNotModified(url, response)
+
+        Blueprint.objects.filter(pk=self.blueprint.pk).adjust_counts(likes=1)
+        self.assertModified(url, response)
+
+        response = self.client.get(url)
+        self.create_blueprint("Newer")
+        self.assertModified(url, response)
+
+
 class CommentaryCreateViewTest(BaseTestCase):
     def setUp(self):
         super().setUp()
         self.login_user()
-        session = self.client.session
-        session["blueprint_id"] = self.blueprint.id
-        session.save()
+        self.url = reverse("bp_manager:add-comment", kwargs={"pk": self.blueprint.pk})
 
     def test_create_commentary(self):
-        response = self.client.post(
-            reverse("bp_manager:add-comment"), {"content": "Test commentary"}
-        )
+        response = self.client.post(self.url, {"content": "Test commentary"})
         self.assertEqual(response.status_code, 302)
         self.assertEqual(Commentary.objects.count(), 2)
         self.assertEqual(response.url, Commentary.objects.first().get_absolute_url())
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.comment_count, 2)
+
+    def test_comment_goes_to_the_blueprint_in_the_url(self):
+        other = self.create_blueprint("Other")
+        self.client.get(other.get_absolute_url())
+        self.client.post(self.url, {"content": "Test commentary"})
+        self.assertEqual(self.blueprint.comments.count(), 2)
+        self.assertFalse(other.comments.exists())
+
+    def test_invalid_commentary_renders_blueprint(self):
+        self.blueprint.blueprint_string = codec.encode({"blueprint": {"item": "x"}})
+        self.blueprint.save()
+        response = self.client.post(self.url, {"content": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["blueprint"], self.blueprint)
+        self.assertContains(response, self.blueprint.blueprint_string)
+
+    def test_unknown_blueprint(self):
+        response = self.client.post(
+            reverse("bp_manager:add-comment", kwargs={"pk": 0}), {"content": "Hi"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_anonymous_user_is_sent_to_login_first(self):
+        self.client.logout()
+        url = reverse("bp_manager:add-comment", kwargs={"pk": 0})
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {"content": "Hi"})
+        self.assertRedirects(
+            response, f"{reverse('login')}?next={url}", fetch_redirect_response=False
+        )
+
+
+class CommentaryListViewTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commentary.delete()
+        self.comments = [
+            Commentary.objects.create(
+                content=f"Comment {index}", blueprint=self.blueprint, user=self.user
+            )
+            for index in range(45)
+        ]
+        self.comments.reverse()
+
+    def test_detail_renders_the_first_page(self):
+        response = self.client.get(self.blueprint.get_absolute_url())
+        self.assertEqual(list(response.context["comments"]), self.comments[:20])
+        self.assertContains(response, "data-comments-next-url")
+
+    def test_fragment_pages_follow_each_other(self):
+        url = reverse("bp_manager:comment-list", kwargs={"pk": self.blueprint.pk})
+        seen = []
+        while url:
+            # the page, with its authors joined
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertNotContains(response, "<ul")
+            seen.extend(response.context["comments"])
+            url = response.context["comments_next_url"]
+        self.assertEqual(seen, self.comments)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("bp_manager:comment-list", kwargs={"pk": self.blueprint.pk}),
+            {"cursor": "garbage"},
+        )
+        self.assertEqual(response.status_code, 404)
 
 
 class CommentaryUpdateViewTest(BaseTestCase):
@@ -302,6 +556,24 @@ class CommentaryUpdateViewTest(BaseTestCase):
         super().setUp()
         self.login_user()
 
+    def test_edit_page_shows_only_the_edited_comment(self):
+        Commentary.objects.create(
+            content="Other commentary", blueprint=self.blueprint, user=self.user
+        )
+        response = self.client.get(
+            reverse("bp_manager:comment-update", kwargs={"pk": self.commentary.pk})
+        )
+        self.assertEqual(response.context["comments"], [self.commentary])
+        self.assertNotContains(response, "Other commentary")
+
+    def test_edit_page_shows_the_blueprint_string(self):
+        self.blueprint.blueprint_string = codec.encode({"blueprint": {"item": "x"}})
+        self.blueprint.save()
+        response = self.client.get(
+            reverse("bp_manager:comment-update", kwargs={"pk": self.commentary.pk})
+        )
+        self.assertContains(response, self.blueprint.blueprint_string)
+
     def test_update_commentary(self):
         response = self.client.post(
             reverse("bp_manager:comment-update", kwargs={"pk": self.commentary.pk}),
@@ -318,12 +590,85 @@ class CommentaryDeleteViewTest(BaseTestCase):
         self.login_user()
 
     def test_delete_commentary(self):
+        call_command("recount_blueprints", stdout=io.StringIO())
         response = self.client.post(
             reverse("bp_manager:comment-delete", kwargs={"pk": self.commentary.pk})
         )
         self.assertEqual(Commentary.objects.count(), 0)
+        self.blueprint.refresh_from_db()
+        self.assertEqual(self.blueprint.comment_count, 0)
         self.assertEqual(
             response.url,
             reverse("bp_manager:blueprint-detail", kwargs={"pk": self.blueprint.pk})
             + "#comments",
         )
+
+
+class RecountBlueprintsCommandTest(BaseTestCase):
+    def test_recount_blueprints(self):
+        other = self.create_blueprint("Other")
+        Like.objects.create(user=self.user, blueprint=self.blueprint)
+        Blueprint.objects.update(like_count=5, comment_count=5)
+
+        output = io.StringIO()
+        call_command("recount_blueprints", stdout=output)
+        self.assertIn("Recounted 2 blueprints", output.getvalue())
+
+        self.blueprint.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(
+            (self.blueprint.like_count, self.blueprint.comment_count), (1, 1)
+        )
+        self.assertEqual((other.like_count, other.comment_count), (0, 0))
+
+
+class RankingTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.commentary.delete()
+        self.liked = self.create_blueprint("Liked")
+        self.other_user = User.objects.create_user(username="other", password="pw")
+        for user in (self.user, self.other_user):
+            Like.objects.toggle(user, self.liked.pk)
+        self.newest = self.create_blueprint("Newest")
+
+    def titles(self, sort):
+        response = self.client.get(reverse("bp_manager:index"), {"sort": sort})
+        return [blueprint.title for blueprint in response.context["blueprint_list"]]
+
+    def test_sorts(self):
+        self.assertEqual(self.titles("new"), ["Newest", "Liked", "Test Blueprint"])
+        self.assertEqual(self.titles("popular")[0], "Liked")
+        self.assertEqual(self.titles("trending"), ["Liked", "Newest", "Test Blueprint"])
+
+    def test_weight_halves_every_half_life(self):
+        now = ranking.EPOCH + ranking.HALF_LIFE * 10
+        self.assertAlmostEqual(
+            ranking.weight_at(now - ranking.HALF_LIFE) / ranking.weight_at(now), 0.5
+        )
+
+    def test_unlike_removes_its_weight(self):
+        self.liked.refresh_from_db()
+        self.assertGreater(self.liked.trending_score, 0)
+        for user in (self.user, self.other_user):
+            Like.objects.toggle(user, self.liked.pk)
+        self.liked.refresh_from_db()
+        # Exact up to float rounding relative to the weight of a new like
+        self.assertAlmostEqual(
+            self.liked.trending_score, 0, delta=ranking.weight_at() * 1e-9
+        )
+
+    def test_refresh_trending_matches_incremental_scores(self):
+        expected = dict(Blueprint.objects.values_list("title", "trending_score"))
+        Blueprint.objects.update(trending_score=123)
+
+        output = io.StringIO()
+        call_command("refresh_trending", stdout=output)
+        self.assertIn(
+            f"Refreshed trending scores of {sum(map(bool, expected.values()))} "
+            "blueprints.",
+            output.getvalue(),
+        )
+
+        for title, score in Blueprint.objects.values_list("title", "trending_score"):
+            self.assertAlmostEqual(score, expected[title], delta=score * 1e-9)